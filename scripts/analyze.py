@@ -8,6 +8,19 @@ import logging
 from pathlib import Path
 from typing import Optional
 
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scripts.decompiler_orchestrator import (
+    DEFAULT_APKTOOL_HEAP_MB,
+    DEFAULT_APKTOOL_TIMEOUT,
+    DEFAULT_JADX_HEAP_MB,
+    DEFAULT_JADX_TIMEOUT,
+    DecompileJob,
+    DecompilerOrchestrator,
+    default_jadx_threads,
+)
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -34,6 +47,11 @@ class MarsProAnalyzer:
         self.apktool_path = self.project_root / "assets" / "tools" / "apktool" / "apktool.jar"
         self.jadx_path = self.project_root / "assets" / "tools" / "jadx" / "bin" / "jadx"
         
+        # Decompiler resources
+        self.apktool_heap_mb = DEFAULT_APKTOOL_HEAP_MB
+        self.jadx_heap_mb = DEFAULT_JADX_HEAP_MB
+        self.jadx_threads = default_jadx_threads()
+        
         # Create output directories
         self.output_dir.mkdir(exist_ok=True)
         self.analysis_dir.mkdir(exist_ok=True)
@@ -54,34 +72,48 @@ class MarsProAnalyzer:
             apktool_output.mkdir(exist_ok=True)
             jadx_output.mkdir(exist_ok=True)
             
-            # Run apktool using Java
-            logger.info("Running apktool...")
-            result = subprocess.run([
-                "java", "-jar", str(self.apktool_path), "d", str(self.apk_path), 
-                "-o", str(apktool_output), "-f"
-            ], capture_output=True, text=True)
-            
-            if result.returncode == 0:
-                logger.info("apktool completed successfully")
-            else:
-                logger.error(f"apktool failed: {result.stderr}")
-                return False
-            
-            # Run jadx
-            logger.info("Running jadx...")
             if os.name == 'nt':  # Windows
                 jadx_cmd = str(self.jadx_path) + ".bat"
             else:  # Unix/Linux
                 jadx_cmd = str(self.jadx_path)
             
-            result = subprocess.run([
-                jadx_cmd, "-d", str(jadx_output), str(self.apk_path)
-            ], capture_output=True, text=True)
+            # Run apktool and jadx side by side, output is streamed to the log
+            logger.info("Running apktool and jadx...")
+            jobs = [
+                DecompileJob(
+                    name="apktool",
+                    cmd=[
+                        "java", f"-Xmx{self.apktool_heap_mb}m", "-jar", str(self.apktool_path),
+                        "d", str(self.apk_path), "-o", str(apktool_output), "-f"
+                    ],
+                    heap_mb=self.apktool_heap_mb,
+                    timeout=DEFAULT_APKTOOL_TIMEOUT
+                ),
+                DecompileJob(
+                    name="jadx",
+                    cmd=[
+                        jadx_cmd, "-j", str(self.jadx_threads),
+                        "-d", str(jadx_output), str(self.apk_path)
+                    ],
+                    heap_mb=self.jadx_heap_mb,
+                    timeout=DEFAULT_JADX_TIMEOUT
+                ),
+            ]
+            results = DecompilerOrchestrator().run(jobs)
             
-            if result.returncode == 0:
-                logger.info("jadx completed successfully")
-            else:
-                logger.error(f"jadx failed: {result.stderr}")
+            failed = False
+            for name in ("apktool", "jadx"):
+                result = results[name]
+                if result.success:
+                    logger.info(f"{name} completed successfully")
+                elif result.timed_out:
+                    logger.error(f"{name} timed out")
+                    failed = True
+                else:
+                    output = "\n".join(result.output_tail)
+                    logger.error(f"{name} failed: {output}")
+                    failed = True
+            if failed:
                 return False
             
             # Extract interesting files
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Concurrent decompiler runs for MarsPro analysis.
+
+apktool and jadx are independent JVM processes, so they are launched side by
+side instead of one after the other. Each job gets its own heap limit through
+JAVA_OPTS, and a job is only started while the heaps of the running jobs fit
+into the memory available when the run began, so two JVMs do not push the
+machine into swap. Output is streamed to the log line by line as the tools
+print it.
+"""
+
+import os
+import time
+import logging
+import subprocess
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Sequence, Union
+
+logger = logging.getLogger(__name__)
+
+# Default JVM heap per decompiler, in MB
+DEFAULT_APKTOOL_HEAP_MB = 1024
+DEFAULT_JADX_HEAP_MB = 4096
+
+# Seconds a decompiler may run before it is killed
+DEFAULT_APKTOOL_TIMEOUT = 300
+DEFAULT_JADX_TIMEOUT = 600
+
+# Memory left to the rest of the system while decompilers run, in MB
+DEFAULT_MEMORY_RESERVE_MB = 512
+
+# Output lines kept per job for error reports
+OUTPUT_TAIL_LINES = 20
+
+MEMINFO_PATH = Path('/proc/meminfo')
+
+
+def default_jadx_threads() -> int:
+    """jadx threads leaving one core to apktool running alongside."""
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+def available_memory_mb() -> Optional[int]:
+    """
+    Read the memory available without swapping.
+
+    Returns:
+        MemAvailable in MB, or None where /proc/meminfo does not exist
+    """
+    try:
+        with open(MEMINFO_PATH, 'r') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) // 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+@dataclass
+class DecompileJob:
+    """One decompiler invocation."""
+    name: str
+    cmd: List[str]
+    heap_mb: int
+    timeout: Optional[float] = None
+
+
+@dataclass
+class DecompileResult:
+    """Outcome of a decompiler invocation."""
+    name: str
+    returncode: Optional[int]
+    duration: float
+    timed_out: bool = False
+    output_tail: List[str] = field(default_factory=list)
+
+    @property
+    def success(self) -> bool:
+        """True if the tool finished with exit code 0."""
+        return self.returncode == 0 and not self.timed_out
+
+
+@dataclass
+class _RunningJob:
+    """A launched job and its output reader."""
+    job: DecompileJob
+    process: subprocess.Popen
+    reader: threading.Thread
+    started: float
+    output_tail: Deque[str]
+
+
+class DecompilerOrchestrator:
+    """Run decompiler jobs concurrently within the available memory."""
+
+    def __init__(
+        self,
+        memory_reserve_mb: int = DEFAULT_MEMORY_RESERVE_MB,
+        poll_interval: float = 0.5
+    ):
+        """
+        Initialize the orchestrator.
+
+        Args:
+            memory_reserve_mb: Memory kept free for the rest of the system, in MB
+            poll_interval: Seconds between checks on the running jobs
+        """
+        self.memory_reserve_mb = memory_reserve_mb
+        self.poll_interval = poll_interval
+
+    def run(self, jobs: Sequence[DecompileJob]) -> Dict[str, DecompileResult]:
+        """
+        Run jobs concurrently, holding back jobs whose heap does not fit yet.
+
+        Args:
+            jobs: Jobs in the order they should be started
+
+        Returns:
+            Dictionary mapping job names to their results
+        """
+        available = available_memory_mb()
+        budget = None if available is None else available - self.memory_reserve_mb
+        if budget is not None:
+            logger.info(f"Decompiler memory budget: {budget} MB of {available} MB available")
+
+        pending = deque(jobs)
+        running: Dict[str, _RunningJob] = {}
+        results: Dict[str, DecompileResult] = {}
+        low_memory_warned = False
+
+        try:
+            while pending or running:
+                while pending and self._fits(pending[0], running, budget):
+                    job = pending.popleft()
+                    started = self._start(job)
+                    if isinstance(started, DecompileResult):
+                        results[job.name] = started
+                    else:
+                        running[job.name] = started
+
+                for name in list(running):
+                    result = self._check(running[name])
+                    if result is not None:
+                        del running[name]
+                        results[name] = result
+
+                if running and not low_memory_warned:
+                    current = available_memory_mb()
+                    if current is not None and current < self.memory_reserve_mb:
+                        logger.warning(f"Only {current} MB of memory left while decompiling")
+                        low_memory_warned = True
+
+                if pending or running:
+                    time.sleep(self.poll_interval)
+        finally:
+            # Do not leave decompilers behind when the run is interrupted
+            for entry in running.values():
+                if entry.process.poll() is None:
+                    logger.warning(f"Killing {entry.job.name} after an interrupted run")
+                    entry.process.kill()
+                    entry.process.wait()
+
+        return results
+
+    def _fits(
+        self,
+        job: DecompileJob,
+        running: Dict[str, _RunningJob],
+        budget: Optional[int]
+    ) -> bool:
+        """Check if a job can start next to the running ones."""
+        if not running or budget is None:
+            return True
+        committed = sum(entry.job.heap_mb for entry in running.values())
+        if committed + job.heap_mb <= budget:
+            return True
+        logger.debug(f"Holding back {job.name}: {committed + job.heap_mb} MB exceeds {budget} MB")
+        return False
+
+    def _start(self, job: DecompileJob) -> Union[_RunningJob, DecompileResult]:
+        """
+        Launch a job with its heap limit and start streaming its output.
+
+        Returns:
+            The running job, or a failed result if the tool could not be launched
+        """
+        env = os.environ.copy()
+        java_opts = env.get('JAVA_OPTS', '')
+        env['JAVA_OPTS'] = f"{java_opts} -Xmx{job.heap_mb}m".strip()
+
+        logger.info(f"Starting {job.name} ({job.heap_mb} MB heap): {' '.join(job.cmd)}")
+        try:
+            process = subprocess.Popen(
+                job.cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                errors='replace',
+                bufsize=1,
+                env=env
+            )
+        except OSError as e:
+            logger.error(f"Failed to start {job.name}: {e}")
+            return DecompileResult(name=job.name, returncode=None, duration=0.0, output_tail=[str(e)])
+        output_tail: Deque[str] = deque(maxlen=OUTPUT_TAIL_LINES)
+        reader = threading.Thread(
+            target=self._stream_output,
+            args=(job.name, process, output_tail),
+            daemon=True
+        )
+        reader.start()
+        return _RunningJob(job, process, reader, time.monotonic(), output_tail)
+
+    @staticmethod
+    def _stream_output(name: str, process: subprocess.Popen, output_tail: Deque[str]) -> None:
+        """Log a job's output as it is printed."""
+        for line in process.stdout:
+            line = line.rstrip()
+            if line:
+                output_tail.append(line)
+                logger.info(f"[{name}] {line}")
+        process.stdout.close()
+
+    def _check(self, entry: _RunningJob) -> Optional[DecompileResult]:
+        """Collect a finished job, killing it if it ran past its timeout."""
+        duration = time.monotonic() - entry.started
+        timed_out = False
+
+        if entry.process.poll() is None:
+            if entry.job.timeout is None or duration < entry.job.timeout:
+                return None
+            logger.error(f"{entry.job.name} timed out after {entry.job.timeout:.0f} seconds")
+            entry.process.kill()
+            entry.process.wait()
+            timed_out = True
+
+        entry.reader.join(timeout=5)
+        result = DecompileResult(
+            name=entry.job.name,
+            returncode=entry.process.returncode,
+            duration=duration,
+            timed_out=timed_out,
+            output_tail=list(entry.output_tail)
+        )
+        logger.info(f"{entry.job.name} finished in {duration:.1f}s with exit code {result.returncode}")
+        return result
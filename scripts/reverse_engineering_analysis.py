@@ -11,6 +11,7 @@ Version: 1.0.0
 """
 
 import os
+import re
 import sys
 import json
 import logging
@@ -18,15 +19,35 @@ import subprocess
 import zipfile
 import xml.etree.ElementTree as ET
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Sequence, Tuple
 from datetime import datetime
 import hashlib
 import shutil
+import sqlite3
 
 # Add project root to path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+from scripts.decompiler_orchestrator import (
+    DEFAULT_APKTOOL_HEAP_MB,
+    DEFAULT_APKTOOL_TIMEOUT,
+    DEFAULT_JADX_HEAP_MB,
+    DEFAULT_JADX_TIMEOUT,
+    DecompileJob,
+    DecompilerOrchestrator,
+    default_jadx_threads,
+)
+from scripts.source_index import SourceIndex
+from scripts.source_search import (
+    APKTOOL_SUFFIXES,
+    JADX_SUFFIXES,
+    MultiPatternSearcher,
+    SearchHit,
+    group_files_by_pattern,
+    iter_source_files,
+)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -42,15 +63,30 @@ logger = logging.getLogger(__name__)
 class MarsProAnalyzer:
     """Comprehensive MarsPro APK analyzer."""
     
-    def __init__(self, apk_path: str, output_dir: str = None):
+    # Written into a cache directory once its decompilation has finished
+    CACHE_COMPLETE_MARKER = '.complete'
+    
+    DECOMPILER_LABELS = {'apktool': 'APKTool', 'jadx': 'JADX'}
+    
+    def __init__(
+        self,
+        apk_path: str,
+        output_dir: str = None,
+        workers: Optional[int] = None,
+        use_index: bool = True
+    ):
         """
         Initialize the MarsPro analyzer.
         
         Args:
             apk_path: Path to the MarsPro APK file
             output_dir: Output directory for analysis results
+            workers: Processes used to scan decompiled code, defaults to the CPU count
+            use_index: Answer string searches from the persistent source index
         """
         self.apk_path = Path(apk_path)
+        self.workers = workers
+        self.use_index = use_index
         self.output_dir = Path(output_dir) if output_dir else project_root / 'output'
         self.analysis_dir = project_root / 'analysis'
         
@@ -60,6 +96,18 @@ class MarsProAnalyzer:
         (self.output_dir / 'jadx_output').mkdir(exist_ok=True)
         (self.output_dir / 'logs').mkdir(exist_ok=True)
         
+        # Decompiled output, moved into the decompilation cache once known
+        self.apktool_output_dir = self.output_dir / 'apktool_output'
+        self.jadx_output_dir = self.output_dir / 'jadx_output'
+        self.cache_dir = self.output_dir / 'cache'
+        self._apk_hash: Optional[str] = None
+        self._tool_versions: Dict[str, str] = {}
+        
+        # Source index, refreshed on first use and after each decompilation
+        self.source_index_path = self.output_dir / 'source_index.sqlite'
+        self._source_index: Optional[SourceIndex] = None
+        self._source_index_stale = True
+        
         # Analysis results
         self.analysis_results = {
             'metadata': {},
@@ -81,6 +129,12 @@ class MarsProAnalyzer:
         self.apktool_path = project_root / 'assets' / 'tools' / 'apktool' / 'apktool.bat'
         self.jadx_path = project_root / 'assets' / 'tools' / 'jadx' / 'bin' / 'jadx.bat'
         
+        # Decompiler resources
+        self.apktool_heap_mb = DEFAULT_APKTOOL_HEAP_MB
+        self.jadx_heap_mb = DEFAULT_JADX_HEAP_MB
+        self.jadx_threads = default_jadx_threads()
+        self.orchestrator = DecompilerOrchestrator()
+        
         logger.info(f"Initialized MarsPro analyzer for APK: {self.apk_path}")
     
     def validate_apk(self) -> bool:
@@ -120,7 +174,7 @@ class MarsProAnalyzer:
         metadata = {
             'file_path': str(self.apk_path),
             'file_size': self.apk_path.stat().st_size,
-            'file_hash': self._calculate_file_hash(),
+            'file_hash': self._get_apk_hash(),
             'analysis_timestamp': datetime.now().isoformat()
         }
         
@@ -135,6 +189,12 @@ class MarsProAnalyzer:
         
         return metadata
     
+    def _get_apk_hash(self) -> str:
+        """Get the SHA256 hash of the APK file, calculated once."""
+        if self._apk_hash is None:
+            self._apk_hash = self._calculate_file_hash()
+        return self._apk_hash
+    
     def _calculate_file_hash(self) -> str:
         """Calculate SHA256 hash of the APK file."""
         sha256_hash = hashlib.sha256()
@@ -224,57 +284,204 @@ class MarsProAnalyzer:
         
         return metadata
     
-    def decompile_with_apktool(self) -> bool:
+    def _get_tool_version(self, tool: str, tool_path: Path) -> str:
         """
-        Decompile APK using APKTool.
+        Get the version of a decompiler, queried once per tool.
         
+        Args:
+            tool: Tool name
+            tool_path: Path to the tool's launcher
+            
         Returns:
-            True if successful, False otherwise
+            Version string safe for use in a path, 'unknown' if it cannot be queried
+        """
+        if tool not in self._tool_versions:
+            version = 'unknown'
+            try:
+                result = subprocess.run(
+                    [str(tool_path), '--version'],
+                    capture_output=True,
+                    text=True,
+                    timeout=60
+                )
+                lines = [line.strip() for line in result.stdout.splitlines() if line.strip()]
+                if result.returncode == 0 and lines:
+                    version = re.sub(r'[^A-Za-z0-9._-]', '_', lines[-1])
+            except (subprocess.TimeoutExpired, OSError) as e:
+                logger.debug(f"Could not query {tool} version: {e}")
+            self._tool_versions[tool] = version
+        return self._tool_versions[tool]
+    
+    def _decompilation_cache_path(self, tool: str, tool_path: Path) -> Path:
+        """Cache directory for the output of a tool version on this APK."""
+        version = self._get_tool_version(tool, tool_path)
+        return self.cache_dir / self._get_apk_hash() / f"{tool}-{version}"
+    
+    def _is_cached(self, cache_path: Path) -> bool:
+        """Check if a cache directory holds a completed decompilation."""
+        return (cache_path / self.CACHE_COMPLETE_MARKER).exists()
+    
+    def _staging_path(self, cache_path: Path) -> Path:
+        """Get an empty directory to decompile into before it enters the cache."""
+        staging_path = cache_path.with_name(cache_path.name + '.partial')
+        if staging_path.exists():
+            shutil.rmtree(staging_path)
+        staging_path.parent.mkdir(parents=True, exist_ok=True)
+        return staging_path
+    
+    def _commit_to_cache(self, tool: str, staging_path: Path, cache_path: Path) -> None:
+        """Move a finished decompilation into the cache and mark it complete."""
+        if cache_path.exists():
+            shutil.rmtree(cache_path)
+        staging_path.rename(cache_path)
+        marker = {
+            'tool': tool,
+            'version': self._tool_versions.get(tool, 'unknown'),
+            'apk_path': str(self.apk_path),
+            'apk_hash': self._get_apk_hash(),
+            'completed': datetime.now().isoformat()
+        }
+        (cache_path / self.CACHE_COMPLETE_MARKER).write_text(json.dumps(marker, indent=2))
+    
+    def _use_decompiled_output(self, tool: str, output_path: Path) -> None:
+        """Point the analysis steps and the source index at a decompilation."""
+        if tool == 'apktool':
+            self.apktool_output_dir = output_path
+        else:
+            self.jadx_output_dir = output_path
+        
+        # Each APK keeps its own source index next to its decompilations
+        index_path = output_path.parent / 'source_index.sqlite'
+        if index_path != self.source_index_path:
+            if self._source_index is not None:
+                self._source_index.close()
+                self._source_index = None
+            self.source_index_path = index_path
+        self._source_index_stale = True
+    
+    def _apk_to_decompile(self) -> Optional[Path]:
+        """Get the APK to decompile, the extracted APK for XAPK files."""
+        if self.apk_path.suffix.lower() == '.xapk':
+            extracted_apk = self.output_dir / 'extracted.apk'
+            if not extracted_apk.exists():
+                logger.error("XAPK extraction failed")
+                return None
+            return extracted_apk
+        return self.apk_path
+    
+    def _decompile_job(self, tool: str, apk: Path, output_path: Path) -> DecompileJob:
+        """Build the command line of a decompiler."""
+        if tool == 'apktool':
+            return DecompileJob(
+                name='apktool',
+                cmd=[
+                    str(self.apktool_path),
+                    'd',
+                    str(apk),
+                    '-o',
+                    str(output_path),
+                    '-f'  # Force overwrite
+                ],
+                heap_mb=self.apktool_heap_mb,
+                timeout=DEFAULT_APKTOOL_TIMEOUT
+            )
+        return DecompileJob(
+            name='jadx',
+            cmd=[
+                str(self.jadx_path),
+                '-j',
+                str(self.jadx_threads),
+                '-d',
+                str(output_path),
+                str(apk)
+            ],
+            heap_mb=self.jadx_heap_mb,
+            timeout=DEFAULT_JADX_TIMEOUT
+        )
+    
+    def decompile(self, tools: Sequence[str] = ('apktool', 'jadx')) -> Dict[str, bool]:
         """
-        logger.info("Decompiling APK with APKTool...")
+        Decompile the APK with several tools at once.
         
-        output_path = self.output_dir / 'apktool_output'
+        Tools with a cached decompilation of this APK are skipped, the others
+        run concurrently as far as memory allows.
         
-        try:
-            # Handle XAPK extraction if needed
-            apk_to_decompile = self.apk_path
-            if self.apk_path.suffix.lower() == '.xapk':
-                extracted_apk = self.output_dir / 'extracted.apk'
-                if extracted_apk.exists():
-                    apk_to_decompile = extracted_apk
-                else:
-                    logger.error("XAPK extraction failed")
-                    return False
-            
-            cmd = [
-                str(self.apktool_path),
-                'd',
-                str(apk_to_decompile),
-                '-o',
-                str(output_path),
-                '-f'  # Force overwrite
-            ]
-            
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=300  # 5 minutes timeout
-            )
+        Args:
+            tools: Tools to run, 'apktool' and/or 'jadx'
             
-            if result.returncode == 0:
-                logger.info("APKTool decompilation completed successfully")
-                return True
-            else:
-                logger.error(f"APKTool decompilation failed: {result.stderr}")
-                return False
+        Returns:
+            Dictionary mapping each tool to whether its output is available
+        """
+        results = {}
+        jobs = []
+        paths = {}
+        
+        for tool in tools:
+            label = self.DECOMPILER_LABELS[tool]
+            logger.info(f"Decompiling APK with {label}...")
+            try:
+                tool_path = self.apktool_path if tool == 'apktool' else self.jadx_path
+                cache_path = self._decompilation_cache_path(tool, tool_path)
+                if self._is_cached(cache_path):
+                    logger.info(f"Using cached {label} output: {cache_path}")
+                    self._use_decompiled_output(tool, cache_path)
+                    results[tool] = True
+                    continue
                 
-        except subprocess.TimeoutExpired:
-            logger.error("APKTool decompilation timed out")
-            return False
+                apk = self._apk_to_decompile()
+                if apk is None:
+                    results[tool] = False
+                    continue
+                
+                output_path = self._staging_path(cache_path)
+                jobs.append(self._decompile_job(tool, apk, output_path))
+                paths[tool] = (output_path, cache_path)
+            except Exception as e:
+                logger.error(f"Error during {label} decompilation: {e}")
+                results[tool] = False
+        
+        if not jobs:
+            return results
+        
+        try:
+            job_results = self.orchestrator.run(jobs)
         except Exception as e:
-            logger.error(f"Error during APKTool decompilation: {e}")
-            return False
+            logger.error(f"Error during decompilation: {e}")
+            job_results = {}
+        
+        for tool, (output_path, cache_path) in paths.items():
+            label = self.DECOMPILER_LABELS[tool]
+            result = job_results.get(tool)
+            if result is None:
+                results[tool] = False
+            elif result.success:
+                logger.info(f"{label} decompilation completed successfully")
+                try:
+                    self._commit_to_cache(tool, output_path, cache_path)
+                except OSError as e:
+                    logger.error(f"Error caching {label} output: {e}")
+                    results[tool] = False
+                    continue
+                self._use_decompiled_output(tool, cache_path)
+                results[tool] = True
+            elif result.timed_out:
+                logger.error(f"{label} decompilation timed out")
+                results[tool] = False
+            else:
+                output = '\n'.join(result.output_tail)
+                logger.error(f"{label} decompilation failed: {output}")
+                results[tool] = False
+        
+        return results
+    
+    def decompile_with_apktool(self) -> bool:
+        """
+        Decompile APK using APKTool.
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        return self.decompile(['apktool'])['apktool']
     
     def decompile_with_jadx(self) -> bool:
         """
@@ -283,48 +490,7 @@ class MarsProAnalyzer:
         Returns:
             True if successful, False otherwise
         """
-        logger.info("Decompiling APK with JADX...")
-        
-        output_path = self.output_dir / 'jadx_output'
-        
-        try:
-            # Handle XAPK extraction if needed
-            apk_to_decompile = self.apk_path
-            if self.apk_path.suffix.lower() == '.xapk':
-                extracted_apk = self.output_dir / 'extracted.apk'
-                if extracted_apk.exists():
-                    apk_to_decompile = extracted_apk
-                else:
-                    logger.error("XAPK extraction failed")
-                    return False
-            
-            cmd = [
-                str(self.jadx_path),
-                '-d',
-                str(output_path),
-                str(apk_to_decompile)
-            ]
-            
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=600  # 10 minutes timeout
-            )
-            
-            if result.returncode == 0:
-                logger.info("JADX decompilation completed successfully")
-                return True
-            else:
-                logger.error(f"JADX decompilation failed: {result.stderr}")
-                return False
-                
-        except subprocess.TimeoutExpired:
-            logger.error("JADX decompilation timed out")
-            return False
-        except Exception as e:
-            logger.error(f"Error during JADX decompilation: {e}")
-            return False
+        return self.decompile(['jadx'])['jadx']
     
     def analyze_manifest(self) -> Dict[str, Any]:
         """
@@ -335,7 +501,7 @@ class MarsProAnalyzer:
         """
         logger.info("Analyzing AndroidManifest.xml...")
         
-        manifest_path = self.output_dir / 'apktool_output' / 'AndroidManifest.xml'
+        manifest_path = self.apktool_output_dir / 'AndroidManifest.xml'
         
         if not manifest_path.exists():
             logger.error("AndroidManifest.xml not found")
@@ -441,8 +607,8 @@ class MarsProAnalyzer:
         logger.info("Analyzing native libraries...")
         
         lib_dirs = [
-            self.output_dir / 'apktool_output' / 'lib',
-            self.output_dir / 'apktool_output' / 'libs'
+            self.apktool_output_dir / 'lib',
+            self.apktool_output_dir / 'libs'
         ]
         
         native_libs = []
@@ -452,7 +618,7 @@ class MarsProAnalyzer:
                 for arch_dir in lib_dir.iterdir():
                     if arch_dir.is_dir():
                         for lib_file in arch_dir.glob('*.so'):
-                            native_libs.append(str(lib_file.relative_to(self.output_dir / 'apktool_output')))
+                            native_libs.append(str(lib_file.relative_to(self.apktool_output_dir)))
         
         self.analysis_results['native_libraries'] = native_libs
         logger.info(f"Found {len(native_libs)} native libraries")
@@ -467,77 +633,121 @@ class MarsProAnalyzer:
         """
         logger.info("Analyzing assets...")
         
-        assets_dir = self.output_dir / 'apktool_output' / 'assets'
+        assets_dir = self.apktool_output_dir / 'assets'
         assets = []
         
         if assets_dir.exists():
             for asset_file in assets_dir.rglob('*'):
                 if asset_file.is_file():
-                    assets.append(str(asset_file.relative_to(self.output_dir / 'apktool_output')))
+                    assets.append(str(asset_file.relative_to(self.apktool_output_dir)))
         
         self.analysis_results['assets'] = assets
         logger.info(f"Found {len(assets)} asset files")
         return assets
     
+    def _source_trees(self) -> List[Tuple[Path, Tuple[str, ...]]]:
+        """Decompiled trees to search, with the file types searched in each."""
+        trees = []
+        
+        # Smali and XML files in APKTool output
+        apktool_dir = self.apktool_output_dir
+        if apktool_dir.exists():
+            trees.append((apktool_dir, APKTOOL_SUFFIXES))
+        
+        # Java files in JADX output
+        jadx_dir = self.jadx_output_dir
+        if jadx_dir.exists():
+            trees.append((jadx_dir, JADX_SUFFIXES))
+        
+        return trees
+    
+    def get_source_index(self) -> Optional[SourceIndex]:
+        """
+        Get the source index, bringing it up to date if the trees changed.
+        
+        Returns:
+            The index, or None if indexing is disabled or unsupported
+        """
+        if not self.use_index:
+            return None
+        
+        try:
+            if self._source_index is None:
+                self._source_index = SourceIndex(self.source_index_path)
+            if self._source_index_stale:
+                self._source_index.update(self._source_trees())
+                self._source_index_stale = False
+        except sqlite3.Error as e:
+            logger.warning(f"Source index unavailable, searching files directly: {e}")
+            self.use_index = False
+            return None
+        
+        return self._source_index
+    
+    def find_string_hits(self, patterns: List[str]) -> List[SearchHit]:
+        """
+        Find every occurrence of the patterns in decompiled code.
+        
+        Queries are answered from the source index when available. Otherwise
+        each smali, XML and Java file is read once and matched against all
+        patterns in a single pass, with the files sharded across worker processes.
+        
+        Args:
+            patterns: Literal strings to search for, matched case-insensitively
+            
+        Returns:
+            List of hits with the file, line and offset of each match
+        """
+        trees = self._source_trees()
+        index = self.get_source_index()
+        if index is not None:
+            return index.search(patterns, roots=[root for root, _ in trees])
+        
+        searcher = MultiPatternSearcher(patterns)
+        return list(searcher.search_trees(trees, workers=self.workers))
+    
+    def find_regex_hits(self, pattern: str) -> List[SearchHit]:
+        """
+        Find every match of a regular expression in decompiled code.
+        
+        Args:
+            pattern: Regular expression, matched case-insensitively
+            
+        Returns:
+            List of hits with the matched text, file, line and offset
+        """
+        trees = self._source_trees()
+        index = self.get_source_index()
+        if index is not None:
+            return list(index.search_regex(pattern, roots=[root for root, _ in trees]))
+        
+        regex = re.compile(pattern, re.IGNORECASE)
+        hits = []
+        for root, suffixes in trees:
+            for path in iter_source_files(root, suffixes):
+                try:
+                    content = path.read_text(encoding='utf-8', errors='ignore')
+                except OSError as e:
+                    logger.debug(f"Error reading {path}: {e}")
+                    continue
+                for match in regex.finditer(content):
+                    line = content.count('\n', 0, match.start()) + 1
+                    hits.append(SearchHit(match.group(0), str(path.relative_to(root)), line, match.start()))
+        return hits
+    
     def search_for_strings(self, patterns: List[str]) -> Dict[str, List[str]]:
         """
         Search for specific string patterns in decompiled code.
         
         Args:
-            patterns: List of regex patterns to search for
+            patterns: List of string patterns to search for
             
         Returns:
             Dictionary mapping patterns to found strings
         """
         logger.info("Searching for string patterns...")
         
-        results = {}
-        
-        # Search in APKTool output
-        apktool_dir = self.output_dir / 'apktool_output'
-        if apktool_dir.exists():
-            for pattern in patterns:
-                results[pattern] = []
-                
-                # Search in smali files
-                for smali_file in apktool_dir.rglob('*.smali'):
-                    try:
-                        with open(smali_file, 'r', encoding='utf-8', errors='ignore') as f:
-                            content = f.read()
-                            if pattern.lower() in content.lower():
-                                results[pattern].append(str(smali_file.relative_to(apktool_dir)))
-                    except Exception as e:
-                        logger.debug(f"Error reading {smali_file}: {e}")
-                
-                # Search in XML files
-                for xml_file in apktool_dir.rglob('*.xml'):
-                    try:
-                        with open(xml_file, 'r', encoding='utf-8', errors='ignore') as f:
-                            content = f.read()
-                            if pattern.lower() in content.lower():
-                                results[pattern].append(str(xml_file.relative_to(apktool_dir)))
-                    except Exception as e:
-                        logger.debug(f"Error reading {xml_file}: {e}")
-        
-        # Search in JADX output
-        jadx_dir = self.output_dir / 'jadx_output'
-        if jadx_dir.exists():
-            for pattern in patterns:
-                if pattern not in results:
-                    results[pattern] = []
-                
-                # Search in Java files
-                for java_file in jadx_dir.rglob('*.java'):
-                    try:
-                        with open(java_file, 'r', encoding='utf-8', errors='ignore') as f:
-                            content = f.read()
-                            if pattern.lower() in content.lower():
-                                results[pattern].append(str(java_file.relative_to(jadx_dir)))
-                    except Exception as e:
-                        logger.debug(f"Error reading {java_file}: {e}")
-        
-        # Filter out empty results
-        results = {k: v for k, v in results.items() if v}
+        results = group_files_by_pattern(patterns, self.find_string_hits(patterns))
         
         logger.info(f"String search completed. Found matches for {len(results)} patterns")
         return results
@@ -833,12 +1043,11 @@ class MarsProAnalyzer:
             # Step 2: Extract metadata
             self.extract_apk_metadata()
             
-            # Step 3: Decompile with APKTool
-            if not self.decompile_with_apktool():
+            # Steps 3 and 4: Decompile with APKTool and JADX concurrently
+            decompiled = self.decompile()
+            if not decompiled['apktool']:
                 logger.warning("APKTool decompilation failed, continuing with available data")
-            
-            # Step 4: Decompile with JADX
-            if not self.decompile_with_jadx():
+            if not decompiled['jadx']:
                 logger.warning("JADX decompilation failed, continuing with available data")
             
             # Step 5: Analyze manifest
@@ -886,6 +1095,11 @@ def main():
     parser = argparse.ArgumentParser(description='MarsPro Reverse Engineering Analysis')
     parser.add_argument('apk_path', help='Path to the MarsPro APK file')
     parser.add_argument('--output-dir', help='Output directory for analysis results')
+    parser.add_argument('--workers', type=int, help='Processes used to scan decompiled code (default: CPU count)')
+    parser.add_argument('--no-index', action='store_true', help='Search decompiled files directly instead of the source index')
+    parser.add_argument('--apktool-heap', type=int, default=DEFAULT_APKTOOL_HEAP_MB, help='APKTool JVM heap in MB')
+    parser.add_argument('--jadx-heap', type=int, default=DEFAULT_JADX_HEAP_MB, help='JADX JVM heap in MB')
+    parser.add_argument('--jadx-threads', type=int, help='JADX decompilation threads (default: CPU count - 1)')
     parser.add_argument('--verbose', '-v', action='store_true', help='Enable verbose logging')
     
     args = parser.parse_args()
@@ -894,7 +1108,16 @@ def main():
         logging.getLogger().setLevel(logging.DEBUG)
     
     # Create analyzer and run analysis
-    analyzer = MarsProAnalyzer(args.apk_path, args.output_dir)
+    analyzer = MarsProAnalyzer(
+        args.apk_path,
+        args.output_dir,
+        workers=args.workers,
+        use_index=not args.no_index
+    )
+    analyzer.apktool_heap_mb = args.apktool_heap
+    analyzer.jadx_heap_mb = args.jadx_heap
+    if args.jadx_threads:
+        analyzer.jadx_threads = args.jadx_threads
     results = analyzer.run_complete_analysis()
     
     if results['success']:
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Persistent inverted index over decompiled MarsPro sources.
+
+The smali, XML and Java files of a decompilation are stored in an SQLite FTS5
+table with the trigram tokenizer, so substring queries are answered from the
+index instead of rescanning the output trees. The index is updated
+incrementally: files whose mtime and size are unchanged are skipped, and files
+whose content hash is unchanged are not re-indexed.
+"""
+
+import re
+import hashlib
+import logging
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from scripts.source_search import MultiPatternSearcher, SearchHit, iter_source_files
+
+logger = logging.getLogger(__name__)
+
+# Shortest pattern the trigram tokenizer can look up
+MIN_TRIGRAM_LENGTH = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    root TEXT NOT NULL,
+    path TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    UNIQUE (root, path)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS file_content USING fts5(body, tokenize='trigram');
+"""
+
+
+class SourceIndex:
+    """Trigram full-text index of decompiled source trees."""
+
+    def __init__(self, db_path: Path):
+        """
+        Open or create the index.
+
+        Args:
+            db_path: SQLite database file
+
+        Raises:
+            sqlite3.Error: If SQLite lacks FTS5 or the trigram tokenizer
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path))
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """Close the database."""
+        self._conn.close()
+
+    def update(self, trees: Sequence[Tuple[Path, Tuple[str, ...]]]) -> Dict[str, int]:
+        """
+        Bring the index in line with the files currently on disk.
+
+        Files under directories other than the given trees are removed.
+
+        Args:
+            trees: Pairs of directory and file suffixes to index in it
+
+        Returns:
+            Counts of added, updated, unchanged and removed files
+        """
+        stats = {'added': 0, 'updated': 0, 'unchanged': 0, 'removed': 0}
+
+        with self._conn:
+            # Drop trees that are no longer indexed, e.g. output of an older tool version
+            roots = [str(root) for root, _ in trees]
+            stale_ids = [
+                file_id for file_id, root in self._conn.execute('SELECT id, root FROM files')
+                if root not in roots
+            ]
+            for file_id in stale_ids:
+                self._conn.execute('DELETE FROM files WHERE id = ?', (file_id,))
+                self._conn.execute('DELETE FROM file_content WHERE rowid = ?', (file_id,))
+            stats['removed'] += len(stale_ids)
+
+            for root, suffixes in trees:
+                root_key = str(root)
+                known = {
+                    path: (file_id, mtime_ns, size, sha256)
+                    for file_id, path, mtime_ns, size, sha256 in self._conn.execute(
+                        'SELECT id, path, mtime_ns, size, sha256 FROM files WHERE root = ?',
+                        (root_key,),
+                    )
+                }
+                seen: Set[str] = set()
+
+                for file_path in iter_source_files(root, suffixes):
+                    rel_path = str(file_path.relative_to(root))
+                    seen.add(rel_path)
+                    try:
+                        stat = file_path.stat()
+                        entry = known.get(rel_path)
+                        if entry and entry[1] == stat.st_mtime_ns and entry[2] == stat.st_size:
+                            stats['unchanged'] += 1
+                            continue
+                        data = file_path.read_bytes()
+                    except OSError as e:
+                        logger.debug(f"Error reading {file_path}: {e}")
+                        continue
+
+                    sha256 = hashlib.sha256(data).hexdigest()
+                    if entry and entry[3] == sha256:
+                        # Touched but not modified
+                        self._conn.execute(
+                            'UPDATE files SET mtime_ns = ?, size = ? WHERE id = ?',
+                            (stat.st_mtime_ns, stat.st_size, entry[0]),
+                        )
+                        stats['unchanged'] += 1
+                        continue
+
+                    body = data.decode('utf-8', errors='ignore')
+                    if entry:
+                        self._conn.execute(
+                            'UPDATE files SET mtime_ns = ?, size = ?, sha256 = ? WHERE id = ?',
+                            (stat.st_mtime_ns, stat.st_size, sha256, entry[0]),
+                        )
+                        self._conn.execute('DELETE FROM file_content WHERE rowid = ?', (entry[0],))
+                        file_id = entry[0]
+                        stats['updated'] += 1
+                    else:
+                        cursor = self._conn.execute(
+                            'INSERT INTO files (root, path, mtime_ns, size, sha256) VALUES (?, ?, ?, ?, ?)',
+                            (root_key, rel_path, stat.st_mtime_ns, stat.st_size, sha256),
+                        )
+                        file_id = cursor.lastrowid
+                        stats['added'] += 1
+                    self._conn.execute(
+                        'INSERT INTO file_content (rowid, body) VALUES (?, ?)', (file_id, body)
+                    )
+
+                for rel_path in known.keys() - seen:
+                    file_id = known[rel_path][0]
+                    self._conn.execute('DELETE FROM files WHERE id = ?', (file_id,))
+                    self._conn.execute('DELETE FROM file_content WHERE rowid = ?', (file_id,))
+                    stats['removed'] += 1
+
+        logger.info(
+            f"Source index updated: {stats['added']} added, {stats['updated']} updated, "
+            f"{stats['unchanged']} unchanged, {stats['removed']} removed"
+        )
+        return stats
+
+    def search(self, patterns: Iterable[str], roots: Optional[Iterable[Path]] = None) -> List[SearchHit]:
+        """
+        Find every occurrence of literal patterns, matched case-insensitively.
+
+        Args:
+            patterns: Literal strings to search for
+            roots: Trees to search, all indexed trees if None
+
+        Returns:
+            Hits with the file, line and offset of each match
+        """
+        searcher = MultiPatternSearcher(patterns)
+        if not searcher.patterns:
+            return []
+
+        root_clause, params = self._root_clause(roots)
+        if any(len(p) < MIN_TRIGRAM_LENGTH for p in searcher.patterns):
+            # Too short for a trigram lookup, every file is a candidate
+            rows = self._conn.execute(
+                'SELECT f.path, c.body FROM files f JOIN file_content c ON c.rowid = f.id '
+                f'WHERE 1{root_clause}',
+                params,
+            )
+        else:
+            query = ' OR '.join('"' + p.replace('"', '""') + '"' for p in searcher.patterns)
+            rows = self._conn.execute(
+                'SELECT f.path, c.body FROM file_content c JOIN files f ON f.id = c.rowid '
+                f'WHERE file_content MATCH ?{root_clause}',
+                [query] + params,
+            )
+
+        hits = []
+        for path, body in rows:
+            hits.extend(searcher.search_text(body, path))
+        return hits
+
+    def search_regex(
+        self,
+        pattern: str,
+        flags: int = re.IGNORECASE,
+        roots: Optional[Iterable[Path]] = None
+    ) -> Iterator[SearchHit]:
+        """
+        Find every match of a regular expression in the indexed files.
+
+        Args:
+            pattern: Regular expression
+            flags: Flags the expression is compiled with
+            roots: Trees to search, all indexed trees if None
+
+        Returns:
+            Iterator over hits, the hit pattern being the matched text
+        """
+        regex = re.compile(pattern, flags)
+        root_clause, params = self._root_clause(roots)
+        # Regexes have no trigram lookup, but the stored bodies spare the filesystem walk
+        rows = self._conn.execute(
+            'SELECT f.path, c.body FROM files f JOIN file_content c ON c.rowid = f.id '
+            f'WHERE 1{root_clause}',
+            params,
+        )
+        for path, body in rows:
+            line = 1
+            line_pos = 0
+            for match in regex.finditer(body):
+                pos = match.start()
+                line += body.count('\n', line_pos, pos)
+                line_pos = pos
+                yield SearchHit(match.group(0), path, line, pos)
+
+    @staticmethod
+    def _root_clause(roots: Optional[Iterable[Path]]) -> Tuple[str, List[str]]:
+        """Build the SQL condition limiting a query to some trees, and its parameters."""
+        if roots is None:
+            return '', []
+        keys = [str(root) for root in roots]
+        return f" AND f.root IN ({', '.join('?' * len(keys))})", keys
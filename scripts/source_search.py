@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Multi-pattern source search for decompiled MarsPro output.
+
+Every file is read once and all patterns are matched in a single pass: a
+combined, case-insensitive regex finds each position where some pattern starts,
+and only the patterns sharing that first character are compared there. Patterns
+that overlap or contain one another (e.g. 'api.' and '.com/api') are all
+reported.
+
+Large trees can be sharded across a process pool: files are grouped into
+chunks, each worker searches whole chunks with its own searcher, and hits are
+streamed back as chunks complete.
+"""
+
+import os
+import re
+import logging
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# File types searched in apktool and jadx output
+APKTOOL_SUFFIXES = ('.smali', '.xml')
+JADX_SUFFIXES = ('.java',)
+
+# Files per work unit sent to a worker process
+DEFAULT_CHUNK_SIZE = 64
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    """One occurrence of a pattern in a file."""
+    pattern: str
+    file: str
+    line: int
+    offset: int
+
+
+def iter_source_files(root: Path, suffixes: Tuple[str, ...]) -> Iterator[Path]:
+    """
+    Walk a directory tree once, yielding files with one of the given suffixes.
+
+    Args:
+        root: Directory to walk
+        suffixes: File suffixes to include, e.g. ('.smali', '.xml')
+
+    Returns:
+        Iterator over matching file paths
+    """
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            if filename.endswith(suffixes):
+                yield Path(dirpath) / filename
+
+
+class MultiPatternSearcher:
+    """Case-insensitive literal search for many patterns at once."""
+
+    def __init__(self, patterns: Iterable[str]):
+        """
+        Initialize the searcher.
+
+        Args:
+            patterns: Literal strings to search for, matched case-insensitively
+        """
+        # Keep the caller's order, drop duplicates and empty patterns
+        self.patterns: List[str] = list(dict.fromkeys(p for p in patterns if p))
+        self._by_first_char: Dict[str, List[Tuple[str, str]]] = {}
+        for pattern in self.patterns:
+            lowered = pattern.lower()
+            self._by_first_char.setdefault(lowered[0], []).append((pattern, lowered))
+
+        # A zero-width lookahead so overlapping matches are not consumed
+        alternation = '|'.join(
+            re.escape(p) for p in sorted(self.patterns, key=len, reverse=True)
+        )
+        self._regex = re.compile(f'(?=(?:{alternation}))', re.IGNORECASE) if self.patterns else None
+
+    def search_text(self, text: str, file: str = '') -> List[SearchHit]:
+        """
+        Find every pattern occurrence in a text.
+
+        Args:
+            text: Content to search
+            file: File name recorded in the hits
+
+        Returns:
+            Hits ordered by offset, with 1-based line numbers
+        """
+        if self._regex is None:
+            return []
+
+        hits = []
+        line = 1
+        line_pos = 0
+        for match in self._regex.finditer(text):
+            pos = match.start()
+            candidates = self._by_first_char.get(text[pos].lower(), ())
+            for pattern, lowered in candidates:
+                if text[pos:pos + len(lowered)].lower() != lowered:
+                    continue
+                # Count newlines incrementally since hits arrive in order
+                line += text.count('\n', line_pos, pos)
+                line_pos = pos
+                hits.append(SearchHit(pattern, file, line, pos))
+        return hits
+
+    def search_file(self, path: Path, relative_to: Optional[Path] = None) -> List[SearchHit]:
+        """
+        Read a file once and find every pattern occurrence in it.
+
+        Args:
+            path: File to search
+            relative_to: Directory the recorded file name is relative to
+
+        Returns:
+            Hits in the file, empty if it could not be read
+        """
+        try:
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                content = f.read()
+        except OSError as e:
+            logger.debug(f"Error reading {path}: {e}")
+            return []
+
+        name = str(path.relative_to(relative_to)) if relative_to else str(path)
+        return self.search_text(content, name)
+
+    def search_tree(self, root: Path, suffixes: Tuple[str, ...]) -> Iterator[SearchHit]:
+        """
+        Search every matching file under a directory.
+
+        Args:
+            root: Directory to search
+            suffixes: File suffixes to include
+
+        Returns:
+            Iterator over hits, file by file
+        """
+        for path in iter_source_files(root, suffixes):
+            yield from self.search_file(path, relative_to=root)
+
+    def search_trees(
+        self,
+        trees: Sequence[Tuple[Path, Tuple[str, ...]]],
+        workers: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> Iterator[SearchHit]:
+        """
+        Search several directory trees, sharding the files across processes.
+
+        Args:
+            trees: Pairs of directory and file suffixes to search in it
+            workers: Worker processes, defaults to the CPU count; 1 searches in-process
+            chunk_size: Files per work unit
+
+        Returns:
+            Iterator over hits, streamed chunk by chunk as workers finish
+        """
+        chunks = []
+        for root, suffixes in trees:
+            files = [str(path) for path in iter_source_files(root, suffixes)]
+            for start in range(0, len(files), chunk_size):
+                chunks.append((str(root), files[start:start + chunk_size]))
+
+        workers = workers or os.cpu_count() or 1
+        # A pool costs more to start than a handful of files take to search
+        if workers <= 1 or len(chunks) <= 1:
+            for root, files in chunks:
+                yield from _search_chunk_with(self, root, files)
+            return
+
+        workers = min(workers, len(chunks))
+        logger.debug(f"Searching {len(chunks)} chunks with {workers} worker processes")
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(self.patterns,),
+        ) as executor:
+            # Keep a bounded number of chunks in flight so hits stream back early
+            pending = iter(chunks)
+            in_flight: Set[Future] = set()
+            for root, files in pending:
+                in_flight.add(executor.submit(_search_chunk, root, files))
+                if len(in_flight) >= workers * 2:
+                    break
+            while in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+                    chunk = next(pending, None)
+                    if chunk is not None:
+                        in_flight.add(executor.submit(_search_chunk, *chunk))
+
+
+# Searcher of the current worker process, built once by the pool initializer
+_worker_searcher: Optional[MultiPatternSearcher] = None
+
+
+def _init_worker(patterns: List[str]) -> None:
+    """Build the worker's searcher so patterns are compiled once per process."""
+    global _worker_searcher
+    _worker_searcher = MultiPatternSearcher(patterns)
+
+
+def _search_chunk(root: str, files: List[str]) -> List[SearchHit]:
+    """Search one chunk of files in a worker process."""
+    return _search_chunk_with(_worker_searcher, root, files)
+
+
+def _search_chunk_with(searcher: MultiPatternSearcher, root: str, files: List[str]) -> List[SearchHit]:
+    """Search a chunk of files with the given searcher."""
+    root_path = Path(root)
+    hits = []
+    for file in files:
+        hits.extend(searcher.search_file(Path(file), relative_to=root_path))
+    return hits
+
+
+def group_files_by_pattern(patterns: Iterable[str], hits: Iterable[SearchHit]) -> Dict[str, List[str]]:
+    """
+    Collapse hits to the files each pattern was found in.
+
+    Args:
+        patterns: Patterns in the order the result should use
+        hits: Search hits
+
+    Returns:
+        Dictionary mapping each found pattern to its files, without duplicates
+    """
+    files: Dict[str, Dict[str, None]] = {pattern: {} for pattern in patterns}
+    for hit in hits:
+        files.setdefault(hit.pattern, {})[hit.file] = None
+    return {pattern: list(found) for pattern, found in files.items() if found}
@@ -3,22 +3,34 @@ from __future__ import annotations
 
 import asyncio
 import logging
+from datetime import timedelta
 from typing import Any
 
 import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_EMAIL, CONF_PASSWORD, Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.event import async_track_time_interval
 
 from .const import (
+    CONF_BLE_ADAPTERS,
     CONF_BLE_MAC,
     CONF_USE_CLOUD,
+    CONF_USE_HA_SESSION,
+    DEFAULT_BLE_IDLE_EVICT_INTERVAL,
     DOMAIN,
     PLATFORMS,
 )
 from .api import MarsProAPI
+from .session import (
+    async_get_shared_connection_manager,
+    async_get_shared_session,
+    async_release_shared_connection_manager,
+    async_release_shared_session,
+)
 from .coordinator import MarsProDataUpdateCoordinator
 
 _LOGGER = logging.getLogger(__name__)
@@ -40,31 +52,83 @@ CONFIG_SCHEMA = vol.Schema(
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up MarsPro from a config entry."""
     hass.data.setdefault(DOMAIN, {})
+    use_cloud = entry.data.get(CONF_USE_CLOUD, False)
+    use_ha_session = entry.data.get(CONF_USE_HA_SESSION, False)
+
+    # Local entries share one BLE session pool across the instance,
+    # cloud entries one HTTP session
+    # Comma-separated HCI adapters, e.g. "hci0,hci1"
+    adapters = [
+        adapter.strip()
+        for adapter in entry.data.get(CONF_BLE_ADAPTERS, "").split(",")
+        if adapter.strip()
+    ]
+    connection_manager = (
+        None if use_cloud else async_get_shared_connection_manager(hass, adapters)
+    )
+    session = async_get_shared_session(hass, use_ha_session) if use_cloud else None
 
     # Create API instance
     api = MarsProAPI(
         email=entry.data[CONF_EMAIL],
         password=entry.data[CONF_PASSWORD],
-        use_cloud=entry.data.get(CONF_USE_CLOUD, False),
+        use_cloud=use_cloud,
         ble_mac=entry.data.get(CONF_BLE_MAC),
+        connection_manager=connection_manager,
+        session=session,
     )
 
-    # Test connection
+    coordinator: MarsProDataUpdateCoordinator | None = None
     try:
-        await api.test_connection()
-    except Exception as ex:
-        _LOGGER.error("Failed to connect to MarsPro: %s", ex)
-        raise ConfigEntryNotReady from ex
-
-    # Create coordinator
-    coordinator = MarsProDataUpdateCoordinator(hass, api)
-    await coordinator.async_config_entry_first_refresh()
-
-    # Store coordinator
-    hass.data[DOMAIN][entry.entry_id] = coordinator
-
-    # Set up platforms
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+        # Test connection
+        try:
+            await api.test_connection()
+        except Exception as ex:
+            _LOGGER.error("Failed to connect to MarsPro: %s", ex)
+            raise ConfigEntryNotReady from ex
+
+        # Create coordinator
+        coordinator = MarsProDataUpdateCoordinator(hass, api)
+        await coordinator.async_config_entry_first_refresh()
+
+        # Prefer notifications over polling where the devices support them
+        await coordinator.async_enable_push()
+        await coordinator.async_start_passive_telemetry()
+
+        # Store coordinator
+        hass.data[DOMAIN][entry.entry_id] = coordinator
+
+        # Set up platforms
+        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    except BaseException:
+        # Setup is retried from scratch, so hand back everything acquired so far
+        hass.data[DOMAIN].pop(entry.entry_id, None)
+        try:
+            if coordinator:
+                await coordinator.async_stop_passive_telemetry()
+            await api.disconnect()
+        finally:
+            if session:
+                await async_release_shared_session(hass, use_ha_session)
+            if connection_manager:
+                await async_release_shared_connection_manager(hass)
+        raise
+
+    # Options such as optimistic state only take effect on reload
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+
+    # Periodically drop pooled BLE sessions nobody is using
+    if connection_manager:
+        async def _async_evict_idle(_now: Any) -> None:
+            await connection_manager.async_evict_idle()
+
+        entry.async_on_unload(
+            async_track_time_interval(
+                hass,
+                _async_evict_idle,
+                timedelta(seconds=DEFAULT_BLE_IDLE_EVICT_INTERVAL),
+            )
+        )
 
     return True
 
@@ -73,11 +137,24 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await coordinator.async_stop_passive_telemetry()
         await coordinator.api.disconnect()
+        if entry.data.get(CONF_USE_CLOUD, False):
+            await async_release_shared_session(
+                hass, entry.data.get(CONF_USE_HA_SESSION, False)
+            )
+        else:
+            # The last local entry disconnects the pooled BLE links
+            await async_release_shared_connection_manager(hass)
 
     return unload_ok
 
 
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload a config entry after its options changed."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_migrate_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
     """Migrate old entry."""
     _LOGGER.debug("Migrating from version %s", config_entry.version)
@@ -85,8 +162,19 @@ async def async_migrate_entry(hass: HomeAssistant, config_entry: ConfigEntry) ->
     if config_entry.version == 1:
         # Add new config options
         new_data = {**config_entry.data}
-        new_data[CONF_USE_CLOUD] = False
-        
+        new_data.setdefault(CONF_USE_CLOUD, False)
+
+        # Version 1 gave a device's fan and light the same unique_id
+        @callback
+        def _async_migrate_unique_id(entity_entry: er.RegistryEntry) -> dict[str, Any] | None:
+            if entity_entry.domain not in (Platform.FAN, Platform.LIGHT):
+                return None
+            if entity_entry.unique_id.endswith(f"_{entity_entry.domain}"):
+                return None
+            return {"new_unique_id": f"{entity_entry.unique_id}_{entity_entry.domain}"}
+
+        await er.async_migrate_entries(hass, config_entry.entry_id, _async_migrate_unique_id)
+
         config_entry.version = 2
         hass.config_entries.async_update_entry(config_entry, data=new_data)
 
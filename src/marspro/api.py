@@ -2,7 +2,7 @@
 
 import asyncio
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import aiohttp
 from bleak import BleakClient, BleakScanner
@@ -13,15 +13,33 @@ from .const import (
     API_VERSION,
     BLE_SERVICE_UUID,
     BLE_CHARACTERISTIC_UUID,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_STATUS_BATCH_SIZE,
     DEFAULT_TIMEOUT,
     ERROR_CONNECTION_FAILED,
     ERROR_AUTHENTICATION_FAILED,
     ERROR_DEVICE_NOT_FOUND,
     ERROR_COMMAND_FAILED,
 )
+from .auth import MarsProTokenManager, parse_expires_at
+from .command_queue import MarsProCommandQueue
+from .connection_manager import MarsProConnectionManager
+from .frame_decoder import RAW_FRAME_KEY, decode_frame
+from .session import create_session
 
 _LOGGER = logging.getLogger(__name__)
 
+StatusCallback = Callable[[str, Dict[str, Any]], None]
+
+
+class MarsProRequestError(ValueError):
+    """Error to indicate a cloud request returned an unexpected status."""
+
+    def __init__(self, message: str, status: int) -> None:
+        """Initialize the error."""
+        super().__init__(f"{message}: {status}")
+        self.status = status
+
 
 class MarsProAPI:
     """API client for MarsPro devices."""
@@ -32,16 +50,38 @@ class MarsProAPI:
         password: str,
         use_cloud: bool = False,
         ble_mac: Optional[str] = None,
+        connection_manager: Optional[MarsProConnectionManager] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+        adapters: Optional[List[str]] = None,
     ) -> None:
         """Initialize the API client."""
         self.email = email
         self.password = password
         self.use_cloud = use_cloud
         self.ble_mac = ble_mac
-        self.session: Optional[aiohttp.ClientSession] = None
+        # Several adapters need a connection manager to schedule across them
+        self._owns_manager = False
+        if adapters and not use_cloud:
+            if connection_manager:
+                connection_manager.add_adapters(adapters)
+            else:
+                connection_manager = MarsProConnectionManager(adapters=adapters)
+                self._owns_manager = True
+        self.connection_manager = connection_manager
+        self.session: Optional[aiohttp.ClientSession] = session
+        # A session passed in is shared and closed by its owner
+        self._owns_session = session is None
         self.ble_client: Optional[BleakClient] = None
         self.auth_token: Optional[str] = None
+        self.token_manager = MarsProTokenManager(self._login)
         self.devices: Dict[str, Dict[str, Any]] = {}
+        self.command_queue = MarsProCommandQueue(self._write_ble_payload)
+        self._subscriptions: Dict[str, StatusCallback] = {}
+        # Client the notifications were started on; a reconnect replaces the client
+        self._notify_client: Optional[BleakClient] = None
+        self._timeout = aiohttp.ClientTimeout(total=DEFAULT_TIMEOUT)
+        # None until the bulk status endpoint has been tried
+        self._bulk_status_supported: Optional[bool] = None
 
     async def test_connection(self) -> bool:
         """Test the connection to MarsPro."""
@@ -57,11 +97,12 @@ class MarsProAPI:
     async def _test_cloud_connection(self) -> bool:
         """Test cloud API connection."""
         if not self.session:
-            self.session = aiohttp.ClientSession()
+            self.session = create_session()
+            self._owns_session = True
 
         try:
             # Try to authenticate
-            await self._authenticate()
+            await self.token_manager.async_refresh()
             return True
         except Exception as ex:
             _LOGGER.error("Cloud connection test failed: %s", ex)
@@ -81,8 +122,18 @@ class MarsProAPI:
             _LOGGER.error("BLE connection test failed: %s", ex)
             return False
 
-    async def _authenticate(self) -> None:
-        """Authenticate with the cloud API."""
+    async def _login(self) -> Tuple[str, Optional[float]]:
+        """Log in for the token manager."""
+        expires_at = await self._authenticate()
+        return self.auth_token, expires_at  # type: ignore
+
+    async def _authenticate(self) -> Optional[float]:
+        """
+        Authenticate with the cloud API.
+
+        Returns:
+            Token expiry as a timestamp, if the response includes one
+        """
         if not self.session:
             raise RuntimeError("Session not initialized")
 
@@ -95,28 +146,78 @@ class MarsProAPI:
             async with self.session.post(
                 f"{API_BASE_URL}/{API_VERSION}/auth/login",
                 json=auth_data,
-                timeout=aiohttp.ClientTimeout(total=DEFAULT_TIMEOUT),
+                timeout=self._timeout,
             ) as response:
                 if response.status == 200:
                     data = await response.json()
                     self.auth_token = data.get("token")
                     if not self.auth_token:
                         raise ValueError("No auth token in response")
+                    return parse_expires_at(data.get("expires_at"))
                 else:
                     raise ValueError(f"Authentication failed: {response.status}")
         except Exception as ex:
             _LOGGER.error("Authentication failed: %s", ex)
             raise
 
+    async def _cloud_request(
+        self, method: str, path: str, error: str, **kwargs: Any
+    ) -> Dict[str, Any]:
+        """
+        Make an authenticated cloud request.
+
+        A request rejected with 401 is replayed once with a fresh token.
+
+        Args:
+            method: HTTP method
+            path: Path below the versioned API base URL
+            error: Message prefix for unexpected statuses
+        """
+        if not self.session:
+            raise RuntimeError("Session not initialized")
+
+        for attempt in range(2):
+            token = await self.token_manager.async_get_token()
+            async with self.session.request(
+                method,
+                f"{API_BASE_URL}/{API_VERSION}{path}",
+                headers={"Authorization": f"Bearer {token}"},
+                timeout=self._timeout,
+                **kwargs,
+            ) as response:
+                if response.status == 401 and attempt == 0:
+                    _LOGGER.debug("Token rejected, re-authenticating")
+                    self.token_manager.invalidate(token)
+                    continue
+                if response.status != 200:
+                    raise MarsProRequestError(error, response.status)
+                return await response.json()
+
+        raise MarsProRequestError(error, 401)
+
     async def _connect_ble(self) -> None:
         """Connect to device via BLE."""
         if not self.ble_mac:
             raise ValueError("BLE MAC address not provided")
 
         try:
-            self.ble_client = BleakClient(self.ble_mac)
-            await self.ble_client.connect(timeout=DEFAULT_TIMEOUT)
+            if self.connection_manager:
+                if self.ble_client:
+                    # Drop our claim on the stale session before re-acquiring
+                    self.connection_manager.release(self.ble_mac)
+                self.ble_client = await self.connection_manager.acquire(self.ble_mac)
+            else:
+                self.ble_client = BleakClient(self.ble_mac)
+                await self.ble_client.connect(timeout=DEFAULT_TIMEOUT)
             _LOGGER.info("Connected to MarsPro device via BLE")
+
+            # Notifications do not survive a reconnect
+            if self._subscriptions:
+                try:
+                    await self._start_notify()
+                except Exception as ex:
+                    # Status reads still work, push_active reports the loss
+                    _LOGGER.warning("Failed to restart BLE notifications: %s", ex)
         except BleakError as ex:
             _LOGGER.error("BLE connection failed: %s", ex)
             raise
@@ -130,22 +231,9 @@ class MarsProAPI:
 
     async def _get_devices_cloud(self) -> List[Dict[str, Any]]:
         """Get devices from cloud API."""
-        if not self.session or not self.auth_token:
-            await self._authenticate()
-
-        headers = {"Authorization": f"Bearer {self.auth_token}"}
-
         try:
-            async with self.session.get(
-                f"{API_BASE_URL}/{API_VERSION}/devices",
-                headers=headers,
-                timeout=aiohttp.ClientTimeout(total=DEFAULT_TIMEOUT),
-            ) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return data.get("devices", [])
-                else:
-                    raise ValueError(f"Failed to get devices: {response.status}")
+            data = await self._cloud_request("GET", "/devices", "Failed to get devices")
+            return data.get("devices", [])
         except Exception as ex:
             _LOGGER.error("Failed to get devices from cloud: %s", ex)
             raise
@@ -182,14 +270,22 @@ class MarsProAPI:
         else:
             return await self._send_command_ble(device_id, command, **kwargs)
 
+    async def send_commands(
+        self, device_id: str, commands: List[Tuple[str, Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        """Send several commands to a device, batched into one write over BLE."""
+        if self.use_cloud:
+            return [
+                await self._send_command_cloud(device_id, command, **kwargs)
+                for command, kwargs in commands
+            ]
+        else:
+            return await self._send_commands_ble(device_id, commands)
+
     async def _send_command_cloud(
         self, device_id: str, command: str, **kwargs: Any
     ) -> Dict[str, Any]:
         """Send command via cloud API."""
-        if not self.session or not self.auth_token:
-            await self._authenticate()
-
-        headers = {"Authorization": f"Bearer {self.auth_token}"}
         payload = {
             "device_id": device_id,
             "command": command,
@@ -197,16 +293,9 @@ class MarsProAPI:
         }
 
         try:
-            async with self.session.post(
-                f"{API_BASE_URL}/{API_VERSION}/devices/{device_id}/control",
-                json=payload,
-                headers=headers,
-                timeout=aiohttp.ClientTimeout(total=DEFAULT_TIMEOUT),
-            ) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    raise ValueError(f"Command failed: {response.status}")
+            return await self._cloud_request(
+                "POST", f"/devices/{device_id}/control", "Command failed", json=payload
+            )
         except Exception as ex:
             _LOGGER.error("Failed to send command via cloud: %s", ex)
             raise
@@ -222,16 +311,39 @@ class MarsProAPI:
             # Build command payload (format to be discovered)
             payload = self._build_ble_command(command, **kwargs)
             
-            # Send command
-            await self.ble_client.write_gatt_char(
-                BLE_CHARACTERISTIC_UUID, payload, response=True
-            )
+            # Send command through the queue so concurrent commands share a write
+            await self.command_queue.send(payload)
             
             return {"status": "success", "command": command}
         except Exception as ex:
             _LOGGER.error("Failed to send command via BLE: %s", ex)
             raise
 
+    async def _send_commands_ble(
+        self, device_id: str, commands: List[Tuple[str, Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        """Send several commands via BLE back to back through the command queue."""
+        if not self.ble_client or not self.ble_client.is_connected:
+            await self._connect_ble()
+
+        try:
+            payloads = [self._build_ble_command(command, **kwargs) for command, kwargs in commands]
+            await self.command_queue.send_batch(payloads)
+
+            return [{"status": "success", "command": command} for command, _ in commands]
+        except Exception as ex:
+            _LOGGER.error("Failed to send commands via BLE: %s", ex)
+            raise
+
+    async def _write_ble_payload(self, payload: bytes, response: bool) -> None:
+        """Write a command payload to the device."""
+        if not self.ble_client:
+            raise RuntimeError("BLE client not connected")
+
+        await self.ble_client.write_gatt_char(
+            BLE_CHARACTERISTIC_UUID, payload, response=response
+        )
+
     def _build_ble_command(self, command: str, **kwargs: Any) -> bytes:
         """Build BLE command payload."""
         # This is a placeholder implementation
@@ -256,25 +368,95 @@ class MarsProAPI:
 
     async def _get_device_status_cloud(self, device_id: str) -> Dict[str, Any]:
         """Get device status from cloud API."""
-        if not self.session or not self.auth_token:
-            await self._authenticate()
-
-        headers = {"Authorization": f"Bearer {self.auth_token}"}
-
         try:
-            async with self.session.get(
-                f"{API_BASE_URL}/{API_VERSION}/devices/{device_id}/status",
-                headers=headers,
-                timeout=aiohttp.ClientTimeout(total=DEFAULT_TIMEOUT),
-            ) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    raise ValueError(f"Failed to get status: {response.status}")
+            return await self._cloud_request(
+                "GET", f"/devices/{device_id}/status", "Failed to get status"
+            )
         except Exception as ex:
             _LOGGER.error("Failed to get device status from cloud: %s", ex)
             raise
 
+    async def get_devices_status(self, device_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the status of several devices at once.
+
+        Returns:
+            Dictionary mapping device IDs to status; devices whose status could
+            not be fetched are left out
+        """
+        if self.use_cloud:
+            return await self._get_devices_status_cloud(device_ids)
+
+        statuses = {}
+        for device_id in device_ids:
+            try:
+                statuses[device_id] = await self._get_device_status_ble(device_id)
+            except Exception:
+                continue
+        return statuses
+
+    async def _get_devices_status_cloud(self, device_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get device statuses from cloud API, in bulk where supported."""
+        statuses: Dict[str, Dict[str, Any]] = {}
+        if self._bulk_status_supported is not False:
+            for start in range(0, len(device_ids), DEFAULT_STATUS_BATCH_SIZE):
+                chunk = device_ids[start:start + DEFAULT_STATUS_BATCH_SIZE]
+                bulk = await self._get_bulk_status_cloud(chunk)
+                if bulk is None:
+                    break
+                statuses.update(bulk)
+
+        # Fall back to concurrent per-device requests over the kept-alive session
+        remaining = [device_id for device_id in device_ids if device_id not in statuses]
+        if remaining:
+            semaphore = asyncio.Semaphore(DEFAULT_MAX_CONCURRENT_REQUESTS)
+
+            async def fetch(device_id: str) -> Optional[Dict[str, Any]]:
+                async with semaphore:
+                    try:
+                        return await self._get_device_status_cloud(device_id)
+                    except Exception:
+                        return None
+
+            results = await asyncio.gather(*(fetch(device_id) for device_id in remaining))
+            statuses.update(
+                (device_id, status)
+                for device_id, status in zip(remaining, results)
+                if status is not None
+            )
+
+        return statuses
+
+    async def _get_bulk_status_cloud(
+        self, device_ids: List[str]
+    ) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Request several statuses in one call; None if the endpoint is unavailable."""
+        # Bulk endpoint not yet confirmed in captured traffic: until it has
+        # answered once, any failure means it is not used again
+        try:
+            data = await self._cloud_request(
+                "POST",
+                "/devices/status",
+                "Failed to get bulk status",
+                json={"device_ids": device_ids},
+            )
+        except Exception as ex:
+            if self._bulk_status_supported is None or (
+                isinstance(ex, MarsProRequestError) and ex.status in (404, 405, 501)
+            ):
+                _LOGGER.debug("Bulk status endpoint not available: %s", ex)
+                self._bulk_status_supported = False
+            else:
+                # Transient failure of a working endpoint, fall back for this update only
+                _LOGGER.warning("Bulk status request failed: %s", ex)
+            return None
+
+        self._bulk_status_supported = True
+        devices = data.get("devices", {})
+        if isinstance(devices, list):
+            devices = {device.get("id"): device for device in devices if device.get("id")}
+        return devices
+
     async def _get_device_status_ble(self, device_id: str) -> Dict[str, Any]:
         """Get device status via BLE."""
         if not self.ble_client or not self.ble_client.is_connected:
@@ -296,12 +478,100 @@ class MarsProAPI:
             _LOGGER.error("Failed to get device status via BLE: %s", ex)
             raise
 
+    async def subscribe(self, device_id: str, callback: StatusCallback) -> bool:
+        """
+        Subscribe to pushed status updates for a device.
+
+        Returns:
+            True if the device pushes updates, False if it must be polled
+        """
+        if self.use_cloud:
+            return False
+
+        if not self.ble_client or not self.ble_client.is_connected:
+            await self._connect_ble()
+
+        self._subscriptions[device_id] = callback
+        try:
+            if self._notify_client is not self.ble_client:
+                await self._start_notify()
+            return True
+        except Exception as ex:
+            self._subscriptions.pop(device_id, None)
+            _LOGGER.warning("Failed to subscribe to BLE notifications: %s", ex)
+            return False
+
+    @property
+    def push_active(self) -> bool:
+        """True while notifications are running on the current BLE connection."""
+        return (
+            bool(self._subscriptions)
+            and self.ble_client is not None
+            and self._notify_client is self.ble_client
+            and self.ble_client.is_connected
+        )
+
+    async def _start_notify(self) -> None:
+        """Start notifications on the current BLE client."""
+        self._notify_client = None
+        await self.ble_client.start_notify(
+            BLE_CHARACTERISTIC_UUID, self._handle_ble_notification
+        )
+        self._notify_client = self.ble_client
+
+    async def unsubscribe(self, device_id: str) -> None:
+        """Stop pushed status updates for a device."""
+        if self._subscriptions.pop(device_id, None) is None or self._subscriptions:
+            return
+
+        self._notify_client = None
+
+        if self.ble_client and self.ble_client.is_connected:
+            try:
+                await self.ble_client.stop_notify(BLE_CHARACTERISTIC_UUID)
+            except Exception as ex:
+                _LOGGER.debug("Failed to stop BLE notifications: %s", ex)
+
+    def _handle_ble_notification(self, sender: Any, data: bytearray) -> None:
+        """Dispatch a BLE notification as a status update."""
+        if self.command_queue.handle_notification(data):
+            return
+
+        decoded = decode_frame(data)
+        if decoded is None:
+            _LOGGER.debug("Keeping unrecognised notification as raw bytes (%d bytes)", len(data))
+            status: Dict[str, Any] = {RAW_FRAME_KEY: bytes(data).hex()}
+        else:
+            fields, values = decoded
+            status = dict(zip(fields, values))
+        # A local connection serves exactly one device
+        for device_id, callback in self._subscriptions.items():
+            callback(device_id, status)
+
     async def disconnect(self) -> None:
         """Disconnect from API."""
+        self.token_manager.close()
+
         if self.session:
-            await self.session.close()
+            if self._owns_session:
+                await self.session.close()
             self.session = None
 
-        if self.ble_client and self.ble_client.is_connected:
+        if self._subscriptions and self.ble_client and self.ble_client.is_connected:
+            try:
+                await self.ble_client.stop_notify(BLE_CHARACTERISTIC_UUID)
+            except Exception as ex:
+                _LOGGER.debug("Failed to stop BLE notifications: %s", ex)
+        self._subscriptions.clear()
+        self._notify_client = None
+
+        if self._owns_manager and self.ble_client:
+            await self.connection_manager.close()
+            self.ble_client = None
+        elif self.connection_manager and self.ble_client:
+            # The session stays pooled for other users of the device
+            self.connection_manager.release(self.ble_mac)
+            self.ble_client = None
+        elif self.ble_client and self.ble_client.is_connected:
             await self.ble_client.disconnect()
             self.ble_client = None 
\ No newline at end of file
@@ -0,0 +1,139 @@
+"""Authentication token lifecycle for MarsPro integration."""
+
+import asyncio
+import base64
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+from .const import DEFAULT_TOKEN_REFRESH_MARGIN
+
+_LOGGER = logging.getLogger(__name__)
+
+LoginCallback = Callable[[], Awaitable[Tuple[str, Optional[float]]]]
+
+
+def decode_token_expiry(token: str) -> Optional[float]:
+    """Read the exp claim of a JWT without verifying it."""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(payload)).get("exp")
+        return float(exp) if exp is not None else None
+    except (IndexError, ValueError, TypeError, AttributeError):
+        return None
+
+
+def parse_expires_at(value: Any) -> Optional[float]:
+    """Parse an expires_at field (ISO 8601 or epoch seconds) from a login response."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+class MarsProTokenManager:
+    """Keep an auth token fresh and collapse concurrent logins into one."""
+
+    def __init__(
+        self,
+        login: LoginCallback,
+        refresh_margin: float = DEFAULT_TOKEN_REFRESH_MARGIN,
+    ) -> None:
+        """
+        Initialize the token manager.
+
+        Args:
+            login: Coroutine returning a new (token, expiry timestamp or None)
+            refresh_margin: Seconds before expiry to refresh in the background
+        """
+        self._login = login
+        self.refresh_margin = refresh_margin
+        self.token: Optional[str] = None
+        self.expires_at: Optional[float] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._refresh_timer: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def is_valid(self) -> bool:
+        """Return True if there is a token that has not expired."""
+        if self.token is None:
+            return False
+        return self.expires_at is None or time.time() < self.expires_at
+
+    async def async_get_token(self) -> str:
+        """Get a valid token, logging in if needed."""
+        if self.is_valid:
+            return self.token  # type: ignore
+        return await self.async_refresh()
+
+    async def async_refresh(self) -> str:
+        """Log in again; concurrent callers share a single request."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.get_running_loop().create_task(self._async_login())
+        return await asyncio.shield(self._refresh_task)
+
+    def invalidate(self, token: Optional[str] = None) -> None:
+        """
+        Mark a token as rejected by the server.
+
+        Args:
+            token: The token that was rejected; ignored if it has already been
+                replaced by a newer one
+        """
+        if token is None or token == self.token:
+            self.token = None
+            self.expires_at = None
+
+    def close(self) -> None:
+        """Stop background refreshes."""
+        if self._refresh_timer:
+            self._refresh_timer.cancel()
+            self._refresh_timer = None
+        if self._refresh_task and not self._refresh_task.done():
+            self._refresh_task.cancel()
+        self._refresh_task = None
+
+    async def _async_login(self) -> str:
+        """Log in and schedule the next proactive refresh."""
+        token, expires_at = await self._login()
+        self.token = token
+        self.expires_at = expires_at or decode_token_expiry(token)
+        self._schedule_refresh()
+        return token
+
+    def _schedule_refresh(self) -> None:
+        """Refresh the token shortly before it expires."""
+        if self._refresh_timer:
+            self._refresh_timer.cancel()
+            self._refresh_timer = None
+        if self.expires_at is None:
+            return
+
+        lifetime = self.expires_at - time.time()
+        if lifetime <= 0:
+            return
+        # Short-lived tokens refresh halfway through instead of immediately
+        delay = lifetime - self.refresh_margin if lifetime > 2 * self.refresh_margin else lifetime / 2
+        _LOGGER.debug("Scheduling token refresh in %.0f seconds", delay)
+        self._refresh_timer = asyncio.get_running_loop().call_later(
+            delay, self._start_background_refresh
+        )
+
+    def _start_background_refresh(self) -> None:
+        """Kick off a background refresh from the timer."""
+        self._refresh_timer = None
+        task = asyncio.get_running_loop().create_task(self.async_refresh())
+        task.add_done_callback(self._log_refresh_result)
+
+    @staticmethod
+    def _log_refresh_result(task: asyncio.Task) -> None:
+        """Log background refresh failures; the next request will retry."""
+        if not task.cancelled() and task.exception():
+            _LOGGER.warning("Background token refresh failed: %s", task.exception())
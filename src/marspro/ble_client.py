@@ -7,7 +7,11 @@ The protocol details are based on analysis of the MarsPro Android application.
 
 import asyncio
 import logging
-from typing import Dict, List, Optional, Callable, Any, Union
+import platform
+import re
+import time
+import uuid
+from typing import Dict, List, Optional, Callable, Any, Tuple, Union
 from dataclasses import dataclass
 from enum import Enum
 import struct
@@ -26,8 +30,26 @@ except ImportError:
     AdvertisementData = None
     BLEAK_AVAILABLE = False
 
+try:
+    from bleak.assigned_numbers import AdvertisementDataType
+    try:
+        from bleak.args.bluez import BlueZScannerArgs, OrPattern
+    except ImportError:  # bleak < 1.0
+        from bleak.backends.bluezdbus.advertisement_monitor import OrPattern
+        from bleak.backends.bluezdbus.scanner import BlueZScannerArgs
+    BLUEZ_PATTERNS_AVAILABLE = True
+except ImportError:
+    BLUEZ_PATTERNS_AVAILABLE = False
+
+from .command_queue import MarsProCommandQueue
+from .connection_manager import MarsProConnectionManager
+from .frame_decoder import decode_frame
+from .gatt_cache import MarsProGattCache, backend_cache_kwargs, services_from_bleak
+
 _LOGGER = logging.getLogger(__name__)
 
+BLUETOOTH_BASE_UUID = "00000000-0000-1000-8000-00805f9b34fb"
+
 
 class MarsProDeviceType(Enum):
     """MarsPro device types."""
@@ -57,6 +79,7 @@ class MarsProDevice:
     firmware_version: Optional[str] = None
     battery_level: Optional[int] = None
     rssi: Optional[int] = None
+    last_seen: Optional[float] = None
 
 
 @dataclass
@@ -71,6 +94,29 @@ class MarsProSensorData:
     wind_pressure: Optional[float] = None
     air_volume: Optional[float] = None
     timestamp: Optional[float] = None
+    # Bytes of a frame that matched no layout
+    raw: Optional[bytes] = None
+
+
+def sensor_data_from_frame(data: bytes, timestamp: Optional[float] = None) -> MarsProSensorData:
+    """
+    Build sensor data from a binary sensor frame.
+    
+    Frames that match no layout carry only their raw bytes and no readings.
+    """
+    sensor_data = MarsProSensorData(timestamp=time.time() if timestamp is None else timestamp)
+    decoded = decode_frame(data)
+    if decoded is None:
+        sensor_data.raw = bytes(data)
+        return sensor_data
+    
+    fields, values = decoded
+    for name, value in zip(fields, values):
+        setattr(sensor_data, name, value)
+    return sensor_data
+
+
+AdvertisementCallback = Callable[[str, MarsProSensorData], None]
 
 
 class MarsProBLEClient:
@@ -102,18 +148,50 @@ class MarsProBLEClient:
     CMD_SET_AUTO_MODE = 0x70
     CMD_SET_TIMER = 0x80
     
-    def __init__(self, device_address: str):
-        """Initialize the MarsPro BLE client."""
+    def __init__(
+        self,
+        device_address: str,
+        connection_manager: Optional[MarsProConnectionManager] = None,
+        gatt_cache: Optional[MarsProGattCache] = None,
+        firmware_version: Optional[str] = None,
+        adapters: Optional[List[str]] = None,
+    ):
+        """
+        Initialize the MarsPro BLE client.
+        
+        Args:
+            device_address: BLE address of the device
+            connection_manager: Shared session pool; when omitted the client
+                owns a dedicated BleakClient
+            gatt_cache: Known GATT layouts; a device with a known layout is
+                connected with the backend's service cache enabled
+            firmware_version: Last known firmware version, used as cache key
+            adapters: HCI adapters to schedule the connection across; added to
+                the connection manager, or to a dedicated one when none is given
+        """
         if not BLEAK_AVAILABLE:
             raise ImportError("bleak library is required for BLE communication")
         
+        self._owns_manager = False
+        if adapters:
+            if connection_manager:
+                connection_manager.add_adapters(adapters)
+            else:
+                connection_manager = MarsProConnectionManager(adapters=adapters)
+                self._owns_manager = True
+        
         self.device_address = device_address
+        self.connection_manager = connection_manager
+        self.gatt_cache = gatt_cache
+        self.firmware_version = firmware_version
         self.client: Optional[BleakClient] = None
         self.device_info: Optional[MarsProDevice] = None
         self._data_callback: Optional[Callable[[MarsProSensorData], None]] = None
         self._connected = False
         self._services: Dict[str, Any] = {}
         self._characteristics: Dict[str, Any] = {}
+        self._gatt_from_cache = False
+        self._command_queue: Optional[MarsProCommandQueue] = None
         
         _LOGGER.info(f"Initialized MarsPro BLE client for device {device_address}")
     
@@ -122,22 +200,38 @@ class MarsProBLEClient:
         try:
             _LOGGER.info(f"Connecting to MarsPro device {self.device_address}")
             
-            self.client = BleakClient(self.device_address)
+            # bleak discovers services during connect; with a known layout the
+            # backend may answer that from its own cache instead
+            known_layout = None
+            if self.gatt_cache:
+                await self.gatt_cache.async_load()
+                known_layout = self.gatt_cache.get_layout(self.device_address, self.firmware_version)
+            connect_kwargs = backend_cache_kwargs() if known_layout else {}
+            
+            if self.connection_manager:
+                self.client = await self.connection_manager.acquire(
+                    self.device_address, connect_kwargs=connect_kwargs
+                )
+            else:
+                self.client = BleakClient(self.device_address)
+                if self.client:
+                    await self.client.connect(**connect_kwargs)  # type: ignore
+            
             if self.client:
-                await self.client.connect()  # type: ignore
-                
-                # Discover services
-                services = await self.client.get_services()  # type: ignore
+                services = list(self.client.services)  # type: ignore
                 _LOGGER.info(f"Discovered {len(services)} services")
+                self._store_gatt_table(services)
+                self._gatt_from_cache = bool(connect_kwargs)
                 
-                # Store services and characteristics
-                for service in services:
-                    self._services[service.uuid] = service
-                    _LOGGER.info(f"Service: {service.uuid}")
-                    for char in service.characteristics:
-                        self._characteristics[char.uuid] = char
-                        _LOGGER.info(f"  Characteristic: {char.uuid} - {char.properties}")
+                if self.gatt_cache:
+                    layout = self.gatt_cache.put(
+                        self.device_address, self.firmware_version, services_from_bleak(services)
+                    )
+                    if known_layout and layout != known_layout:
+                        _LOGGER.info(f"GATT handle layout changed on {self.device_address}")
+                    await self.gatt_cache.async_save()
                 
+                self._command_queue = self._create_command_queue()
                 self._connected = True
                 _LOGGER.info(f"Successfully connected to MarsPro device {self.device_address}")
                 return True
@@ -148,10 +242,54 @@ class MarsProBLEClient:
             _LOGGER.error(f"Failed to connect to MarsPro device: {e}")
             return False
     
+    def _create_command_queue(self) -> MarsProCommandQueue:
+        """Create the command queue for the current connection."""
+        mtu = getattr(self.client, 'mtu_size', None)
+        char = self._characteristics.get(self.COMMAND_CHAR_UUID)
+        properties = getattr(char, 'properties', None)
+        
+        async def write(payload: bytes, response: bool) -> None:
+            await self.client.write_gatt_char(self.COMMAND_CHAR_UUID, payload, response=response)  # type: ignore
+        
+        return MarsProCommandQueue(
+            write,
+            mtu=mtu if isinstance(mtu, int) else MarsProCommandQueue.DEFAULT_MTU,
+            write_without_response=isinstance(properties, list) and "write-without-response" in properties,
+        )
+    
+    def _store_gatt_table(self, services: Any) -> None:
+        """Index services and characteristics by UUID."""
+        self._services.clear()
+        self._characteristics.clear()
+        for service in services:
+            self._services[service.uuid] = service
+            _LOGGER.debug(f"Service: {service.uuid}")
+            for char in service.characteristics:
+                self._characteristics[char.uuid] = char
+                _LOGGER.debug(f"  Characteristic: {char.uuid} - {char.properties}")
+    
+    async def _async_handle_gatt_error(self, error: Exception) -> None:
+        """Drop a cached GATT table that no longer matches the device."""
+        if self._gatt_from_cache and self.gatt_cache and BleakError and isinstance(error, BleakError):
+            _LOGGER.info(f"GATT operation failed on cached table for {self.device_address}, invalidating")
+            self.gatt_cache.invalidate(self.device_address)
+            self._gatt_from_cache = False
+            await self.gatt_cache.async_save()
+            if self.connection_manager:
+                # The pooled session holds the stale table; the next connect rediscovers
+                await self.connection_manager.disconnect(self.device_address)
+                self._connected = False
+    
     async def disconnect(self):
         """Disconnect from the MarsPro device."""
         if self.client and self._connected:
-            await self.client.disconnect()  # type: ignore
+            if self._owns_manager:
+                await self.connection_manager.disconnect(self.device_address)  # type: ignore
+            elif self.connection_manager:
+                # Leave the session pooled for the next caller
+                self.connection_manager.release(self.device_address)
+            else:
+                await self.client.disconnect()  # type: ignore
             self._connected = False
             _LOGGER.info(f"Disconnected from MarsPro device {self.device_address}")
     
@@ -185,9 +323,20 @@ class MarsProBLEClient:
                 firmware_version="1.3.2"  # Will be read from device
             )
             
+            # Re-key the cached GATT table under the firmware actually reported
+            if self.gatt_cache and self.device_info.firmware_version != self.firmware_version:
+                self.firmware_version = self.device_info.firmware_version
+                self.gatt_cache.put(
+                    self.device_address,
+                    self.firmware_version,
+                    services_from_bleak(self._services.values()),
+                )
+                await self.gatt_cache.async_save()
+            
             return self.device_info
             
         except Exception as e:
+            await self._async_handle_gatt_error(e)
             _LOGGER.error(f"Failed to read device info: {e}")
             return None
     
@@ -204,7 +353,8 @@ class MarsProBLEClient:
             # Try to read from data characteristic
             if self.DATA_CHAR_UUID in self._characteristics:
                 data = await self.client.read_gatt_char(self.DATA_CHAR_UUID)  # type: ignore
-                _LOGGER.info(f"Sensor data: {data.hex()}")
+                if _LOGGER.isEnabledFor(logging.DEBUG):
+                    _LOGGER.debug(f"Sensor data: {data.hex()}")
                 # Parse sensor data based on protocol
                 return self._parse_sensor_data(data)
             
@@ -224,24 +374,16 @@ class MarsProBLEClient:
             return sensor_data
             
         except Exception as e:
+            await self._async_handle_gatt_error(e)
             _LOGGER.error(f"Failed to read sensor data: {e}")
             return None
     
     def _parse_sensor_data(self, data: bytes) -> MarsProSensorData:
-        """Parse sensor data from BLE response."""
-        # This will be implemented based on discovered protocol
-        # For now, return placeholder data
-        return MarsProSensorData(
-            temperature=25.5,
-            humidity=60.0,
-            co2=400.0,
-            vpd=1.2,
-            ppfd=500.0,
-            wind_speed=2.5,
-            wind_pressure=1013.25,
-            air_volume=100.0,
-            timestamp=asyncio.get_event_loop().time()
-        )
+        """Parse a sensor frame from a BLE response or notification."""
+        sensor_data = sensor_data_from_frame(data)
+        if sensor_data.raw is not None:
+            _LOGGER.debug("Keeping unrecognised sensor frame as raw bytes (%d bytes)", len(data))
+        return sensor_data
     
     async def send_command(self, command_type: int, data: Dict[str, Any]) -> bool:
         """Send a command to the device."""
@@ -254,17 +396,44 @@ class MarsProBLEClient:
             command_data = self._build_command_packet(command_type, data)
             _LOGGER.info(f"Sending command: {command_type:02x} with data: {command_data.hex()}")
             
-            # Send to command characteristic
-            if self.COMMAND_CHAR_UUID in self._characteristics:
-                await self.client.write_gatt_char(self.COMMAND_CHAR_UUID, command_data)  # type: ignore
-                return True
+            # Queue for the command characteristic
+            if self.COMMAND_CHAR_UUID in self._characteristics and self._command_queue:
+                return await self._command_queue.send(command_data)
             
             return False
             
         except Exception as e:
+            await self._async_handle_gatt_error(e)
             _LOGGER.error(f"Failed to send command: {e}")
             return False
     
+    async def send_commands(self, commands: List[Tuple[int, Dict[str, Any]]]) -> bool:
+        """
+        Send several commands back to back through the command queue.
+        
+        Args:
+            commands: List of (command type, data) pairs
+            
+        Returns:
+            True if every command was sent
+        """
+        if not self._connected or not self.client:
+            _LOGGER.error("Not connected to device")
+            return False
+        
+        if self.COMMAND_CHAR_UUID not in self._characteristics or not self._command_queue:
+            return False
+        
+        try:
+            packets = [self._build_command_packet(command_type, data) for command_type, data in commands]
+            _LOGGER.info(f"Sending {len(packets)} commands: {', '.join(f'{p[0]:02x}' for p in packets)}")
+            return await self._command_queue.send_batch(packets)
+            
+        except Exception as e:
+            await self._async_handle_gatt_error(e)
+            _LOGGER.error(f"Failed to send commands: {e}")
+            return False
+    
     def _build_command_packet(self, command_type: int, data: Dict[str, Any]) -> bytes:
         """Build command packet based on protocol."""
         # This will be implemented based on discovered protocol
@@ -296,10 +465,14 @@ class MarsProBLEClient:
     
     async def _notification_handler(self, sender: Any, data: bytes):
         """Handle BLE notifications."""
-        _LOGGER.info(f"Received notification: {data.hex()}")
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug(f"Received notification: {data.hex()}")
+        if self._command_queue and self._command_queue.handle_notification(data):
+            return
         if self._data_callback:
             sensor_data = self._parse_sensor_data(data)
-            self._data_callback(sensor_data)
+            if sensor_data is not None:
+                self._data_callback(sensor_data)
     
     async def control_light(self, light_type: str, intensity: int, duration: Optional[int] = None) -> bool:
         """Control lighting system."""
@@ -346,56 +519,419 @@ class MarsProBLEClient:
         return self._connected
 
 
+class MarsProDeviceEvent(Enum):
+    """Scanner registry events."""
+    APPEARED = "appeared"
+    LOST = "lost"
+
+
+DeviceEventCallback = Callable[[MarsProDeviceEvent, MarsProDevice], None]
+
+
 class MarsProDeviceScanner:
     """Scanner for MarsPro devices."""
     
-    def __init__(self):
-        """Initialize the scanner."""
+    # Advertisement identifiers (to be discovered via dynamic analysis)
+    SERVICE_UUID = MarsProBLEClient.SERVICE_UUID
+    MANUFACTURER_ID = 0xFFFF  # Placeholder: Bluetooth SIG ID reserved for testing
+    NAME_PATTERN = re.compile(r"mars", re.IGNORECASE)
+    
+    # Seconds a filtered background scan may match nothing before the filters,
+    # which use placeholder identifiers, are dropped
+    PREFILTER_GRACE = 60.0
+    
+    # Registry settings
+    DEVICE_TTL = 120.0  # Seconds without an advertisement before a device is lost
+    EVICT_INTERVAL = 15.0
+    RSSI_SMOOTHING = 0.25  # EMA weight of the newest RSSI sample
+    
+    def __init__(
+        self,
+        prefilter: bool = True,
+        adapter: Optional[str] = None,
+        connection_manager: Optional[MarsProConnectionManager] = None,
+    ):
+        """
+        Initialize the scanner.
+        
+        Args:
+            prefilter: Let the Bluetooth stack drop advertisements that carry
+                neither SERVICE_UUID nor MANUFACTURER_ID. Both are placeholders
+                until the advertisement format is confirmed, so a filtered scan
+                that finds nothing is repeated unfiltered
+            adapter: HCI adapter to scan on, or None for the default
+            connection_manager: Receives the smoothed RSSI of each device on
+                this adapter to steer connection scheduling
+        """
         if not BLEAK_AVAILABLE:
             raise ImportError("bleak library is required for BLE scanning")
         
+        self.prefilter = prefilter
+        self.adapter = adapter
+        self.connection_manager = connection_manager
         self.scanner = BleakScanner()  # type: ignore
-        self.discovered_devices: List[MarsProDevice] = []
+        self.devices: Dict[str, MarsProDevice] = {}
+        self._rssi: Dict[str, float] = {}
+        self._subscribers: List[DeviceEventCallback] = []
+        self._background_scanner: Optional[BleakScanner] = None
+        self._evict_task: Optional[asyncio.Task] = None
+        self._telemetry_callbacks: List[AdvertisementCallback] = []
+        self._last_payloads: Dict[str, bytes] = {}
+        # Whether the scan filters have matched a device yet
+        self._prefilter_matched = False
+    
+    @property
+    def discovered_devices(self) -> List[MarsProDevice]:
+        """Devices currently in the registry."""
+        return list(self.devices.values())
+    
+    @property
+    def is_running(self) -> bool:
+        """Return True while the background scanner is running."""
+        return self._background_scanner is not None
     
     async def scan_for_devices(self, timeout: float = 10.0) -> List[MarsProDevice]:
         """Scan for MarsPro devices."""
         try:
             _LOGGER.info(f"Scanning for MarsPro devices for {timeout} seconds...")
             
-            devices = await self.scanner.discover(timeout=timeout)  # type: ignore
+            found = await self._discover(timeout, self._active_filters())
+            if not found and self.prefilter:
+                # The filter identifiers are placeholders and may not match real devices
+                _LOGGER.info("No MarsPro devices matched the scan filters, scanning unfiltered")
+                found = await self._discover(timeout, self._active_filters(prefilter=False))
             
-            for device in devices:
-                if self._is_marspro_device(device):
-                    marspro_device = self._create_marspro_device(device)
-                    self.discovered_devices.append(marspro_device)
-                    _LOGGER.info(f"Found MarsPro device: {marspro_device.name} ({marspro_device.address})")
-            
-            return self.discovered_devices
+            return found
             
         except Exception as e:
             _LOGGER.error(f"Failed to scan for devices: {e}")
             return []
     
-    def _is_marspro_device(self, device: BLEDevice) -> bool:  # type: ignore
+    async def _discover(self, timeout: float, filters: Dict[str, Any]) -> List[MarsProDevice]:
+        """Run one scan and track the MarsPro devices it found."""
+        # BLEDevice carries no RSSI, it comes with each device's advertisement
+        discovered = await self.scanner.discover(timeout=timeout, return_adv=True, **filters)  # type: ignore
+        return [
+            self._track_device(device, advertisement_data.rssi)
+            for device, advertisement_data in discovered.values()
+            if self._is_marspro_device(device, advertisement_data)
+        ]
+    
+    def _is_marspro_device(
+        self,
+        device: BLEDevice,  # type: ignore
+        advertisement_data: Optional[AdvertisementData] = None,  # type: ignore
+    ) -> bool:
         """Check if device is a MarsPro device."""
-        # This will be implemented based on discovered device patterns
-        # For now, check for common MarsPro device name patterns
-        name = device.name or ""
-        return "marspro" in name.lower() or "mars" in name.lower()
+        if advertisement_data is not None:
+            if (
+                self.MANUFACTURER_ID in advertisement_data.manufacturer_data
+                or self.SERVICE_UUID in advertisement_data.service_uuids
+            ):
+                return True
+            name = advertisement_data.local_name or device.name
+        else:
+            name = device.name
+        # Name patterns are a fallback until the advertisement format is confirmed
+        return bool(name) and self.NAME_PATTERN.search(name) is not None
+    
+    def _active_filters(self, prefilter: Optional[bool] = None) -> Dict[str, Any]:
+        """Scanner arguments that filter active scans by service UUID."""
+        filters: Dict[str, Any] = {"adapter": self.adapter} if self.adapter else {}
+        if self.prefilter if prefilter is None else prefilter:
+            filters["service_uuids"] = [self.SERVICE_UUID]
+        return filters
+    
+    def _or_patterns(self) -> List[Any]:
+        """BlueZ advertisement monitor patterns matching MarsPro advertisements."""
+        service = uuid.UUID(self.SERVICE_UUID)
+        if service.bytes[4:] == uuid.UUID(BLUETOOTH_BASE_UUID).bytes[4:]:
+            # 16-bit UUIDs on the Bluetooth base are advertised in short form
+            uuid_bytes = service.bytes[2:4][::-1]
+            uuid_types = (
+                AdvertisementDataType.COMPLETE_LIST_SERVICE_UUID16,
+                AdvertisementDataType.INCOMPLETE_LIST_SERVICE_UUID16,
+                AdvertisementDataType.SERVICE_DATA_UUID16,
+            )
+        else:
+            uuid_bytes = service.bytes[::-1]
+            uuid_types = (
+                AdvertisementDataType.COMPLETE_LIST_SERVICE_UUID128,
+                AdvertisementDataType.INCOMPLETE_LIST_SERVICE_UUID128,
+                AdvertisementDataType.SERVICE_DATA_UUID128,
+            )
+        
+        patterns = [
+            OrPattern(0, AdvertisementDataType.MANUFACTURER_SPECIFIC_DATA,
+                      self.MANUFACTURER_ID.to_bytes(2, "little"))
+        ]
+        patterns.extend(OrPattern(0, ad_type, uuid_bytes) for ad_type in uuid_types)
+        return patterns
+    
+    def _background_filters(self) -> Dict[str, Any]:
+        """
+        Scanner arguments for continuous scanning.
+        
+        The scan runs passively wherever the backend allows it, since sensor
+        frames are in the advertisements and scan responses are not needed. On
+        BlueZ a passive scan needs the filters installed as an advertisement
+        monitor, so non-matching advertisements never reach us. CoreBluetooth
+        has no passive mode, and there an active scan is filtered by service
+        UUID where the backend supports it.
+        """
+        system = platform.system()
+        if system == "Darwin" or (
+            system == "Linux" and not (self.prefilter and BLUEZ_PATTERNS_AVAILABLE)
+        ):
+            return self._active_filters()
+        
+        filters: Dict[str, Any] = {"adapter": self.adapter} if self.adapter else {}
+        filters["scanning_mode"] = "passive"
+        if system == "Linux":
+            filters["bluez"] = BlueZScannerArgs(or_patterns=self._or_patterns())
+        return filters
     
-    def _create_marspro_device(self, device: BLEDevice) -> MarsProDevice:  # type: ignore
-        """Create MarsPro device from BLE device."""
+    def _create_marspro_device(self, device: BLEDevice, rssi: Optional[int] = None) -> MarsProDevice:  # type: ignore
+        """Create MarsPro device from BLE device and its advertised RSSI."""
         return MarsProDevice(
             address=device.address,
             name=device.name or "Unknown MarsPro Device",
             device_type=MarsProDeviceType.CONTROLLER,
             features=[MarsProFeature.LIGHTING, MarsProFeature.CLIMATE, MarsProFeature.WATER],
-            rssi=device.rssi
+            rssi=rssi
         )
     
     def get_discovered_devices(self) -> List[MarsProDevice]:
         """Get list of discovered devices."""
-        return self.discovered_devices.copy()
+        return self.discovered_devices
+    
+    def subscribe(self, callback: DeviceEventCallback) -> Callable[[], None]:
+        """
+        Subscribe to device appeared/lost events.
+        
+        Args:
+            callback: Called with (event, device)
+            
+        Returns:
+            Function that removes the subscription
+        """
+        self._subscribers.append(callback)
+        
+        def unsubscribe() -> None:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+        
+        return unsubscribe
+    
+    def _notify(self, event: MarsProDeviceEvent, device: MarsProDevice) -> None:
+        """Send an event to all subscribers."""
+        for callback in list(self._subscribers):
+            try:
+                callback(event, device)
+            except Exception as e:
+                _LOGGER.error(f"Error in device {event.value} callback: {e}")
+    
+    def _track_device(self, device: BLEDevice, rssi: Optional[int], now: Optional[float] = None) -> MarsProDevice:  # type: ignore
+        """Add or refresh a device in the registry."""
+        now = time.monotonic() if now is None else now
+        tracked = self.devices.get(device.address)
+        
+        if tracked is None:
+            tracked = self._create_marspro_device(device, rssi)
+            tracked.last_seen = now
+            self.devices[device.address] = tracked
+            if rssi is not None:
+                self._rssi[device.address] = float(rssi)
+            _LOGGER.info(f"Found MarsPro device: {tracked.name} ({tracked.address})")
+            self._notify(MarsProDeviceEvent.APPEARED, tracked)
+        else:
+            tracked.last_seen = now
+            if device.name:
+                tracked.name = device.name
+            if rssi is not None:
+                previous = self._rssi.get(device.address)
+                smoothed = float(rssi) if previous is None else (
+                    self.RSSI_SMOOTHING * rssi + (1 - self.RSSI_SMOOTHING) * previous
+                )
+                self._rssi[device.address] = smoothed
+                tracked.rssi = round(smoothed)
+        
+        if self.connection_manager and device.address in self._rssi:
+            self.connection_manager.report_rssi(device.address, self.adapter, self._rssi[device.address])
+        return tracked
+    
+    def evict_stale(self, now: Optional[float] = None) -> int:
+        """
+        Drop devices that have not advertised within DEVICE_TTL.
+        
+        Returns:
+            Number of devices dropped
+        """
+        now = time.monotonic() if now is None else now
+        stale = [
+            address for address, device in self.devices.items()
+            if device.last_seen is not None and now - device.last_seen > self.DEVICE_TTL
+        ]
+        for address in stale:
+            device = self.devices.pop(address)
+            self._rssi.pop(address, None)
+            self._last_payloads.pop(address, None)
+            _LOGGER.info(f"Lost MarsPro device: {device.name} ({address})")
+            self._notify(MarsProDeviceEvent.LOST, device)
+        return len(stale)
+    
+    async def _evict_periodically(self) -> None:
+        """Evict stale devices while the background scanner runs."""
+        started = time.monotonic()
+        while True:
+            await asyncio.sleep(self.EVICT_INTERVAL)
+            self.evict_stale()
+            if (
+                self.prefilter
+                and not self._prefilter_matched
+                and time.monotonic() - started >= self.PREFILTER_GRACE
+            ):
+                await self._restart_unfiltered()
+    
+    async def _restart_unfiltered(self) -> None:
+        """Replace a filtered background scan that never matched with an unfiltered one."""
+        _LOGGER.info("No MarsPro advertisements matched the scan filters, scanning unfiltered")
+        self.prefilter = False
+        previous = self._background_scanner
+        scanner = BleakScanner(detection_callback=self._handle_advertisement, **self._background_filters())  # type: ignore
+        if previous:
+            await previous.stop()  # type: ignore
+        await scanner.start()  # type: ignore
+        self._background_scanner = scanner
+    
+    async def start(self) -> None:
+        """Start scanning continuously in the background."""
+        if self._background_scanner:
+            return
+        
+        filters = self._background_filters()
+        try:
+            scanner = BleakScanner(detection_callback=self._handle_advertisement, **filters)  # type: ignore
+            await scanner.start()  # type: ignore
+        except BleakError as e:  # type: ignore
+            if filters.get("scanning_mode") != "passive":
+                raise
+            # Older BlueZ versions have no advertisement monitor support
+            _LOGGER.debug(f"Passive scanning unavailable, falling back to active: {e}")
+            scanner = BleakScanner(detection_callback=self._handle_advertisement, **self._active_filters())  # type: ignore
+            await scanner.start()  # type: ignore
+        self._background_scanner = scanner
+        self._evict_task = asyncio.create_task(self._evict_periodically())
+        _LOGGER.info("Started MarsPro background scanner")
+    
+    async def stop(self) -> None:
+        """Stop the background scanner."""
+        if self._evict_task:
+            self._evict_task.cancel()
+            self._evict_task = None
+        if self._background_scanner:
+            await self._background_scanner.stop()  # type: ignore
+            self._background_scanner = None
+            _LOGGER.info("Stopped MarsPro background scanner")
+    
+    async def start_passive_telemetry(self, callback: AdvertisementCallback) -> None:
+        """
+        Continuously decode sensor readings from advertisements.
+        
+        Devices that broadcast sensor frames in their manufacturer or service
+        data are read without opening a connection. Several listeners share
+        the one background scan.
+        
+        Args:
+            callback: Called with (address, sensor data) for each new reading
+        """
+        if callback in self._telemetry_callbacks:
+            return
+        
+        self._telemetry_callbacks.append(callback)
+        try:
+            await self.start()
+        except Exception:
+            self._telemetry_callbacks.remove(callback)
+            raise
+    
+    async def stop_passive_telemetry(self, callback: Optional[AdvertisementCallback] = None) -> None:
+        """
+        Stop decoding advertisements for a listener.
+        
+        Args:
+            callback: Listener to remove, or None to remove all; the scan stops
+                once nobody listens anymore
+        """
+        if callback is None:
+            self._telemetry_callbacks.clear()
+        elif callback in self._telemetry_callbacks:
+            self._telemetry_callbacks.remove(callback)
+        if self._telemetry_callbacks:
+            return
+        
+        self._last_payloads.clear()
+        if not self._subscribers:
+            await self.stop()
+    
+    def _advertised_frame(self, advertisement_data: AdvertisementData) -> Optional[bytes]:  # type: ignore
+        """Get the sensor frame carried by an advertisement, if any."""
+        payload = advertisement_data.manufacturer_data.get(self.MANUFACTURER_ID)
+        if payload is None:
+            payload = advertisement_data.service_data.get(self.SERVICE_UUID)
+        return payload
+    
+    def decode_advertisement(self, advertisement_data: AdvertisementData) -> Optional[MarsProSensorData]:  # type: ignore
+        """Decode sensor data broadcast in an advertisement."""
+        payload = self._advertised_frame(advertisement_data)
+        return sensor_data_from_frame(payload) if payload else None
+    
+    def _handle_advertisement(self, device: BLEDevice, advertisement_data: AdvertisementData) -> None:  # type: ignore
+        """Track the advertising device and report new sensor readings."""
+        payload = self._advertised_frame(advertisement_data)
+        if not payload and not self._is_marspro_device(device, advertisement_data):
+            return
+        
+        self._prefilter_matched = True
+        self._track_device(device, advertisement_data.rssi)
+        
+        if not payload or self._last_payloads.get(device.address) == payload:
+            # Devices repeat the same advertisement many times between readings
+            return
+        
+        sensor_data = sensor_data_from_frame(payload)
+        self._last_payloads[device.address] = payload
+        for callback in list(self._telemetry_callbacks):
+            try:
+                callback(device.address, sensor_data)
+            except Exception as e:
+                _LOGGER.error(f"Error in telemetry callback: {e}")
+
+
+_SHARED_SCANNERS: Dict[Optional[str], MarsProDeviceScanner] = {}
+
+
+def get_device_scanner(
+    adapter: Optional[str] = None,
+    connection_manager: Optional[MarsProConnectionManager] = None,
+) -> MarsProDeviceScanner:
+    """
+    Get the background scanner of an adapter, shared by all listeners in this process.
+    
+    One continuous scan per adapter serves every config entry instead of each
+    running its own.
+    
+    Args:
+        adapter: HCI adapter to scan on, or None for the default
+        connection_manager: Receives the RSSI the adapter hears each device at
+    """
+    scanner = _SHARED_SCANNERS.get(adapter)
+    if scanner is None:
+        scanner = _SHARED_SCANNERS[adapter] = MarsProDeviceScanner(adapter=adapter)
+    if connection_manager:
+        # The pool is recreated once every entry using it has unloaded
+        scanner.connection_manager = connection_manager
+    return scanner
 
 
 async def main():
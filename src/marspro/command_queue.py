@@ -0,0 +1,138 @@
+"""
+MarsPro BLE Command Queue
+
+This module queues command packets for one device and writes them from a single
+task, using write-without-response where the characteristic supports it.
+
+Packets carry no length prefix, so coalescing several packets into one MTU-sized
+write only works if the firmware splits back-to-back packets itself. That has not
+been confirmed yet, so by default every packet gets its own write; coalescing is
+opt-in. ACK frames (provisional, see frame_decoder) are recognised and logged,
+but commands are not held back waiting for them.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Deque, Iterable, List, Optional, Tuple
+
+from .frame_decoder import FRAME_ACK
+
+_LOGGER = logging.getLogger(__name__)
+
+WriteCallback = Callable[[bytes, bool], Awaitable[None]]
+
+
+class MarsProCommandQueue:
+    """Per-device queue that serialises command packets into GATT writes."""
+
+    ATT_HEADER_SIZE = 3
+    DEFAULT_MTU = 23
+    ACK_STATUS_OK = 0x00
+
+    def __init__(
+        self,
+        write: WriteCallback,
+        mtu: int = DEFAULT_MTU,
+        write_without_response: bool = False,
+        coalesce: bool = False,
+    ):
+        """
+        Initialize the command queue.
+
+        Args:
+            write: Coroutine writing (payload, response) to the command characteristic
+            mtu: Negotiated ATT MTU
+            write_without_response: Use write-without-response where the payload fits
+            coalesce: Join queued packets into MTU-sized writes; only for firmware
+                that accepts back-to-back packets without length framing
+        """
+        self._write = write
+        self.mtu = mtu
+        self.write_without_response = write_without_response
+        self.coalesce = coalesce
+
+        self._queue: Deque[Tuple[bytes, asyncio.Future]] = deque()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    @property
+    def max_payload(self) -> int:
+        """Largest payload that fits in a single write."""
+        return max(1, self.mtu - self.ATT_HEADER_SIZE)
+
+    def submit(self, packet: bytes) -> "asyncio.Future[bool]":
+        """
+        Queue a command packet.
+
+        Returns:
+            Future resolving to True once the command is written
+        """
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        self._queue.append((packet, future))
+
+        # Flush on the next loop turn so commands queued together can share a write
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self._flush())
+        return future
+
+    async def send(self, packet: bytes) -> bool:
+        """Queue a command packet and wait for its result."""
+        return await self.submit(packet)
+
+    async def send_batch(self, packets: Iterable[bytes]) -> bool:
+        """Queue several command packets and wait until all have completed."""
+        futures = [self.submit(packet) for packet in packets]
+        results = await asyncio.gather(*futures)
+        return all(results)
+
+    def handle_notification(self, data: bytes) -> bool:
+        """
+        Consume an ACK frame so it is not mistaken for sensor data.
+
+        Args:
+            data: Notification payload
+
+        Returns:
+            True if the payload was an ACK frame
+        """
+        if len(data) != 3 or data[0] != FRAME_ACK:
+            return False
+
+        command_code, status = data[1], data[2]
+        if status == self.ACK_STATUS_OK:
+            _LOGGER.debug(f"ACK for command 0x{command_code:02x}")
+        else:
+            _LOGGER.warning(f"Device rejected command 0x{command_code:02x} with status 0x{status:02x}")
+        return True
+
+    def _next_batch(self) -> List[Tuple[bytes, asyncio.Future]]:
+        """Take the next packet, plus as many as fit in one write when coalescing."""
+        batch = [self._queue.popleft()]
+        size = len(batch[0][0])
+        while self.coalesce and self._queue and size + len(self._queue[0][0]) <= self.max_payload:
+            entry = self._queue.popleft()
+            size += len(entry[0])
+            batch.append(entry)
+        return batch
+
+    async def _flush(self) -> None:
+        """Write queued packets, one write per batch."""
+        while self._queue:
+            batch = self._next_batch()
+            payload = b"".join(packet for packet, _ in batch)
+            # Oversized packets need a long write, which requires a response
+            response = not self.write_without_response or len(payload) > self.max_payload
+
+            try:
+                await self._write(payload, response)
+            except Exception as e:
+                _LOGGER.error(f"Failed to write {len(batch)} queued commands: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(True)
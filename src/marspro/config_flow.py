@@ -7,12 +7,20 @@ import voluptuous as vol
 
 from homeassistant import config_entries
 from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
 
 from .api import MarsProAPI
-from .const import CONF_BLE_MAC, CONF_USE_CLOUD, DOMAIN
+from .const import (
+    CONF_BLE_ADAPTERS,
+    CONF_BLE_MAC,
+    CONF_OPTIMISTIC,
+    CONF_USE_CLOUD,
+    CONF_USE_HA_SESSION,
+    DEFAULT_OPTIMISTIC,
+    DOMAIN,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -20,7 +28,7 @@ _LOGGER = logging.getLogger(__name__)
 class MarsProConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for MarsPro."""
 
-    VERSION = 1
+    VERSION = 2
 
     def __init__(self) -> None:
         """Initialize config flow."""
@@ -66,6 +74,8 @@ class MarsProConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     vol.Required(CONF_PASSWORD): str,
                     vol.Optional(CONF_USE_CLOUD, default=False): bool,
                     vol.Optional(CONF_BLE_MAC): str,
+                    vol.Optional(CONF_BLE_ADAPTERS): str,
+                    vol.Optional(CONF_USE_HA_SESSION, default=False): bool,
                 }
             ),
             errors=errors,
@@ -114,11 +124,48 @@ class MarsProConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     vol.Required(CONF_PASSWORD): str,
                     vol.Optional(CONF_USE_CLOUD, default=False): bool,
                     vol.Optional(CONF_BLE_MAC): str,
+                    vol.Optional(CONF_BLE_ADAPTERS): str,
+                    vol.Optional(CONF_USE_HA_SESSION, default=False): bool,
                 }
             ),
             errors=errors,
         )
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> config_entries.OptionsFlow:
+        """Get the options flow for this handler."""
+        return MarsProOptionsFlow(config_entry)
+
+
+class MarsProOptionsFlow(config_entries.OptionsFlow):
+    """Handle MarsPro options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize options flow."""
+        self.config_entry = config_entry
+
+    async def async_step_init(
+        self, user_input: Optional[Dict[str, Any]] = None
+    ) -> FlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_OPTIMISTIC,
+                        default=self.config_entry.options.get(CONF_OPTIMISTIC, DEFAULT_OPTIMISTIC),
+                    ): bool,
+                }
+            ),
+        )
+
 
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
@@ -0,0 +1,324 @@
+"""
+MarsPro BLE Connection Manager
+
+This module provides a shared pool of live BLE sessions for MarsPro devices.
+Clients borrow a connected BleakClient by address instead of opening their own,
+so many controllers served from one host do not trigger connect storms.
+
+With several HCI adapters configured, new sessions are scheduled across them by
+load and by the signal strength each adapter reports for the device, keeping
+every controller below its concurrent connection limit.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    from bleak import BleakClient
+    BLEAK_AVAILABLE = True
+except ImportError:
+    BleakClient = None
+    BLEAK_AVAILABLE = False
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_ADAPTER = "default"
+
+
+@dataclass
+class PooledSession:
+    """A live BLE session owned by the connection manager."""
+    address: str
+    client: "BleakClient"  # type: ignore
+    adapter: str = DEFAULT_ADAPTER
+    users: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+    connect_kwargs: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def is_connected(self) -> bool:
+        """Check if the underlying client is still connected."""
+        return bool(self.client and self.client.is_connected)
+
+
+class MarsProConnectionManager:
+    """Bounded pool of live BleakClient sessions keyed by device address."""
+
+    # Pool defaults
+    MAX_CONNECTIONS = 20
+    MAX_CONNECTS_PER_ADAPTER = 2
+    MAX_SESSIONS_PER_ADAPTER = 5  # Typical limit of commodity controllers
+    IDLE_TIMEOUT = 120.0
+    CONNECT_TIMEOUT = 10.0
+
+    # Adapter scheduling
+    UNKNOWN_RSSI = -100.0  # Assumed signal for adapters that have not seen a device
+    LOAD_PENALTY = 6.0  # dB of signal traded for one session less on an adapter
+
+    def __init__(
+        self,
+        max_connections: int = MAX_CONNECTIONS,
+        max_connects_per_adapter: int = MAX_CONNECTS_PER_ADAPTER,
+        idle_timeout: float = IDLE_TIMEOUT,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        adapters: Optional[Iterable[str]] = None,
+        max_sessions_per_adapter: int = MAX_SESSIONS_PER_ADAPTER,
+    ):
+        """
+        Initialize the connection manager.
+
+        Args:
+            max_connections: Maximum pooled sessions across all adapters
+            max_connects_per_adapter: Maximum concurrent connects per adapter
+            idle_timeout: Seconds before an unused session is disconnected
+            connect_timeout: Seconds to wait for a connect
+            adapters: HCI adapters to schedule sessions across, e.g. ["hci0", "hci1"];
+                defaults to the system default adapter
+            max_sessions_per_adapter: Maximum pooled sessions per adapter
+        """
+        if not BLEAK_AVAILABLE:
+            raise ImportError("bleak library is required for BLE communication")
+
+        self.max_connections = max_connections
+        self.max_connects_per_adapter = max_connects_per_adapter
+        self.idle_timeout = idle_timeout
+        self.connect_timeout = connect_timeout
+        self.max_sessions_per_adapter = max_sessions_per_adapter
+        self.adapters: List[str] = []
+        self.add_adapters(adapters or [DEFAULT_ADAPTER])
+        # Smoothed RSSI per device per adapter, reported by scanners
+        self._rssi: Dict[str, Dict[str, float]] = {}
+
+        # Ordered by last use so the least recently used session comes first
+        self._sessions: "OrderedDict[str, PooledSession]" = OrderedDict()
+        self._address_locks: Dict[str, asyncio.Lock] = {}
+        self._adapter_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    async def acquire(
+        self,
+        address: str,
+        adapter: Optional[str] = None,
+        connect_kwargs: Optional[Dict[str, Any]] = None,
+    ) -> "BleakClient":  # type: ignore
+        """
+        Borrow a connected client for a device, connecting on demand.
+
+        Args:
+            address: BLE address of the device
+            adapter: HCI adapter to connect through, or None to schedule one
+            connect_kwargs: Backend arguments for connect(), used when a new
+                session has to be opened
+
+        Returns:
+            A connected BleakClient; call release() when done with it
+        """
+        async with self._address_lock(address):
+            session = self._sessions.get(address)
+
+            if session and not session.is_connected:
+                _LOGGER.debug(f"Pooled session for {address} dropped, reconnecting")
+                await self._reconnect(session)
+            elif session is None:
+                await self._make_room()
+                if adapter:
+                    session = await self._open_session(address, adapter, connect_kwargs)
+                else:
+                    session = await self._open_scheduled_session(address, connect_kwargs)
+                self._sessions[address] = session
+
+            session.users += 1
+            session.last_used = time.monotonic()
+            self._sessions.move_to_end(address)
+            return session.client
+
+    def release(self, address: str) -> None:
+        """Return a borrowed client to the pool."""
+        session = self._sessions.get(address)
+        if session:
+            session.users = max(0, session.users - 1)
+            session.last_used = time.monotonic()
+
+    async def disconnect(self, address: str) -> None:
+        """Close the pooled session for a device, regardless of users."""
+        session = self._sessions.pop(address, None)
+        if session:
+            await self._close_session(session)
+
+    async def async_evict_idle(self) -> int:
+        """
+        Disconnect sessions that have been idle longer than the idle timeout.
+
+        Returns:
+            Number of sessions evicted
+        """
+        now = time.monotonic()
+        expired = [
+            session for session in self._sessions.values()
+            if session.users == 0 and now - session.last_used > self.idle_timeout
+        ]
+
+        for session in expired:
+            self._sessions.pop(session.address, None)
+            await self._close_session(session)
+
+        if expired:
+            _LOGGER.debug(f"Evicted {len(expired)} idle BLE sessions")
+        return len(expired)
+
+    async def close(self) -> None:
+        """Disconnect every pooled session."""
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        for session in sessions:
+            await self._close_session(session)
+
+    def add_adapters(self, adapters: Iterable[str]) -> None:
+        """Make more HCI adapters available for new sessions."""
+        adapters = [adapter for adapter in adapters if adapter]
+        if self.adapters == [DEFAULT_ADAPTER] and adapters:
+            # Named adapters replace the implicit default, which is one of them
+            self.adapters = []
+        for adapter in adapters:
+            if adapter not in self.adapters:
+                self.adapters.append(adapter)
+
+    def report_rssi(self, address: str, adapter: Optional[str], rssi: float) -> None:
+        """Record the signal strength at which an adapter hears a device."""
+        self._rssi.setdefault(address, {})[adapter or DEFAULT_ADAPTER] = rssi
+
+    def adapter_load(self, adapter: str) -> int:
+        """Number of pooled sessions on an adapter."""
+        return sum(1 for session in self._sessions.values() if session.adapter == adapter)
+
+    def rank_adapters(self, address: str) -> List[str]:
+        """
+        Order adapters with free capacity by preference for a device.
+
+        Each adapter is scored by the signal at which it hears the device, less
+        LOAD_PENALTY per session it already carries, so nearby adapters win
+        until they fill up and load then spreads to the others.
+        """
+        rssi = self._rssi.get(address, {})
+        scores = {}
+        for adapter in self.adapters:
+            load = self.adapter_load(adapter)
+            if load < self.max_sessions_per_adapter:
+                scores[adapter] = rssi.get(adapter, self.UNKNOWN_RSSI) - self.LOAD_PENALTY * load
+        return sorted(scores, key=lambda adapter: scores[adapter], reverse=True)
+
+    def get_session(self, address: str) -> Optional[PooledSession]:
+        """Get the pooled session for a device, if any."""
+        return self._sessions.get(address)
+
+    @property
+    def addresses(self) -> List[str]:
+        """Addresses with a pooled session, least recently used first."""
+        return list(self._sessions)
+
+    def _address_lock(self, address: str) -> asyncio.Lock:
+        """Get the lock serialising connects to one device."""
+        lock = self._address_locks.get(address)
+        if lock is None:
+            lock = self._address_locks[address] = asyncio.Lock()
+        return lock
+
+    def _adapter_semaphore(self, adapter: str) -> asyncio.Semaphore:
+        """Get the semaphore limiting concurrent connects on one adapter."""
+        semaphore = self._adapter_semaphores.get(adapter)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_connects_per_adapter)
+            self._adapter_semaphores[adapter] = semaphore
+        return semaphore
+
+    async def _make_room(self) -> None:
+        """Evict sessions until there is room for a new one."""
+        await self.async_evict_idle()
+
+        while len(self._sessions) >= self.max_connections:
+            await self._evict_lru()
+
+    async def _evict_lru(self, adapters: Optional[List[str]] = None) -> str:
+        """
+        Close the least recently used idle session.
+
+        Args:
+            adapters: Only consider sessions on these adapters
+
+        Returns:
+            The adapter the evicted session was using
+        """
+        victim = next(
+            (
+                session for session in self._sessions.values()
+                if session.users == 0 and (adapters is None or session.adapter in adapters)
+            ),
+            None,
+        )
+        if victim is None:
+            raise RuntimeError(
+                f"BLE connection pool exhausted ({len(self._sessions)} sessions in use)"
+            )
+        _LOGGER.debug(f"Evicting least recently used BLE session {victim.address}")
+        self._sessions.pop(victim.address, None)
+        await self._close_session(victim)
+        return victim.adapter
+
+    def _create_client(self, address: str, adapter: str) -> "BleakClient":  # type: ignore
+        """Create a BleakClient bound to an adapter."""
+        if adapter == DEFAULT_ADAPTER:
+            return BleakClient(address)  # type: ignore
+        return BleakClient(address, adapter=adapter)  # type: ignore
+
+    async def _open_session(
+        self, address: str, adapter: str, connect_kwargs: Optional[Dict[str, Any]] = None
+    ) -> PooledSession:
+        """Open a new session through the adapter's connect semaphore."""
+        session = PooledSession(
+            address=address,
+            client=self._create_client(address, adapter),
+            adapter=adapter,
+            connect_kwargs=dict(connect_kwargs or {}),
+        )
+        await self._connect(session)
+        return session
+
+    async def _open_scheduled_session(
+        self, address: str, connect_kwargs: Optional[Dict[str, Any]] = None
+    ) -> PooledSession:
+        """Open a session on the best adapter, falling back to the next on failure."""
+        candidates = self.rank_adapters(address)
+        if not candidates:
+            # Every adapter is at its session limit
+            candidates = [await self._evict_lru(self.adapters)]
+
+        last_error: Optional[Exception] = None
+        for adapter in candidates:
+            try:
+                return await self._open_session(address, adapter, connect_kwargs)
+            except Exception as e:
+                _LOGGER.debug(f"Connecting {address} via {adapter} failed: {e}")
+                last_error = e
+        raise last_error  # type: ignore
+
+    async def _reconnect(self, session: PooledSession) -> None:
+        """Reconnect a dropped session in place."""
+        session.client = self._create_client(session.address, session.adapter)
+        await self._connect(session)
+
+    async def _connect(self, session: PooledSession) -> None:
+        """Connect a session's client, honouring the per-adapter limit."""
+        async with self._adapter_semaphore(session.adapter):
+            _LOGGER.info(f"Connecting pooled BLE session to {session.address} via {session.adapter}")
+            await session.client.connect(timeout=self.connect_timeout, **session.connect_kwargs)  # type: ignore
+
+    async def _close_session(self, session: PooledSession) -> None:
+        """Disconnect a session's client, ignoring errors."""
+        try:
+            if session.is_connected:
+                await session.client.disconnect()  # type: ignore
+        except Exception as e:
+            _LOGGER.debug(f"Error disconnecting pooled session {session.address}: {e}")
@@ -10,14 +10,39 @@ CONF_PASSWORD = "password"
 CONF_USE_CLOUD = "use_cloud"
 CONF_BLE_MAC = "ble_mac"
 CONF_SCAN_INTERVAL = "scan_interval"
+CONF_USE_HA_SESSION = "use_ha_session"
+CONF_BLE_ADAPTERS = "ble_adapters"
+CONF_OPTIMISTIC = "optimistic"
 
 # Platforms
 PLATFORMS = [Platform.LIGHT, Platform.FAN, Platform.SENSOR]
 
 # Default values
 DEFAULT_SCAN_INTERVAL = 30
+DEFAULT_MIN_POLL_INTERVAL = 10
+DEFAULT_MAX_POLL_INTERVAL = 300
+DEFAULT_POLL_JITTER = 0.1
+DEFAULT_COMMAND_REFRESH_DELAY = 1.0
+DEFAULT_OPTIMISTIC = True
+DEFAULT_OPTIMISTIC_TIMEOUT = 30
+DEFAULT_PUSH_FALLBACK_INTERVAL = 300
 DEFAULT_TIMEOUT = 10
+DEFAULT_MAX_CONCURRENT_REQUESTS = 8
+DEFAULT_STATUS_BATCH_SIZE = 50
+DEFAULT_DEVICE_LIST_REFRESH_INTERVAL = 600
+# Minimum spacing of stored sensor samples, in seconds
+DEFAULT_SAMPLE_INTERVAL = 30
+# Device state only status reads provide until a pushed frame carries it
+POLLED_STATE_KEYS = ("power", "brightness")
+
+# HTTP connection pool defaults
+DEFAULT_HTTP_POOL_LIMIT = 20
+DEFAULT_HTTP_POOL_LIMIT_PER_HOST = 10
+DEFAULT_HTTP_KEEPALIVE_TIMEOUT = 60
+DEFAULT_DNS_CACHE_TTL = 300
 DEFAULT_RETRY_ATTEMPTS = 3
+DEFAULT_TOKEN_REFRESH_MARGIN = 300
+DEFAULT_BLE_IDLE_EVICT_INTERVAL = 60
 
 # BLE Service UUIDs (to be discovered)
 # These are placeholder values based on common IoT patterns
@@ -44,6 +69,10 @@ CMD_SET_COLOR = "set_color"
 CMD_SET_FAN_SPEED = "set_fan_speed"
 CMD_GET_STATUS = "get_status"
 
+# Units
+UNIT_PPFD = "µmol/m²/s"
+UNIT_DLI = "mol/m²/d"
+
 # Status values
 STATUS_ON = "on"
 STATUS_OFF = "off"
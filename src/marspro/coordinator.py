@@ -1,19 +1,51 @@
 """Data coordinator for MarsPro integration."""
 
 import asyncio
+import copy
 import logging
+import time
+from dataclasses import dataclass
 from datetime import timedelta
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.debounce import Debouncer
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
 from .api import MarsProAPI
-from .const import DEFAULT_SCAN_INTERVAL
+from .ble_client import MarsProDeviceScanner, MarsProSensorData, get_device_scanner
+from .connection_manager import DEFAULT_ADAPTER
+from .derived import DLI_WINDOW, compute_derived_metrics
+from .frame_decoder import RAW_FRAME_KEY, SENSOR_FIELDS
+from .poll_scheduler import MarsProPollScheduler
+from .sample_store import MarsProSample, MarsProSampleStore
+from .const import (
+    DEFAULT_COMMAND_REFRESH_DELAY,
+    DEFAULT_DEVICE_LIST_REFRESH_INTERVAL,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_PUSH_FALLBACK_INTERVAL,
+    DEFAULT_SAMPLE_INTERVAL,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_TIMEOUT,
+    POLLED_STATE_KEYS,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@dataclass
+class ReconciliationStats:
+    """How often optimistic entity states matched the device."""
+    confirmed: int = 0
+    mismatched: int = 0
+
+    @property
+    def mismatch_rate(self) -> float:
+        """Fraction of reconciliations where the device disagreed."""
+        total = self.confirmed + self.mismatched
+        return self.mismatched / total if total else 0.0
+
+
 class MarsProDataUpdateCoordinator(DataUpdateCoordinator):
     """Class to manage fetching MarsPro data."""
 
@@ -27,54 +59,464 @@ class MarsProDataUpdateCoordinator(DataUpdateCoordinator):
         )
         self.api = api
         self.devices: Dict[str, Dict[str, Any]] = {}
+        self.push_enabled = False
+        # Devices whose pushed frames carry their full state, polled only as a
+        # liveness fallback; every other device stays on the adaptive schedule
+        self._push_complete: Set[str] = set()
+        self._push_fallback_time = 0.0
+        self.poll_scheduler = MarsProPollScheduler()
+        self.reconciliation_stats = ReconciliationStats()
+        # Monotonic time each device's status was last read
+        self._status_times: Dict[str, float] = {}
+        # Entities listening to a single device, and the device states they last saw
+        self._device_listeners: Dict[str, List[CALLBACK_TYPE]] = {}
+        self._published_devices: Dict[str, Dict[str, Any]] = {}
+        self._published_success = True
+        self._remove_dispatcher: Optional[CALLBACK_TYPE] = None
+        # Devices sent commands since their last status read; the next read is
+        # always dispatched so entities can reconcile even if nothing changed
+        self._awaiting_status: Set[str] = set()
+        self._force_dispatch: Set[str] = set()
+        # Entities written together when their device changes
+        self._device_entities: Dict[str, List[Any]] = {}
+        self._device_entity_listeners: Dict[str, Callable[[], None]] = {}
+        # Sensor history of devices that report readings
+        self.sample_stores: Dict[str, MarsProSampleStore] = {}
+        # Device list reused across adaptive wakeups, and when it was fetched
+        self._device_list: Optional[List[Dict[str, Any]]] = None
+        self._device_list_time = 0.0
+        # One shared scanner per adapter, whose RSSI also steers connections
+        self._telemetry_scanners: List[MarsProDeviceScanner] = []
+        # Commands sent within the debounce window share one targeted refresh
+        self._pending_device_refresh: Set[str] = set()
+        self._device_refresh_debouncer = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=DEFAULT_COMMAND_REFRESH_DELAY,
+            immediate=False,
+            function=self._async_refresh_pending_devices,
+        )
 
     async def _async_update_data(self) -> Dict[str, Any]:
         """Update data via API."""
         try:
             # Get devices
-            devices = await self.api.get_devices()
+            device_list = await self._async_get_device_list()
+            
+            # Update the status of devices that are due concurrently
+            devices = [dict(device) for device in device_list if device.get("id")]
+            device_ids = [device["id"] for device in devices]
+            pushed_ids = self._pushed_device_ids(device_ids)
+            due_ids = self.poll_scheduler.due(
+                [device_id for device_id in device_ids if device_id not in pushed_ids]
+            )
+            now = time.monotonic()
+            if pushed_ids and now - self._push_fallback_time >= DEFAULT_PUSH_FALLBACK_INTERVAL:
+                # Pushes keep these devices current, polling only checks they are alive
+                due_ids.extend(pushed_ids)
+                self._push_fallback_time = now
+            statuses = await self._async_fetch_statuses(due_ids)
             
-            # Update device status
             updated_devices = {}
             for device in devices:
-                device_id = device.get("id")
-                if device_id:
-                    try:
-                        status = await self.api.get_device_status(device_id)
-                        device.update(status)
-                        updated_devices[device_id] = device
-                    except Exception as ex:
-                        _LOGGER.warning("Failed to get status for device %s: %s", device_id, ex)
-                        # Keep existing device data if status update fails
-                        if device_id in self.devices:
-                            updated_devices[device_id] = self.devices[device_id]
-                        else:
-                            updated_devices[device_id] = device
+                device_id = device["id"]
+                if device_id not in statuses and device_id in self.devices:
+                    # Not due yet
+                    updated_devices[device_id] = self.devices[device_id]
+                    continue
+                
+                status = statuses.get(device_id)
+                if status is not None:
+                    if device_id not in pushed_ids:
+                        self.poll_scheduler.record(device_id, status)
+                    self._mark_status_read(device_id)
+                    device.update(status)
+                    updated_devices[device_id] = device
+                    self._record_sample(device_id, device)
+                    continue
+                
+                if device_id not in pushed_ids:
+                    self.poll_scheduler.record_failure(device_id)
+                if device_id in self.devices:
+                    # Keep existing device data if status update fails
+                    updated_devices[device_id] = self.devices[device_id]
+                else:
+                    updated_devices[device_id] = device
             
+            for device_id in self.devices.keys() - updated_devices.keys():
+                self.poll_scheduler.remove(device_id)
+                self._status_times.pop(device_id, None)
+                self._awaiting_status.discard(device_id)
+                self._push_complete.discard(device_id)
+                self.sample_stores.pop(device_id, None)
             self.devices = updated_devices
             
-            return {
-                "devices": updated_devices,
-                "last_update": asyncio.get_event_loop().time(),
-            }
+            # Wake up when the next device is due
+            wakeup = self.poll_scheduler.next_wakeup()
+            if pushed_ids:
+                fallback_wakeup = max(
+                    self.poll_scheduler.min_interval,
+                    DEFAULT_PUSH_FALLBACK_INTERVAL - (time.monotonic() - self._push_fallback_time),
+                )
+                wakeup = fallback_wakeup if len(pushed_ids) == len(device_ids) else min(wakeup, fallback_wakeup)
+            self.update_interval = timedelta(seconds=wakeup)
+            
+            return self._build_data()
             
         except Exception as ex:
             _LOGGER.error("Failed to update MarsPro data: %s", ex)
+            # The device list may be what is stale
+            self._device_list = None
             raise UpdateFailed(f"Failed to update MarsPro data: {ex}") from ex
 
+    async def _async_get_device_list(self) -> List[Dict[str, Any]]:
+        """Get the device list, fetching it only every few minutes."""
+        now = time.monotonic()
+        if (
+            self._device_list is None
+            or now - self._device_list_time >= DEFAULT_DEVICE_LIST_REFRESH_INTERVAL
+        ):
+            # Wakeups come as often as the minimum poll interval, devices rarely change
+            self._device_list = await self.api.get_devices()
+            self._device_list_time = now
+        return self._device_list
+
+    async def _async_fetch_statuses(
+        self, device_ids: List[str]
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Fetch device statuses with bounded fan-out and per-device deadlines.
+
+        Devices that fail or time out map to None so one slow device cannot
+        stall the others.
+        """
+        if self.api.use_cloud:
+            # The API batches cloud requests itself
+            try:
+                statuses = await self.api.get_devices_status(device_ids)
+            except Exception as ex:
+                _LOGGER.warning("Failed to get device statuses: %s", ex)
+                statuses = {}
+            return {device_id: statuses.get(device_id) for device_id in device_ids}
+
+        semaphore = asyncio.Semaphore(DEFAULT_MAX_CONCURRENT_REQUESTS)
+
+        async def fetch(device_id: str) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(
+                        self.api.get_device_status(device_id), DEFAULT_TIMEOUT
+                    )
+                except asyncio.TimeoutError:
+                    _LOGGER.warning("Timed out getting status for device %s", device_id)
+                except Exception as ex:
+                    _LOGGER.warning("Failed to get status for device %s: %s", device_id, ex)
+                return None
+
+        results = await asyncio.gather(*(fetch(device_id) for device_id in device_ids))
+        return dict(zip(device_ids, results))
+
+    async def async_request_device_refresh(self, device_id: str) -> None:
+        """Request a debounced refresh of a single device."""
+        self._pending_device_refresh.add(device_id)
+        await self._device_refresh_debouncer.async_call()
+
+    async def _async_refresh_pending_devices(self) -> None:
+        """Refresh only the devices that were sent commands."""
+        device_ids = [
+            device_id for device_id in self._pending_device_refresh
+            if device_id in self.devices
+        ]
+        self._pending_device_refresh.clear()
+        if not device_ids:
+            return
+
+        statuses = await self._async_fetch_statuses(device_ids)
+        updated_devices = dict(self.devices)
+        for device_id, status in statuses.items():
+            if status is None:
+                continue
+            self.poll_scheduler.record(device_id, status)
+            self._mark_status_read(device_id)
+            updated_devices[device_id] = {**updated_devices[device_id], **status}
+            self._record_sample(device_id, updated_devices[device_id])
+
+        self.devices = updated_devices
+        self.async_set_updated_data(self._build_data())
+
+    async def async_shutdown(self) -> None:
+        """Cancel pending refreshes and shut down."""
+        self._device_refresh_debouncer.async_cancel()
+        await super().async_shutdown()
+
+    def _build_data(self) -> Dict[str, Any]:
+        """Build coordinator data from the current device states."""
+        return {
+            "devices": self.devices,
+            "last_update": asyncio.get_event_loop().time(),
+        }
+
+    async def async_enable_push(self) -> bool:
+        """
+        Switch to notification-driven updates where every device supports them.
+
+        Polling continues at a slow interval as a liveness fallback.
+        """
+        if not self.devices:
+            return False
+
+        subscribed: List[str] = []
+        try:
+            for device_id in self.devices:
+                if not await self.api.subscribe(device_id, self._handle_push_update):
+                    _LOGGER.debug("Device %s does not push updates, keeping polling", device_id)
+                    break
+                subscribed.append(device_id)
+        finally:
+            if len(subscribed) < len(self.devices):
+                # Polling covers every device, so drop the subscriptions that did succeed
+                for device_id in subscribed:
+                    await self.api.unsubscribe(device_id)
+
+        if len(subscribed) < len(self.devices):
+            return False
+
+        self.push_enabled = True
+        self._push_fallback_time = time.monotonic()
+        _LOGGER.info("MarsPro push updates enabled for %d devices", len(self.devices))
+        return True
+
+    def _pushed_device_ids(self, device_ids: List[str]) -> List[str]:
+        """Get the devices kept current by pushes, which only need a liveness poll."""
+        if not self.push_enabled or not self._push_complete:
+            return []
+        if not self.api.push_active:
+            # The link dropped; polling these devices right away reconnects
+            # and restarts the notifications
+            _LOGGER.debug("MarsPro notifications inactive, polling all devices")
+            self._push_complete.clear()
+            return []
+        return [device_id for device_id in device_ids if device_id in self._push_complete]
+
+    @callback
+    def _handle_push_update(self, device_id: str, status: Dict[str, Any]) -> None:
+        """Merge a pushed status update and notify entities."""
+        if device_id not in self.devices:
+            return
+
+        if (
+            self.push_enabled
+            and device_id not in self._push_complete
+            and all(key in status for key in POLLED_STATE_KEYS)
+        ):
+            # Pushes now carry the full state, stop the adaptive polling; a
+            # forgotten device is due as soon as it is polled again
+            self._push_complete.add(device_id)
+            self.poll_scheduler.remove(device_id)
+
+        self.devices = {**self.devices, device_id: {**self.devices[device_id], **status}}
+        self._record_sample(device_id, self.devices[device_id])
+        self.async_set_updated_data(self._build_data())
+
+    async def async_start_passive_telemetry(self) -> bool:
+        """Update sensor readings from BLE advertisements without connecting."""
+        if self.api.use_cloud or self._telemetry_scanners:
+            return False
+
+        manager = self.api.connection_manager
+        adapters = [
+            None if adapter == DEFAULT_ADAPTER else adapter
+            for adapter in (manager.adapters if manager else [DEFAULT_ADAPTER])
+        ]
+        for adapter in adapters:
+            try:
+                scanner = get_device_scanner(adapter, manager)
+                await scanner.start_passive_telemetry(self._handle_advertisement)
+            except Exception as ex:
+                _LOGGER.debug("Advertisement telemetry unavailable on %s: %s", adapter, ex)
+                continue
+            self._telemetry_scanners.append(scanner)
+
+        return bool(self._telemetry_scanners)
+
+    async def async_stop_passive_telemetry(self) -> None:
+        """Stop updating sensor readings from BLE advertisements."""
+        scanners, self._telemetry_scanners = self._telemetry_scanners, []
+        for scanner in scanners:
+            await scanner.stop_passive_telemetry(self._handle_advertisement)
+
+    @callback
+    def _handle_advertisement(self, address: str, sensor_data: MarsProSensorData) -> None:
+        """Merge sensor readings broadcast by a known device."""
+        address = address.upper()
+        for device_id, device in self.devices.items():
+            mac = device.get("mac") or device.get("mac_address") or device_id
+            if str(mac).upper() == address:
+                break
+        else:
+            return
+
+        status = {
+            name: value
+            for name, value in vars(sensor_data).items()
+            if value is not None and name not in ("timestamp", "raw")
+        }
+        if sensor_data.raw is not None:
+            status[RAW_FRAME_KEY] = sensor_data.raw.hex()
+        if all(device.get(name) == value for name, value in status.items()):
+            # Already merged, e.g. from another adapter's scanner
+            return
+        self._handle_push_update(device_id, status)
+
     async def send_command(self, device_id: str, command: str, **kwargs: Any) -> Dict[str, Any]:
         """Send command to device."""
         try:
             result = await self.api.send_command(device_id, command, **kwargs)
+            self.poll_scheduler.notify_command(device_id)
+            self._awaiting_status.add(device_id)
             
-            # Refresh data after command
-            await self.async_request_refresh()
+            # Refresh the device once the commands have settled
+            await self.async_request_device_refresh(device_id)
             
             return result
         except Exception as ex:
             _LOGGER.error("Failed to send command %s to device %s: %s", command, device_id, ex)
             raise
 
+    async def send_commands(
+        self, device_id: str, commands: List[Tuple[str, Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        """Send several commands to a device in one batch."""
+        try:
+            results = await self.api.send_commands(device_id, commands)
+            self.poll_scheduler.notify_command(device_id)
+            self._awaiting_status.add(device_id)
+            
+            # Refresh the device once the commands have settled
+            await self.async_request_device_refresh(device_id)
+            
+            return results
+        except Exception as ex:
+            _LOGGER.error("Failed to send commands to device %s: %s", device_id, ex)
+            raise
+
+    @callback
+    def async_add_device_listener(
+        self, device_id: str, update_callback: CALLBACK_TYPE
+    ) -> Callable[[], None]:
+        """
+        Listen for changes to one device.
+
+        The callback only runs when the device's data or the coordinator's
+        availability changed since the last update.
+        """
+        if self._remove_dispatcher is None:
+            # A single coordinator listener keeps refreshes scheduled
+            self._remove_dispatcher = self.async_add_listener(self._async_dispatch_device_updates)
+        self._device_listeners.setdefault(device_id, []).append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            listeners = self._device_listeners.get(device_id, [])
+            if update_callback in listeners:
+                listeners.remove(update_callback)
+            if not listeners:
+                self._device_listeners.pop(device_id, None)
+            if not self._device_listeners and self._remove_dispatcher:
+                self._remove_dispatcher()
+                self._remove_dispatcher = None
+
+        return remove_listener
+
+    @callback
+    def _async_dispatch_device_updates(self) -> None:
+        """Notify the listeners of devices whose data changed."""
+        # Only changed devices are copied again; deep copies, so nested values
+        # mutated in place still compare as changed
+        updated = {
+            device_id for device_id, device in self.devices.items()
+            if device != self._published_devices.get(device_id)
+        }
+        removed = self._published_devices.keys() - self.devices.keys()
+        for device_id in updated:
+            self._published_devices[device_id] = copy.deepcopy(self.devices[device_id])
+        for device_id in removed:
+            del self._published_devices[device_id]
+
+        if self.last_update_success != self._published_success:
+            # Availability changed for every entity
+            self._published_success = self.last_update_success
+            changed = set(self._device_listeners)
+        else:
+            changed = (updated | removed | self._force_dispatch) & self._device_listeners.keys()
+        self._force_dispatch.clear()
+
+        for device_id in changed:
+            for update_callback in list(self._device_listeners.get(device_id, [])):
+                update_callback()
+
+    @callback
+    def async_add_device_entity(self, device_id: str, entity: Any) -> Callable[[], None]:
+        """
+        Write an entity's state whenever its device changes.
+
+        All entities of a device share one device listener, so a refresh
+        writes them in a single pass instead of one callback per entity.
+        """
+        if device_id not in self._device_entities:
+            self._device_entities[device_id] = []
+            self._device_entity_listeners[device_id] = self.async_add_device_listener(
+                device_id, lambda: self._async_write_device_entities(device_id)
+            )
+        entities = self._device_entities[device_id]
+        entities.append(entity)
+
+        @callback
+        def remove_entity() -> None:
+            if entity in entities:
+                entities.remove(entity)
+            if not entities and self._device_entities.get(device_id) is entities:
+                del self._device_entities[device_id]
+                self._device_entity_listeners.pop(device_id)()
+
+        return remove_entity
+
+    @callback
+    def _async_write_device_entities(self, device_id: str) -> None:
+        """Let every entity of a device update and write its state."""
+        for entity in list(self._device_entities.get(device_id, [])):
+            entity._handle_coordinator_update()
+
+    def _record_sample(self, device_id: str, device: Dict[str, Any]) -> None:
+        """Add a device's current sensor readings to its history and derive metrics."""
+        values = {name: device.get(name) for name in SENSOR_FIELDS}
+        if all(value is None for value in values.values()):
+            return
+        store = self.sample_stores.get(device_id)
+        if store is None:
+            # Downsampled so a full DLI window fits however often readings arrive
+            store = self.sample_stores[device_id] = MarsProSampleStore.for_window(
+                DLI_WINDOW, DEFAULT_SAMPLE_INTERVAL
+            )
+        store.append(MarsProSample(timestamp=time.time(), **values))
+        # Computed once per sample, entities only read the cached values
+        device.update(compute_derived_metrics(store))
+
+    def get_sample_store(self, device_id: str) -> Optional[MarsProSampleStore]:
+        """Get a device's sensor history, if it reports readings."""
+        return self.sample_stores.get(device_id)
+
+    def _mark_status_read(self, device_id: str) -> None:
+        """Record that a device's full status was just read."""
+        self._status_times[device_id] = time.monotonic()
+        if device_id in self._awaiting_status:
+            self._awaiting_status.discard(device_id)
+            self._force_dispatch.add(device_id)
+
+    def get_status_time(self, device_id: str) -> float:
+        """Monotonic time the device's full status was last read, or 0."""
+        return self._status_times.get(device_id, 0.0)
+
     def get_device(self, device_id: str) -> Dict[str, Any]:
         """Get device data."""
         return self.devices.get(device_id, {})
@@ -0,0 +1,120 @@
+"""
+MarsPro Derived Metrics
+
+This module computes horticultural metrics from raw sensor readings: air vapour
+pressure deficit and dew point from temperature and humidity, and the rolling
+daily light integral (DLI) from the PPFD history in a sample store. The DLI is a
+trapezoidal integral over the store's columns, vectorized with NumPy when it is
+installed and computed in a plain loop otherwise.
+"""
+
+import math
+import time
+from array import array
+from typing import Dict, Optional
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+from .sample_store import MarsProSampleStore
+
+# Rolling DLI window
+DLI_WINDOW = 86400.0
+# Gaps longer than this (e.g. the device was offline) are not interpolated
+DLI_MAX_GAP = 3600.0
+
+# Magnus coefficients (Sonntag 1990), valid from -45 to 60 °C
+_MAGNUS_B = 17.62
+_MAGNUS_C = 243.12
+
+
+def saturation_vapor_pressure(temperature: float) -> float:
+    """Saturation vapour pressure in kPa at a temperature in °C (Tetens)."""
+    return 0.6108 * math.exp(17.27 * temperature / (temperature + 237.3))
+
+
+def vapor_pressure_deficit(temperature: float, humidity: float) -> float:
+    """Air vapour pressure deficit in kPa."""
+    return saturation_vapor_pressure(temperature) * (1 - humidity / 100)
+
+
+def dew_point(temperature: float, humidity: float) -> Optional[float]:
+    """Dew point in °C, or None when the humidity is not positive."""
+    if humidity <= 0:
+        return None
+    gamma = math.log(humidity / 100) + _MAGNUS_B * temperature / (_MAGNUS_C + temperature)
+    return _MAGNUS_C * gamma / (_MAGNUS_B - gamma)
+
+
+def daily_light_integral(
+    timestamps: array,
+    ppfd: array,
+    now: Optional[float] = None,
+    window: float = DLI_WINDOW,
+) -> float:
+    """
+    Integrate PPFD over the trailing window.
+
+    Args:
+        timestamps: Sample times in seconds, oldest first
+        ppfd: PPFD in µmol/m²/s per sample, NaN where missing
+        now: End of the window, defaults to the current time
+        window: Window length in seconds
+
+    Returns:
+        Light integral in mol/m² over the window
+    """
+    start = (time.time() if now is None else now) - window
+
+    if NUMPY_AVAILABLE:
+        t = np.frombuffer(timestamps, dtype=np.float64)
+        p = np.frombuffer(ppfd, dtype=np.float64)
+        in_window = t >= start
+        t, p = t[in_window], p[in_window]
+        dt = np.diff(t)
+        mean = (p[1:] + p[:-1]) / 2
+        valid = ~np.isnan(mean) & (dt > 0) & (dt <= DLI_MAX_GAP)
+        return float(np.sum(mean[valid] * dt[valid])) / 1e6
+
+    total = 0.0
+    previous_t = previous_p = None
+    for t, p in zip(timestamps, ppfd):
+        if t < start:
+            continue
+        if previous_t is not None and 0 < t - previous_t <= DLI_MAX_GAP:
+            mean = (p + previous_p) / 2
+            if not math.isnan(mean):
+                total += mean * (t - previous_t)
+        previous_t, previous_p = t, p
+    return total / 1e6
+
+
+def compute_derived_metrics(store: MarsProSampleStore) -> Dict[str, float]:
+    """
+    Compute the derived metrics for the newest sample in a store.
+
+    Returns:
+        Dictionary with calculated_vpd, dew_point and dli where the inputs exist
+    """
+    latest = store.latest()
+    if latest is None:
+        return {}
+
+    metrics: Dict[str, float] = {}
+    if latest.temperature is not None and latest.humidity is not None:
+        metrics["calculated_vpd"] = round(
+            vapor_pressure_deficit(latest.temperature, latest.humidity), 3
+        )
+        dew = dew_point(latest.temperature, latest.humidity)
+        if dew is not None:
+            metrics["dew_point"] = round(dew, 2)
+    if latest.ppfd is not None:
+        metrics["dli"] = round(
+            daily_light_integral(store.column("timestamp"), store.column("ppfd"), latest.timestamp),
+            2,
+        )
+    return metrics
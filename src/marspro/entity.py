@@ -0,0 +1,57 @@
+"""Base entity for MarsPro integration."""
+
+from typing import Any, Dict
+
+from homeassistant.core import callback
+from homeassistant.helpers.entity import DeviceInfo, Entity
+
+from .const import DOMAIN
+from .coordinator import MarsProDataUpdateCoordinator
+
+
+class MarsProEntity(Entity):
+    """Entity that reads its state from the coordinator's device snapshot."""
+
+    _attr_should_poll = False
+
+    def __init__(
+        self, coordinator: MarsProDataUpdateCoordinator, device: Dict[str, Any]
+    ) -> None:
+        """Initialize the entity."""
+        self.coordinator = coordinator
+        self.device_id = device.get("id")
+
+    @property
+    def device_data(self) -> Dict[str, Any]:
+        """Current data of the device, shared by all of its entities."""
+        return self.coordinator.get_device(self.device_id)
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return device info."""
+        device = self.device_data
+        return DeviceInfo(
+            identifiers={(DOMAIN, self.device_id)},
+            name=device.get("name", f"MarsPro {self.device_id}"),
+            manufacturer="MarsPro",
+            model=device.get("model", "Unknown"),
+            sw_version=device.get("firmware_version", "Unknown"),
+        )
+
+    @property
+    def available(self) -> bool:
+        """Return True if entity is available."""
+        return self.coordinator.last_update_success and bool(self.device_data)
+
+    async def async_added_to_hass(self) -> None:
+        """When entity is added to hass."""
+        await super().async_added_to_hass()
+        # Entities of one device are written together when its data changes
+        self.async_on_remove(
+            self.coordinator.async_add_device_entity(self.device_id, self)
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the entity's state after its device's data changed."""
+        self.async_write_ha_state()
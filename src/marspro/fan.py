@@ -0,0 +1,110 @@
+"""Fan platform for MarsPro integration."""
+
+import logging
+from typing import Any, Dict, Optional
+
+from homeassistant.components.fan import FanEntity, FanEntityFeature
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import (
+    CMD_POWER_OFF,
+    CMD_POWER_ON,
+    CMD_SET_FAN_SPEED,
+    DEVICE_TYPE_FAN,
+    DOMAIN,
+    STATUS_ON,
+)
+from .coordinator import MarsProDataUpdateCoordinator
+from .entity import MarsProEntity
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up MarsPro fan based on a config entry."""
+    coordinator: MarsProDataUpdateCoordinator = hass.data[DOMAIN][config_entry.entry_id]
+
+    entities = [
+        MarsProFan(coordinator, device)
+        for device in coordinator.get_devices_by_type(DEVICE_TYPE_FAN)
+    ]
+
+    if entities:
+        async_add_entities(entities)
+
+
+class MarsProFan(MarsProEntity, FanEntity):
+    """Representation of a MarsPro fan."""
+
+    # TURN_ON/TURN_OFF only exist from Home Assistant 2024.8 on
+    _attr_supported_features = (
+        FanEntityFeature.SET_SPEED
+        | getattr(FanEntityFeature, "TURN_ON", 0)
+        | getattr(FanEntityFeature, "TURN_OFF", 0)
+    )
+    _enable_turn_on_off_backwards_compatibility = False
+
+    def __init__(
+        self, coordinator: MarsProDataUpdateCoordinator, device: Dict[str, Any]
+    ) -> None:
+        """Initialize the fan."""
+        super().__init__(coordinator, device)
+        self._attr_name = device.get("name", f"MarsPro Fan {self.device_id}")
+        self._attr_unique_id = f"{DOMAIN}_{self.device_id}_fan"
+
+    @property
+    def is_on(self) -> bool:
+        """Return True if the fan is on."""
+        return self.device_data.get("power") == STATUS_ON
+
+    @property
+    def percentage(self) -> Optional[int]:
+        """Return the fan speed in percent."""
+        if not self.is_on:
+            return 0
+        return self.device_data.get("fan_speed")
+
+    async def async_turn_on(
+        self,
+        percentage: Optional[int] = None,
+        preset_mode: Optional[str] = None,
+        **kwargs: Any,
+    ) -> None:
+        """Turn the fan on."""
+        commands = [(CMD_POWER_ON, {})]
+        if percentage is not None:
+            commands.append((CMD_SET_FAN_SPEED, {"fan_speed": percentage}))
+
+        try:
+            await self.coordinator.send_commands(self.device_id, commands)
+        except Exception as ex:
+            _LOGGER.error("Failed to turn on fan %s: %s", self.device_id, ex)
+            raise
+
+    async def async_turn_off(self, **kwargs: Any) -> None:
+        """Turn the fan off."""
+        try:
+            await self.coordinator.send_command(self.device_id, CMD_POWER_OFF)
+        except Exception as ex:
+            _LOGGER.error("Failed to turn off fan %s: %s", self.device_id, ex)
+            raise
+
+    async def async_set_percentage(self, percentage: int) -> None:
+        """Set the fan speed."""
+        if percentage == 0:
+            await self.async_turn_off()
+            return
+
+        try:
+            await self.coordinator.send_command(
+                self.device_id, CMD_SET_FAN_SPEED, fan_speed=percentage
+            )
+        except Exception as ex:
+            _LOGGER.error("Failed to set speed of fan %s: %s", self.device_id, ex)
+            raise
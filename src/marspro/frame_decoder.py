@@ -0,0 +1,175 @@
+"""
+MarsPro Sensor Frame Decoder
+
+This module decodes binary sensor frames received from MarsPro devices. Each frame
+starts with a one-byte frame type that selects a precompiled little-endian layout
+from FRAME_LAYOUTS; the values are unpacked straight from the notification buffer.
+
+PROVISIONAL: none of the layouts below, nor the ACK frame, has been confirmed
+against captures from real firmware yet. They are placeholders that mirror the
+sensor set of the app and will be replaced as dynamic analysis uncovers the
+actual protocol. Until then a frame is only decoded when its type is known and
+its length matches the layout exactly; anything else is kept as raw bytes by the
+callers rather than being guessed at.
+"""
+
+import struct
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple, Union
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+# Sensor fields in MarsProSensorData order
+SENSOR_FIELDS: Tuple[str, ...] = (
+    "temperature",
+    "humidity",
+    "co2",
+    "vpd",
+    "ppfd",
+    "wind_speed",
+    "wind_pressure",
+    "air_volume",
+)
+
+# Status key holding the raw bytes, as hex, of a frame that matched no layout
+RAW_FRAME_KEY = "raw_frame"
+
+# Frame types (first byte of every frame); provisional placeholders, see above
+FRAME_SENSOR_DATA = 0x02  # Provisional
+FRAME_CLIMATE = 0x03  # Provisional
+FRAME_LIGHT = 0x04  # Provisional
+FRAME_AIR = 0x05  # Provisional
+FRAME_ACK = 0xA0  # Provisional: [FRAME_ACK, command code, status]
+
+
+@dataclass(frozen=True)
+class FrameLayout:
+    """Binary layout of one frame type."""
+    frame_type: int
+    layout: struct.Struct
+    fields: Tuple[str, ...]
+    scales: Tuple[float, ...]
+    # Not yet confirmed against firmware captures
+    provisional: bool = True
+
+    @property
+    def size(self) -> int:
+        """Frame size in bytes, including the frame type byte."""
+        return self.layout.size
+
+
+def _layout(frame_type: int, fmt: str, *fields: Tuple[str, float]) -> FrameLayout:
+    """Build a frame layout; the leading pad byte skips the frame type."""
+    return FrameLayout(
+        frame_type=frame_type,
+        layout=struct.Struct("<x" + fmt),
+        fields=tuple(name for name, _ in fields),
+        scales=tuple(scale for _, scale in fields),
+    )
+
+
+FRAME_LAYOUTS: Dict[int, FrameLayout] = {
+    layout.frame_type: layout
+    for layout in (
+        _layout(
+            FRAME_SENSOR_DATA, "hHHHHHIH",
+            ("temperature", 0.1),     # °C, signed
+            ("humidity", 0.1),        # %RH
+            ("co2", 1.0),             # ppm
+            ("vpd", 0.01),            # kPa
+            ("ppfd", 1.0),            # µmol/m²/s
+            ("wind_speed", 0.1),      # m/s
+            ("wind_pressure", 0.01),  # hPa
+            ("air_volume", 0.1),      # m³/h
+        ),
+        _layout(
+            FRAME_CLIMATE, "hHHH",
+            ("temperature", 0.1),
+            ("humidity", 0.1),
+            ("co2", 1.0),
+            ("vpd", 0.01),
+        ),
+        _layout(
+            FRAME_LIGHT, "H",
+            ("ppfd", 1.0),
+        ),
+        _layout(
+            FRAME_AIR, "HIH",
+            ("wind_speed", 0.1),
+            ("wind_pressure", 0.01),
+            ("air_volume", 0.1),
+        ),
+    )
+}
+
+
+def decode_frame(data: Buffer, offset: int = 0) -> Optional[Tuple[Tuple[str, ...], Tuple[float, ...]]]:
+    """
+    Decode a single frame.
+
+    Args:
+        data: Buffer holding the frame
+        offset: Position of the frame type byte within the buffer
+
+    Returns:
+        Tuple of (field names, scaled values), or None for unknown frames and
+        frames whose length does not match the layout
+    """
+    if offset >= len(data):
+        return None
+
+    frame = FRAME_LAYOUTS.get(data[offset])
+    if frame is None or len(data) - offset != frame.size:
+        # A different length means the layout guess does not fit this frame
+        return None
+
+    raw = frame.layout.unpack_from(data, offset)
+    return frame.fields, tuple(value * scale for value, scale in zip(raw, frame.scales))
+
+
+def encode_frame(frame_type: int, *raw_values: int) -> bytes:
+    """Encode raw (unscaled) field values as a frame, e.g. for emulators and tests."""
+    frame = bytearray(FRAME_LAYOUTS[frame_type].layout.pack(*raw_values))
+    frame[0] = frame_type
+    return bytes(frame)
+
+
+def decode_frames(buffer: Buffer) -> Dict[str, array]:
+    """
+    Decode a buffer of back-to-back frames into columnar arrays.
+
+    Every field in SENSOR_FIELDS gets one column with one row per frame; fields a
+    frame does not carry are NaN.
+
+    Args:
+        buffer: Concatenated frames
+
+    Returns:
+        Dictionary mapping field names to array('d') columns
+
+    Raises:
+        ValueError: If the buffer contains an unknown or truncated frame
+    """
+    view = memoryview(buffer)
+    columns = {name: array('d') for name in SENSOR_FIELDS}
+    nan = float('nan')
+    offset = 0
+    end = len(view)
+
+    while offset < end:
+        frame = FRAME_LAYOUTS.get(view[offset])
+        if frame is None:
+            raise ValueError(f"Unknown frame type 0x{view[offset]:02x} at offset {offset}")
+        if end - offset < frame.size:
+            raise ValueError(f"Truncated frame 0x{frame.frame_type:02x} at offset {offset}")
+
+        values = dict(zip(frame.fields, frame.layout.unpack_from(view, offset)))
+        for name, scale in zip(frame.fields, frame.scales):
+            values[name] *= scale
+        for name, column in columns.items():
+            column.append(values.get(name, nan))
+
+        offset += frame.size
+
+    return columns
@@ -0,0 +1,195 @@
+"""
+MarsPro GATT Layout Cache
+
+This module records the GATT handle layout of each device on disk, keyed by
+device address and firmware version. bleak always runs service discovery as
+part of connect(); a known layout is what makes it safe to let the backend
+reuse its own cached GATT table instead (BlueZ dangerous_use_bleak_cache). A
+device reporting a different layout, or failing a GATT operation on a cached
+table, has its record dropped so the next connect discovers from scratch.
+
+The JSON file is read and written in the executor, never on the event loop.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import platform
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+_LOGGER = logging.getLogger(__name__)
+
+CACHE_FORMAT_VERSION = 2
+UNKNOWN_FIRMWARE = "unknown"
+
+
+@dataclass
+class CachedCharacteristic:
+    """Characteristic entry of a GATT layout."""
+    uuid: str
+    handle: int
+    properties: List[str] = field(default_factory=list)
+
+
+@dataclass
+class CachedService:
+    """Service entry of a GATT layout."""
+    uuid: str
+    handle: int
+    characteristics: List[CachedCharacteristic] = field(default_factory=list)
+
+
+def services_from_bleak(services: Iterable[Any]) -> List[CachedService]:
+    """Convert a bleak service collection into layout records."""
+    cached = []
+    for service in services:
+        cached.append(CachedService(
+            uuid=service.uuid,
+            handle=getattr(service, 'handle', 0),
+            characteristics=[
+                CachedCharacteristic(
+                    uuid=char.uuid,
+                    handle=getattr(char, 'handle', 0),
+                    properties=list(char.properties),
+                )
+                for char in service.characteristics
+            ],
+        ))
+    return cached
+
+
+def layout_hash(services: Iterable[CachedService]) -> str:
+    """Hash the handle layout of a GATT table."""
+    digest = hashlib.sha1()
+    for service in sorted(services, key=lambda s: (s.handle, s.uuid)):
+        digest.update(f"S{service.handle}:{service.uuid};".encode())
+        for char in sorted(service.characteristics, key=lambda c: (c.handle, c.uuid)):
+            digest.update(f"C{char.handle}:{char.uuid};".encode())
+    return digest.hexdigest()
+
+
+def backend_cache_kwargs() -> Dict[str, Any]:
+    """connect() arguments that let the backend reuse its cached GATT table."""
+    if platform.system() == "Linux":
+        return {"dangerous_use_bleak_cache": True}
+    # CoreBluetooth and WinRT use the OS cache by default
+    return {}
+
+
+class MarsProGattCache:
+    """Persistent on-disk record of known GATT layouts."""
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Initialize the cache.
+
+        Args:
+            path: JSON file backing the cache; created on first save
+        """
+        self.path = Path(path)
+        self._entries: Optional[Dict[str, str]] = None
+        self._dirty = False
+
+    @staticmethod
+    def _key(address: str, firmware_version: Optional[str]) -> str:
+        """Build the cache key for a device."""
+        return f"{address.upper()}|{firmware_version or UNKNOWN_FIRMWARE}"
+
+    def get_layout(self, address: str, firmware_version: Optional[str] = None) -> Optional[str]:
+        """Get the known layout hash of a device, if any."""
+        return (self._entries or {}).get(self._key(address, firmware_version))
+
+    def put(self, address: str, firmware_version: Optional[str], services: List[CachedService]) -> str:
+        """
+        Record a device's GATT layout.
+
+        Entries for the same address under other firmware versions are dropped
+        when their layout differs from the new one.
+
+        Returns:
+            Layout hash of the recorded table
+        """
+        entries = self._ensure_entries()
+        layout = layout_hash(services)
+        prefix = f"{address.upper()}|"
+
+        for key in [k for k in entries if k.startswith(prefix)]:
+            if entries[key] != layout:
+                _LOGGER.debug(f"GATT layout changed for {address}, dropping cache entry {key}")
+                del entries[key]
+                self._dirty = True
+
+        key = self._key(address, firmware_version)
+        if entries.get(key) != layout:
+            entries[key] = layout
+            self._dirty = True
+        return layout
+
+    def invalidate(self, address: str, firmware_version: Optional[str] = None) -> None:
+        """Drop recorded layouts for a device (all firmware versions if none given)."""
+        entries = self._ensure_entries()
+        if firmware_version is not None:
+            key = self._key(address, firmware_version)
+            keys = [key] if key in entries else []
+        else:
+            prefix = f"{address.upper()}|"
+            keys = [k for k in entries if k.startswith(prefix)]
+
+        for key in keys:
+            del entries[key]
+        if keys:
+            _LOGGER.debug(f"Invalidated GATT cache for {address}")
+            self._dirty = True
+
+    async def async_load(self) -> None:
+        """Read the cache file in the executor on first use."""
+        if self._entries is None:
+            entries = await asyncio.get_running_loop().run_in_executor(None, self._read)
+            if self._entries is None:
+                self._entries = entries
+
+    async def async_save(self) -> None:
+        """Write pending changes to disk in the executor."""
+        if not self._dirty:
+            return
+        self._dirty = False
+        data = {'version': CACHE_FORMAT_VERSION, 'devices': dict(self._entries or {})}
+        await asyncio.get_running_loop().run_in_executor(None, self._write, data)
+
+    def _ensure_entries(self) -> Dict[str, str]:
+        """Get the entries, starting empty if the file was never loaded."""
+        if self._entries is None:
+            self._entries = {}
+        return self._entries
+
+    def _read(self) -> Dict[str, str]:
+        """Read cache entries from disk."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == CACHE_FORMAT_VERSION:
+                return {
+                    key: layout for key, layout in data.get('devices', {}).items()
+                    if isinstance(layout, str)
+                }
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, AttributeError) as e:
+            _LOGGER.warning(f"Ignoring unreadable GATT cache {self.path}: {e}")
+        return {}
+
+    def _write(self, data: Dict[str, Any]) -> None:
+        """Atomically write cache entries to disk."""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            _LOGGER.warning(f"Failed to write GATT cache {self.path}: {e}")
@@ -1,7 +1,8 @@
 """Light platform for MarsPro integration."""
 
 import logging
-from typing import Any, Dict, Optional
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
 
 from homeassistant.components.light import (
     ATTR_BRIGHTNESS,
@@ -12,22 +13,25 @@ from homeassistant.components.light import (
     LightEntityFeature,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
+from homeassistant.helpers.event import async_call_later
 
 from .const import (
     CMD_POWER_OFF,
     CMD_POWER_ON,
     CMD_SET_BRIGHTNESS,
     CMD_SET_COLOR,
+    CONF_OPTIMISTIC,
+    DEFAULT_OPTIMISTIC,
+    DEFAULT_OPTIMISTIC_TIMEOUT,
     DEVICE_TYPE_LIGHT,
     DOMAIN,
     STATUS_OFF,
     STATUS_ON,
 )
 from .coordinator import MarsProDataUpdateCoordinator
+from .entity import MarsProEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -42,27 +46,36 @@ async def async_setup_entry(
 
     # Get light devices
     light_devices = coordinator.get_devices_by_type(DEVICE_TYPE_LIGHT)
+    optimistic = config_entry.options.get(CONF_OPTIMISTIC, DEFAULT_OPTIMISTIC)
     
     entities = []
     for device in light_devices:
-        entities.append(MarsProLight(coordinator, device))
+        entities.append(MarsProLight(coordinator, device, optimistic))
     
     if entities:
         async_add_entities(entities)
 
 
-class MarsProLight(LightEntity):
+class MarsProLight(MarsProEntity, LightEntity):
     """Representation of a MarsPro light."""
 
     def __init__(
-        self, coordinator: MarsProDataUpdateCoordinator, device: Dict[str, Any]
+        self,
+        coordinator: MarsProDataUpdateCoordinator,
+        device: Dict[str, Any],
+        optimistic: bool = DEFAULT_OPTIMISTIC,
     ) -> None:
         """Initialize the light."""
-        self.coordinator = coordinator
-        self.device = device
-        self.device_id = device.get("id")
+        super().__init__(coordinator, device)
+        self.optimistic = optimistic
+        # Commanded device state, held until a status read after the command
+        # or until DEFAULT_OPTIMISTIC_TIMEOUT passes without one
+        self._expected: Optional[Dict[str, Any]] = None
+        self._expected_since = 0.0
+        self._cancel_expected_timeout: Optional[CALLBACK_TYPE] = None
+        self._command_in_flight = False
         self._attr_name = device.get("name", f"MarsPro Light {self.device_id}")
-        self._attr_unique_id = f"{DOMAIN}_{self.device_id}"
+        self._attr_unique_id = f"{DOMAIN}_{self.device_id}_light"
         
         # Set supported features
         self._attr_supported_color_modes = {ColorMode.BRIGHTNESS}
@@ -72,41 +85,106 @@ class MarsProLight(LightEntity):
         self._attr_brightness = 255
         self._attr_is_on = False
 
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return device info."""
-        return DeviceInfo(
-            identifiers={(DOMAIN, self.device_id)},
-            name=self._attr_name,
-            manufacturer="MarsPro",
-            model=self.device.get("model", "Unknown"),
-            sw_version=self.device.get("firmware_version", "Unknown"),
-        )
-
-    @property
-    def should_poll(self) -> bool:
-        """No polling needed."""
-        return False
-
-    @property
-    def available(self) -> bool:
-        """Return True if entity is available."""
-        return self.coordinator.last_update_success
-
-    async def async_added_to_hass(self) -> None:
-        """When entity is added to hass."""
-        await super().async_added_to_hass()
-        self.async_on_remove(
-            self.coordinator.async_add_listener(self._handle_coordinator_update)
-        )
+    async def async_will_remove_from_hass(self) -> None:
+        """Stop waiting for the commanded state."""
+        self._clear_expected()
+        await super().async_will_remove_from_hass()
 
+    @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-        device_data = self.coordinator.get_device(self.device_id)
+        if self._command_in_flight:
+            # Data read before the command completed would undo the optimistic state
+            return
+        
+        device_data = self.device_data
         if device_data:
+            if self._expected is not None:
+                if self.coordinator.get_status_time(self.device_id) < self._expected_since:
+                    # Nothing has been read from the device since the command
+                    return
+                self._reconcile(device_data)
             self._update_from_device_data(device_data)
             self.async_write_ha_state()
 
+    def _clear_expected(self) -> None:
+        """Stop holding the commanded state."""
+        self._expected = None
+        if self._cancel_expected_timeout:
+            self._cancel_expected_timeout()
+            self._cancel_expected_timeout = None
+
+    @callback
+    def _async_expire_expected(self, _now: Any) -> None:
+        """Fall back to the last known device state when no status read followed a command."""
+        self._cancel_expected_timeout = None
+        if self._expected is None:
+            return
+        _LOGGER.debug(
+            "No status read for light %s within %s seconds of the command, "
+            "showing the last known state",
+            self.device_id, DEFAULT_OPTIMISTIC_TIMEOUT,
+        )
+        self._expected = None
+        device_data = self.device_data
+        if device_data:
+            self._update_from_device_data(device_data)
+        self.async_write_ha_state()
+
+    def _reconcile(self, device_data: Dict[str, Any]) -> None:
+        """Compare the device state with the optimistic state applied for a command."""
+        expected = self._expected
+        self._clear_expected()
+        mismatched = {
+            key: device_data[key]
+            for key, value in expected.items()  # type: ignore
+            if key in device_data and device_data[key] != value
+        }
+        stats = self.coordinator.reconciliation_stats
+        if mismatched:
+            stats.mismatched += 1
+            _LOGGER.debug(
+                "Light %s did not reach the commanded state %s (reported %s), "
+                "mismatch rate %.1f%%",
+                self.device_id, expected, mismatched, stats.mismatch_rate * 100,
+            )
+        else:
+            stats.confirmed += 1
+
+    async def _async_send_optimistic(
+        self,
+        expected: Dict[str, Any],
+        send: Callable[[], Awaitable[Any]],
+    ) -> None:
+        """Show the commanded state right away and roll back if the command fails."""
+        if not self.optimistic:
+            await send()
+            return
+        
+        previous = (self._attr_is_on, self._attr_brightness)
+        if "power" in expected:
+            self._attr_is_on = expected["power"] == STATUS_ON
+        if "brightness" in expected:
+            self._attr_brightness = int((expected["brightness"] / 100) * 255)
+        self._clear_expected()
+        self._command_in_flight = True
+        self.async_write_ha_state()
+        try:
+            await send()
+        except Exception:
+            self._attr_is_on, self._attr_brightness = previous
+            raise
+        else:
+            self._expected = expected
+            self._expected_since = time.monotonic()
+            # A failed refresh would otherwise hold the optimistic state forever
+            self._cancel_expected_timeout = async_call_later(
+                self.hass, DEFAULT_OPTIMISTIC_TIMEOUT, self._async_expire_expected
+            )
+        finally:
+            self._command_in_flight = False
+            self.async_write_ha_state()
+
     def _update_from_device_data(self, device_data: Dict[str, Any]) -> None:
         """Update entity state from device data."""
         # Update power state
@@ -120,25 +198,27 @@ class MarsProLight(LightEntity):
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the light on."""
         try:
-            # Send power on command
-            await self.coordinator.send_command(self.device_id, CMD_POWER_ON)
+            # Power on
+            commands = [(CMD_POWER_ON, {})]
             
             # Handle brightness
             if ATTR_BRIGHTNESS in kwargs:
                 brightness = int((kwargs[ATTR_BRIGHTNESS] / 255) * 100)
-                await self.coordinator.send_command(
-                    self.device_id, CMD_SET_BRIGHTNESS, brightness=brightness
-                )
+                commands.append((CMD_SET_BRIGHTNESS, {"brightness": brightness}))
             
             # Handle color (if supported)
             if ATTR_RGB_COLOR in kwargs:
-                rgb_color = kwargs[ATTR_RGB_COLOR]
-                await self.coordinator.send_command(
-                    self.device_id, CMD_SET_COLOR, rgb_color=rgb_color
-                )
+                commands.append((CMD_SET_COLOR, {"rgb_color": kwargs[ATTR_RGB_COLOR]}))
+            
+            expected: Dict[str, Any] = {"power": STATUS_ON}
+            if ATTR_BRIGHTNESS in kwargs:
+                expected["brightness"] = brightness
             
-            # Refresh data
-            await self.coordinator.async_request_refresh()
+            # Send the whole scene change as one batch
+            await self._async_send_optimistic(
+                expected,
+                lambda: self.coordinator.send_commands(self.device_id, commands),
+            )
             
         except Exception as ex:
             _LOGGER.error("Failed to turn on light %s: %s", self.device_id, ex)
@@ -147,8 +227,10 @@ class MarsProLight(LightEntity):
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the light off."""
         try:
-            await self.coordinator.send_command(self.device_id, CMD_POWER_OFF)
-            await self.coordinator.async_request_refresh()
+            await self._async_send_optimistic(
+                {"power": STATUS_OFF},
+                lambda: self.coordinator.send_command(self.device_id, CMD_POWER_OFF),
+            )
         except Exception as ex:
             _LOGGER.error("Failed to turn off light %s: %s", self.device_id, ex)
             raise 
\ No newline at end of file
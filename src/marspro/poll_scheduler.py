@@ -0,0 +1,161 @@
+"""Adaptive per-device poll scheduling for MarsPro integration."""
+
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from .const import (
+    DEFAULT_MAX_POLL_INTERVAL,
+    DEFAULT_MIN_POLL_INTERVAL,
+    DEFAULT_POLL_JITTER,
+    DEFAULT_SCAN_INTERVAL,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Changes smaller than these are treated as sensor noise
+DEFAULT_DEADBANDS: Dict[str, float] = {
+    "temperature": 0.2,
+    "humidity": 1.0,
+    "co2": 25.0,
+    "vpd": 0.05,
+    "ppfd": 10.0,
+    "wind_speed": 0.2,
+    "wind_pressure": 0.5,
+    "air_volume": 5.0,
+}
+
+# Numeric fields without a deadband, such as timestamps, counters or brightness,
+# count as changed only when they move by more than this fraction
+DEFAULT_RELATIVE_DEADBAND = 0.05
+
+
+def _is_number(value: Any) -> bool:
+    """Check for a numeric reading; booleans are states, not readings."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+@dataclass
+class DevicePollState:
+    """Polling state of one device."""
+    interval: float
+    next_due: float = 0.0
+    last_status: Dict[str, Any] = field(default_factory=dict)
+
+
+class MarsProPollScheduler:
+    """Decide when each device is polled next based on how its readings move."""
+
+    BACKOFF_FACTOR = 1.5
+    SPEEDUP_FACTOR = 0.5
+
+    def __init__(
+        self,
+        base_interval: float = DEFAULT_SCAN_INTERVAL,
+        min_interval: float = DEFAULT_MIN_POLL_INTERVAL,
+        max_interval: float = DEFAULT_MAX_POLL_INTERVAL,
+        jitter: float = DEFAULT_POLL_JITTER,
+        deadbands: Optional[Mapping[str, float]] = None,
+        relative_deadband: float = DEFAULT_RELATIVE_DEADBAND,
+    ) -> None:
+        """
+        Initialize the scheduler.
+
+        Args:
+            base_interval: Interval for newly seen devices, in seconds
+            min_interval: Shortest interval, used right after commands
+            max_interval: Longest interval for devices with stable readings
+            jitter: Random spread applied to each interval, as a fraction
+            deadbands: Per-field change below which readings count as stable
+            relative_deadband: Fractional change below which numeric fields
+                without a deadband count as stable
+        """
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.deadbands = dict(DEFAULT_DEADBANDS if deadbands is None else deadbands)
+        self.relative_deadband = relative_deadband
+        self._devices: Dict[str, DevicePollState] = {}
+
+    def get_state(self, device_id: str) -> DevicePollState:
+        """Get the polling state of a device, creating it if needed."""
+        state = self._devices.get(device_id)
+        if state is None:
+            state = self._devices[device_id] = DevicePollState(interval=self.base_interval)
+        return state
+
+    def due(self, device_ids: Iterable[str], now: Optional[float] = None) -> List[str]:
+        """Get the devices that should be polled now."""
+        now = time.monotonic() if now is None else now
+        return [
+            device_id for device_id in device_ids
+            if self.get_state(device_id).next_due <= now
+        ]
+
+    def record(self, device_id: str, status: Mapping[str, Any], now: Optional[float] = None) -> float:
+        """
+        Adapt a device's interval to a fresh status.
+
+        Returns:
+            The device's new interval in seconds
+        """
+        state = self.get_state(device_id)
+        if state.last_status:
+            interval = state.interval
+            if self._changed(state.last_status, status):
+                state.interval = max(self.min_interval, interval * self.SPEEDUP_FACTOR)
+            else:
+                state.interval = min(self.max_interval, interval * self.BACKOFF_FACTOR)
+            if state.interval != interval:
+                _LOGGER.debug("Polling device %s every %.0f seconds", device_id, state.interval)
+        state.last_status = dict(status)
+        self._schedule(state, now)
+        return state.interval
+
+    def record_failure(self, device_id: str, now: Optional[float] = None) -> None:
+        """Retry a device that failed to respond after its current interval."""
+        self._schedule(self.get_state(device_id), now)
+
+    def notify_command(self, device_id: str, now: Optional[float] = None) -> None:
+        """Poll a device quickly after it was sent a command."""
+        state = self.get_state(device_id)
+        state.interval = self.min_interval
+        self._schedule(state, now)
+
+    def next_wakeup(self, now: Optional[float] = None) -> float:
+        """Seconds until the next device is due, never below the minimum interval."""
+        now = time.monotonic() if now is None else now
+        if not self._devices:
+            return self.base_interval
+        next_due = min(state.next_due for state in self._devices.values())
+        return max(self.min_interval, next_due - now)
+
+    def remove(self, device_id: str) -> None:
+        """Forget a device."""
+        self._devices.pop(device_id, None)
+
+    def _changed(self, previous: Mapping[str, Any], current: Mapping[str, Any]) -> bool:
+        """Check if any shared field moved beyond its deadband."""
+        for name, value in current.items():
+            if name not in previous:
+                continue
+            old = previous[name]
+            if _is_number(value) and _is_number(old):
+                deadband = self.deadbands.get(name)
+                if deadband is None:
+                    # A steadily ticking timestamp or counter must not pin the interval
+                    deadband = self.relative_deadband * max(abs(value), abs(old))
+                if abs(value - old) > deadband:
+                    return True
+            elif value != old:
+                return True
+        return False
+
+    def _schedule(self, state: DevicePollState, now: Optional[float]) -> None:
+        """Set the next due time, spread by jitter so devices do not synchronise."""
+        now = time.monotonic() if now is None else now
+        spread = random.uniform(-self.jitter, self.jitter) if self.jitter else 0.0
+        state.next_due = now + state.interval * (1 + spread)
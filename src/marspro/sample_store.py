@@ -0,0 +1,190 @@
+"""
+MarsPro Sensor Sample Store
+
+This module keeps sensor history in a compact columnar form. MarsProSample is a
+slotted record for single readings, and MarsProSampleStore is a fixed-capacity ring
+buffer holding one array('d') column per field, with NaN standing in for missing
+values. A sample costs 72 bytes instead of a dataclass with nine boxed floats.
+
+Readings arrive from polls, notifications and advertisements at irregular rates,
+so a store can be given a minimum interval. The newest sample always holds the
+latest reading and is overwritten until it is that far from the sample before
+it; older samples are then at least that far apart, and the capacity needed for
+a time window follows from the interval alone (see for_window()).
+"""
+
+import math
+from array import array
+from typing import Dict, Iterator, Optional, Tuple, Union
+
+from .ble_client import MarsProSensorData
+from .frame_decoder import SENSOR_FIELDS
+
+# Columns stored per sample
+SAMPLE_COLUMNS: Tuple[str, ...] = ("timestamp",) + SENSOR_FIELDS
+
+_NAN = float('nan')
+
+
+def _to_float(value: Optional[float]) -> float:
+    """Store None as NaN."""
+    return _NAN if value is None else float(value)
+
+
+def _from_float(value: float) -> Optional[float]:
+    """Read NaN back as None."""
+    return None if math.isnan(value) else value
+
+
+class MarsProSample:
+    """Slotted single sensor reading."""
+
+    __slots__ = SAMPLE_COLUMNS
+
+    def __init__(self, timestamp: Optional[float] = None, **values: Optional[float]):
+        """Initialize the sample; unspecified fields are None."""
+        self.timestamp = timestamp
+        for name in SENSOR_FIELDS:
+            setattr(self, name, values.pop(name, None))
+        if values:
+            raise TypeError(f"Unknown sample fields: {', '.join(values)}")
+
+    @classmethod
+    def from_sensor_data(cls, data: MarsProSensorData) -> "MarsProSample":
+        """Create a sample from sensor data."""
+        sample = cls.__new__(cls)
+        for name in SAMPLE_COLUMNS:
+            setattr(sample, name, getattr(data, name))
+        return sample
+
+    def to_sensor_data(self) -> MarsProSensorData:
+        """Convert the sample back to sensor data."""
+        return MarsProSensorData(**{name: getattr(self, name) for name in SAMPLE_COLUMNS})
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, MarsProSample):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in SAMPLE_COLUMNS)
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in SAMPLE_COLUMNS)
+        return f"MarsProSample({values})"
+
+
+class MarsProSampleStore:
+    """Fixed-capacity ring buffer of sensor samples stored column by column."""
+
+    # One day of samples at one sample per 30 s
+    DEFAULT_CAPACITY = 2880
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, min_interval: float = 0.0):
+        """
+        Initialize the store.
+
+        Args:
+            capacity: Maximum number of samples kept
+            min_interval: Minimum spacing of stored samples in seconds, 0 keeps every sample
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+
+        self.capacity = capacity
+        self.min_interval = min_interval
+        self._columns: Dict[str, array] = {
+            name: array('d', [_NAN]) * capacity for name in SAMPLE_COLUMNS
+        }
+        self._next = 0
+        self._size = 0
+
+    @classmethod
+    def for_window(cls, window: float, min_interval: float) -> "MarsProSampleStore":
+        """
+        Create a store that holds at least a time window of samples.
+
+        Args:
+            window: History to keep in seconds
+            min_interval: Minimum spacing of stored samples in seconds
+
+        Returns:
+            Store sized for the window, plus the sample being replaced at the newest end
+        """
+        if min_interval <= 0:
+            raise ValueError("min_interval must be positive")
+        return cls(math.ceil(window / min_interval) + 2, min_interval)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, sample: Union[MarsProSensorData, MarsProSample]) -> None:
+        """Add a sample, overwriting the oldest one when full."""
+        if self._replaces_newest(sample.timestamp):
+            self._write(self._index(-1), sample)
+            return
+
+        index = self._next
+        self._write(index, sample)
+        self._next = (index + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+
+    def _write(self, index: int, sample: Union[MarsProSensorData, MarsProSample]) -> None:
+        """Store a sample's fields at a buffer index."""
+        for name, column in self._columns.items():
+            column[index] = _to_float(getattr(sample, name))
+
+    def _replaces_newest(self, timestamp: Optional[float]) -> bool:
+        """Check if the newest sample is still within min_interval and gets overwritten."""
+        if self.min_interval <= 0 or timestamp is None or self._size < 2:
+            return False
+        timestamps = self._columns["timestamp"]
+        return timestamps[self._index(-1)] - timestamps[self._index(-2)] < self.min_interval
+
+    def _index(self, position: int) -> int:
+        """Map a position (oldest first, negative from newest) to a buffer index."""
+        if position < 0:
+            position += self._size
+        if not 0 <= position < self._size:
+            raise IndexError("sample index out of range")
+        return (self._next - self._size + position) % self.capacity
+
+    def get_sample(self, position: int) -> MarsProSample:
+        """Get a sample by position, oldest first."""
+        index = self._index(position)
+        sample = MarsProSample.__new__(MarsProSample)
+        for name, column in self._columns.items():
+            setattr(sample, name, _from_float(column[index]))
+        return sample
+
+    def __getitem__(self, position: int) -> MarsProSensorData:
+        """Get sensor data by position, oldest first."""
+        return self.get_sample(position).to_sensor_data()
+
+    def __iter__(self) -> Iterator[MarsProSensorData]:
+        for position in range(self._size):
+            yield self[position]
+
+    def latest(self) -> Optional[MarsProSensorData]:
+        """Get the most recent sample, if any."""
+        return self[-1] if self._size else None
+
+    def column(self, name: str) -> array:
+        """
+        Get one field's history, oldest first.
+
+        Args:
+            name: Column name from SAMPLE_COLUMNS
+
+        Returns:
+            A copy of the column as array('d'), with NaN for missing values
+        """
+        data = self._columns[name]
+        start = (self._next - self._size) % self.capacity
+        end = start + self._size
+        if end <= self.capacity:
+            return data[start:end]
+        return data[start:] + data[:end - self.capacity]
+
+    def clear(self) -> None:
+        """Drop all samples."""
+        self._next = 0
+        self._size = 0
@@ -0,0 +1,180 @@
+"""Sensor platform for MarsPro integration."""
+
+import logging
+from typing import Any, Dict, Optional, Set, Tuple
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import (
+    CONCENTRATION_PARTS_PER_MILLION,
+    PERCENTAGE,
+    UnitOfPressure,
+    UnitOfSpeed,
+    UnitOfTemperature,
+    UnitOfVolumeFlowRate,
+)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DEVICE_TYPE_SENSOR, DOMAIN, UNIT_DLI, UNIT_PPFD
+from .coordinator import MarsProDataUpdateCoordinator
+from .entity import MarsProEntity
+
+_LOGGER = logging.getLogger(__name__)
+
+# One description per MarsProSensorData field
+SENSOR_DESCRIPTIONS = (
+    SensorEntityDescription(
+        key="temperature",
+        name="Temperature",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        suggested_display_precision=1,
+    ),
+    SensorEntityDescription(
+        key="humidity",
+        name="Humidity",
+        device_class=SensorDeviceClass.HUMIDITY,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=PERCENTAGE,
+        suggested_display_precision=1,
+    ),
+    SensorEntityDescription(
+        key="co2",
+        name="CO2",
+        device_class=SensorDeviceClass.CO2,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=CONCENTRATION_PARTS_PER_MILLION,
+        suggested_display_precision=0,
+    ),
+    SensorEntityDescription(
+        key="vpd",
+        name="VPD",
+        device_class=SensorDeviceClass.PRESSURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfPressure.KPA,
+        suggested_display_precision=2,
+    ),
+    SensorEntityDescription(
+        key="ppfd",
+        name="PPFD",
+        icon="mdi:white-balance-sunny",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UNIT_PPFD,
+        suggested_display_precision=0,
+    ),
+    SensorEntityDescription(
+        key="wind_speed",
+        name="Wind speed",
+        device_class=SensorDeviceClass.WIND_SPEED,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfSpeed.METERS_PER_SECOND,
+        suggested_display_precision=1,
+    ),
+    SensorEntityDescription(
+        key="wind_pressure",
+        name="Wind pressure",
+        device_class=SensorDeviceClass.PRESSURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfPressure.HPA,
+        suggested_display_precision=2,
+    ),
+    SensorEntityDescription(
+        key="air_volume",
+        name="Air volume",
+        icon="mdi:weather-windy",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfVolumeFlowRate.CUBIC_METERS_PER_HOUR,
+        suggested_display_precision=1,
+    ),
+)
+
+# Metrics the coordinator derives from each sample
+DERIVED_SENSOR_DESCRIPTIONS = (
+    SensorEntityDescription(
+        key="calculated_vpd",
+        name="Calculated VPD",
+        device_class=SensorDeviceClass.PRESSURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfPressure.KPA,
+        suggested_display_precision=2,
+    ),
+    SensorEntityDescription(
+        key="dew_point",
+        name="Dew point",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        suggested_display_precision=1,
+    ),
+    SensorEntityDescription(
+        key="dli",
+        name="Daily light integral",
+        icon="mdi:sun-clock",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UNIT_DLI,
+        suggested_display_precision=2,
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up MarsPro sensors based on a config entry."""
+    coordinator: MarsProDataUpdateCoordinator = hass.data[DOMAIN][config_entry.entry_id]
+    added: Set[Tuple[str, str]] = set()
+
+    @callback
+    def _async_add_new_sensors() -> None:
+        """Add sensors for readings devices report for the first time."""
+        entities = []
+        for device in coordinator.get_devices():
+            # Dedicated sensors expose every reading, other devices what they report
+            is_sensor = device.get("type") == DEVICE_TYPE_SENSOR
+            for description in SENSOR_DESCRIPTIONS + DERIVED_SENSOR_DESCRIPTIONS:
+                key = (device.get("id"), description.key)
+                if key in added:
+                    continue
+                if description.key in device or (
+                    is_sensor and description in SENSOR_DESCRIPTIONS
+                ):
+                    added.add(key)
+                    entities.append(MarsProSensor(coordinator, device, description))
+
+        if entities:
+            async_add_entities(entities)
+
+    _async_add_new_sensors()
+    # Readings such as PPFD, and the DLI derived from it, may only show up later
+    config_entry.async_on_unload(coordinator.async_add_listener(_async_add_new_sensors))
+
+
+class MarsProSensor(MarsProEntity, SensorEntity):
+    """Representation of a MarsPro sensor reading."""
+
+    def __init__(
+        self,
+        coordinator: MarsProDataUpdateCoordinator,
+        device: Dict[str, Any],
+        description: SensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, device)
+        self.entity_description = description
+        device_name = device.get("name", f"MarsPro {self.device_id}")
+        self._attr_name = f"{device_name} {description.name}"
+        self._attr_unique_id = f"{DOMAIN}_{self.device_id}_{description.key}"
+
+    @property
+    def native_value(self) -> Optional[float]:
+        """Return the latest reading."""
+        return self.device_data.get(self.entity_description.key)
@@ -0,0 +1,133 @@
+"""Shared HTTP session and BLE connection pool for MarsPro integration."""
+
+import logging
+from typing import Any, Dict, Iterable, Optional
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .const import (
+    DEFAULT_DNS_CACHE_TTL,
+    DEFAULT_HTTP_KEEPALIVE_TIMEOUT,
+    DEFAULT_HTTP_POOL_LIMIT,
+    DEFAULT_HTTP_POOL_LIMIT_PER_HOST,
+    DOMAIN,
+)
+from .connection_manager import MarsProConnectionManager
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_SESSION = f"{DOMAIN}_session"
+DATA_CONNECTION_MANAGER = f"{DOMAIN}_connection_manager"
+
+try:
+    import brotli  # noqa: F401
+    BROTLI_AVAILABLE = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        BROTLI_AVAILABLE = True
+    except ImportError:
+        BROTLI_AVAILABLE = False
+
+
+def _accept_encoding() -> str:
+    """Advertise only the encodings aiohttp can decode here."""
+    return "gzip, deflate, br" if BROTLI_AVAILABLE else "gzip, deflate"
+
+
+def create_session(
+    limit: int = DEFAULT_HTTP_POOL_LIMIT,
+    limit_per_host: int = DEFAULT_HTTP_POOL_LIMIT_PER_HOST,
+    dns_cache_ttl: int = DEFAULT_DNS_CACHE_TTL,
+    keepalive_timeout: float = DEFAULT_HTTP_KEEPALIVE_TIMEOUT,
+) -> aiohttp.ClientSession:
+    """Create a client session with a tuned, keep-alive connection pool."""
+    connector = aiohttp.TCPConnector(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        ttl_dns_cache=dns_cache_ttl,
+        keepalive_timeout=keepalive_timeout,
+        enable_cleanup_closed=True,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        headers={"Accept-Encoding": _accept_encoding()},
+    )
+
+
+def async_get_shared_session(
+    hass: HomeAssistant, use_ha_session: bool = False
+) -> aiohttp.ClientSession:
+    """
+    Get the session shared by all MarsPro config entries.
+
+    Each call must be paired with async_release_shared_session().
+    """
+    if use_ha_session:
+        return async_get_clientsession(hass)
+
+    shared: Dict[str, Any] = hass.data.setdefault(DATA_SESSION, {"session": None, "users": 0})
+    if shared["session"] is None or shared["session"].closed:
+        shared["session"] = create_session()
+        _LOGGER.debug("Created shared MarsPro HTTP session")
+
+    shared["users"] += 1
+    return shared["session"]
+
+
+async def async_release_shared_session(hass: HomeAssistant, use_ha_session: bool = False) -> None:
+    """Release the shared session, closing it after the last user."""
+    if use_ha_session:
+        return
+
+    shared = hass.data.get(DATA_SESSION)
+    if not shared or not shared["users"]:
+        return
+
+    shared["users"] -= 1
+    if shared["users"] == 0 and shared["session"] is not None:
+        await shared["session"].close()
+        shared["session"] = None
+        _LOGGER.debug("Closed shared MarsPro HTTP session")
+
+
+def async_get_shared_connection_manager(
+    hass: HomeAssistant, adapters: Optional[Iterable[str]] = None
+) -> MarsProConnectionManager:
+    """
+    Get the BLE connection pool shared by all local MarsPro config entries.
+
+    Each call must be paired with async_release_shared_connection_manager().
+
+    Args:
+        hass: Home Assistant instance
+        adapters: HCI adapters to add to the shared pool
+    """
+    shared: Dict[str, Any] = hass.data.setdefault(
+        DATA_CONNECTION_MANAGER, {"manager": None, "users": 0}
+    )
+    if shared["manager"] is None:
+        shared["manager"] = MarsProConnectionManager(adapters=adapters)
+        _LOGGER.debug("Created shared MarsPro BLE connection pool")
+    elif adapters:
+        shared["manager"].add_adapters(adapters)
+
+    shared["users"] += 1
+    return shared["manager"]
+
+
+async def async_release_shared_connection_manager(hass: HomeAssistant) -> None:
+    """Release the shared BLE connection pool, disconnecting it after the last user."""
+    shared = hass.data.get(DATA_CONNECTION_MANAGER)
+    if not shared or not shared["users"]:
+        return
+
+    shared["users"] -= 1
+    if shared["users"] == 0 and shared["manager"] is not None:
+        manager = shared["manager"]
+        shared["manager"] = None
+        await manager.close()
+        _LOGGER.debug("Closed shared MarsPro BLE connection pool")
@@ -3,8 +3,10 @@ Unit tests for MarsPro API client.
 """
 
 import pytest
-from unittest.mock import AsyncMock, patch
-from src.marspro.api import MarsProAPI
+from bleak.exc import BleakError
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+from src.marspro.api import MarsProAPI, MarsProRequestError
+from src.marspro.frame_decoder import FRAME_CLIMATE, RAW_FRAME_KEY, encode_frame
 
 
 class TestMarsProAPI:
@@ -65,4 +67,198 @@ class TestMarsProAPI:
             await api_client.connect_ble("AA:BB:CC:DD:EE:FF")
             
             mock_bleak.assert_called_once_with("AA:BB:CC:DD:EE:FF")
-            mock_client.connect.assert_called_once() 
\ No newline at end of file
+            mock_client.connect.assert_called_once() 
+
+class TestMarsProAPIPush:
+    """Test cases for pushed status updates over BLE."""
+
+    @pytest.fixture
+    def api(self):
+        """Create a local API with a connected BLE client."""
+        api = MarsProAPI("test@example.com", "password123", ble_mac="AA:BB:CC:DD:EE:FF")
+        api.ble_client = AsyncMock()
+        api.ble_client.is_connected = True
+        return api
+
+    @pytest.mark.asyncio
+    async def test_unsubscribe_stops_notify_after_last(self, api):
+        """Test that notifications stop only once no device is subscribed."""
+        assert await api.subscribe("device_1", lambda *args: None)
+        assert await api.subscribe("device_2", lambda *args: None)
+        api.ble_client.start_notify.assert_awaited_once()
+
+        await api.unsubscribe("device_1")
+        api.ble_client.stop_notify.assert_not_awaited()
+
+        await api.unsubscribe("device_2")
+        api.ble_client.stop_notify.assert_awaited_once()
+
+        # Unknown devices are ignored
+        await api.unsubscribe("device_3")
+        api.ble_client.stop_notify.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_reconnect_restarts_notify(self, api):
+        """Test that notifications follow the client a reconnect hands out."""
+        await api.subscribe("device_1", lambda *args: None)
+        assert api.push_active is True
+
+        # The pool replaced the dropped client
+        new_client = AsyncMock()
+        new_client.is_connected = True
+        api.connection_manager = Mock()
+        api.connection_manager.acquire = AsyncMock(return_value=new_client)
+        api.ble_client.is_connected = False
+        assert api.push_active is False
+
+        await api._connect_ble()
+
+        new_client.start_notify.assert_awaited_once()
+        assert api.push_active is True
+
+    @pytest.mark.asyncio
+    async def test_failed_notify_restart_reports_push_inactive(self, api):
+        """Test that a reconnect whose notifications fail still connects."""
+        await api.subscribe("device_1", lambda *args: None)
+        new_client = AsyncMock()
+        new_client.is_connected = True
+        new_client.start_notify.side_effect = BleakError("notify failed")
+        api.connection_manager = Mock()
+        api.connection_manager.acquire = AsyncMock(return_value=new_client)
+
+        await api._connect_ble()
+
+        assert api.ble_client is new_client
+        assert api.push_active is False
+
+    @pytest.mark.asyncio
+    async def test_notification_raw_only_when_undecoded(self, api):
+        """Test that decoded frames carry readings and unknown frames their raw bytes."""
+        updates = []
+        await api.subscribe("device_1", lambda device_id, status: updates.append(status))
+
+        api._handle_ble_notification(None, bytearray(encode_frame(FRAME_CLIMATE, 250, 550, 800, 95)))
+        api._handle_ble_notification(None, bytearray(b"\x7f\x01\x02\x03"))
+
+        assert RAW_FRAME_KEY not in updates[0]
+        assert updates[0]["temperature"] == pytest.approx(25.0)
+        assert updates[1] == {RAW_FRAME_KEY: "7f010203"}
+
+
+class TestMarsProAPIBulkStatus:
+    """Test cases for the cloud bulk status endpoint."""
+
+    @pytest.fixture
+    def api(self):
+        """Create a cloud API with per-device status requests stubbed out."""
+        api = MarsProAPI("test@example.com", "password123", use_cloud=True)
+        api._get_device_status_cloud = AsyncMock(
+            side_effect=lambda device_id: {"id": device_id, "source": "single"}
+        )
+        return api
+
+    @pytest.mark.asyncio
+    async def test_bulk_supported(self, api):
+        """Test that a working bulk endpoint answers all devices in one call."""
+        bulk = {"devices": [{"id": "a", "power": "on"}, {"id": "b", "power": "off"}]}
+        with patch.object(api, "_cloud_request", AsyncMock(return_value=bulk)) as request:
+            statuses = await api.get_devices_status(["a", "b"])
+
+        assert statuses == {"a": {"id": "a", "power": "on"}, "b": {"id": "b", "power": "off"}}
+        request.assert_awaited_once()
+        api._get_device_status_cloud.assert_not_awaited()
+        assert api._bulk_status_supported is True
+
+    @pytest.mark.asyncio
+    async def test_bulk_unsupported_after_first_failure(self, api):
+        """Test that an endpoint failing its first probe is never tried again."""
+        error = MarsProRequestError("Failed to get bulk status", 500)
+        with patch.object(api, "_cloud_request", AsyncMock(side_effect=error)) as request:
+            statuses = await api.get_devices_status(["a", "b"])
+            assert set(statuses) == {"a", "b"}
+            assert api._bulk_status_supported is False
+
+            await api.get_devices_status(["a", "b"])
+
+        request.assert_awaited_once()
+        assert api._get_device_status_cloud.await_count == 4
+
+    @pytest.mark.asyncio
+    async def test_bulk_transient_error(self, api):
+        """Test that a working endpoint falls back only for the failed update."""
+        bulk = {"devices": [{"id": "a", "power": "on"}]}
+        responses = [bulk, MarsProRequestError("Failed to get bulk status", 503), bulk]
+        with patch.object(api, "_cloud_request", AsyncMock(side_effect=responses)) as request:
+            await api.get_devices_status(["a"])
+            statuses = await api.get_devices_status(["a"])
+            assert statuses == {"a": {"id": "a", "source": "single"}}
+            assert api._bulk_status_supported is True
+
+            statuses = await api.get_devices_status(["a"])
+
+        assert statuses == {"a": {"id": "a", "power": "on"}}
+        assert request.await_count == 3
+        api._get_device_status_cloud.assert_awaited_once_with("a")
+
+    @pytest.mark.asyncio
+    async def test_bulk_not_found_after_success(self, api):
+        """Test that an endpoint that disappears is marked unsupported."""
+        responses = [{"devices": []}, MarsProRequestError("Failed to get bulk status", 404)]
+        with patch.object(api, "_cloud_request", AsyncMock(side_effect=responses)):
+            await api.get_devices_status(["a"])
+            await api.get_devices_status(["a"])
+
+        assert api._bulk_status_supported is False
+
+
+def _response(status, data=None):
+    """Build a mock aiohttp response usable as an async context manager."""
+    response = MagicMock()
+    response.status = status
+    response.json = AsyncMock(return_value=data or {})
+    response.__aenter__ = AsyncMock(return_value=response)
+    response.__aexit__ = AsyncMock(return_value=False)
+    return response
+
+
+class TestMarsProAPICloudRequest:
+    """Test cases for authenticated cloud requests."""
+
+    @pytest.fixture
+    def api(self):
+        """Create a cloud API whose logins hand out numbered tokens."""
+        api = MarsProAPI("test@example.com", "password123", use_cloud=True, session=Mock())
+        api.token_manager._login = AsyncMock(side_effect=[("token_1", None), ("token_2", None)])
+        return api
+
+    @staticmethod
+    def _tokens(api):
+        """Bearer tokens sent with each request, in order."""
+        return [
+            call.kwargs["headers"]["Authorization"] for call in api.session.request.call_args_list
+        ]
+
+    @pytest.mark.asyncio
+    async def test_401_refreshes_token_and_replays_once(self, api):
+        """Test that a rejected token is refreshed and the request replayed."""
+        api.session.request.side_effect = [_response(401), _response(200, {"devices": []})]
+
+        data = await api._cloud_request("GET", "/devices", "Failed to get devices")
+
+        assert data == {"devices": []}
+        assert api.token_manager._login.await_count == 2
+        assert self._tokens(api) == ["Bearer token_1", "Bearer token_2"]
+        first, replay = api.session.request.call_args_list
+        assert first.args == replay.args == ("GET", first.args[1])
+
+    @pytest.mark.asyncio
+    async def test_401_on_replay_is_not_retried(self, api):
+        """Test that a second 401 fails instead of looping."""
+        api.session.request.side_effect = [_response(401), _response(401), _response(200)]
+
+        with pytest.raises(MarsProRequestError) as err:
+            await api._cloud_request("GET", "/devices", "Failed to get devices")
+
+        assert err.value.status == 401
+        assert api.session.request.call_count == 2
+        assert api.token_manager._login.await_count == 2
@@ -0,0 +1,61 @@
+"""
+Unit tests for MarsPro token manager.
+"""
+
+import asyncio
+import base64
+import json
+import time
+
+import pytest
+from src.marspro.auth import MarsProTokenManager, decode_token_expiry
+
+
+def _jwt(exp):
+    """Build an unsigned JWT with an exp claim."""
+    payload = base64.urlsafe_b64encode(json.dumps({"exp": exp}).encode()).decode().rstrip("=")
+    return f"header.{payload}.signature"
+
+
+class TestMarsProTokenManager:
+    """Test cases for MarsProTokenManager class."""
+
+    def test_decode_token_expiry(self):
+        """Test reading the exp claim from a JWT."""
+        assert decode_token_expiry(_jwt(1234567890)) == 1234567890.0
+        assert decode_token_expiry("not-a-jwt") is None
+
+    @pytest.mark.asyncio
+    async def test_single_flight_login(self):
+        """Test that concurrent callers share one login."""
+        logins = []
+
+        async def login():
+            logins.append(1)
+            await asyncio.sleep(0.01)
+            return _jwt(time.time() + 3600), None
+
+        manager = MarsProTokenManager(login)
+        tokens = await asyncio.gather(*(manager.async_get_token() for _ in range(5)))
+
+        assert len(logins) == 1
+        assert len(set(tokens)) == 1
+        assert manager.expires_at == pytest.approx(time.time() + 3600, abs=5)
+        manager.close()
+
+    @pytest.mark.asyncio
+    async def test_invalidate_stale_token(self):
+        """Test that rejecting an already replaced token keeps the new one."""
+        tokens = iter(["first", "second"])
+
+        async def login():
+            return next(tokens), None
+
+        manager = MarsProTokenManager(login)
+        await manager.async_get_token()
+        manager.invalidate("first")
+        assert await manager.async_get_token() == "second"
+
+        manager.invalidate("first")
+        assert manager.token == "second"
+        manager.close()
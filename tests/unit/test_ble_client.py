@@ -3,14 +3,29 @@
 import pytest
 import asyncio
 from unittest.mock import Mock, AsyncMock, patch
+from bleak.backends.scanner import AdvertisementData
 from src.marspro.ble_client import (
     MarsProBLEClient,
     MarsProDeviceScanner,
     MarsProDevice,
+    MarsProDeviceEvent,
     MarsProDeviceType,
     MarsProFeature,
-    MarsProSensorData
+    MarsProSensorData,
+    get_device_scanner,
 )
+from src.marspro.frame_decoder import FRAME_SENSOR_DATA, encode_frame
+from src.marspro.gatt_cache import MarsProGattCache
+
+
+def _sensor_frame():
+    """Build a full sensor frame for 25.5°C, 60%RH, 400ppm, 1.2kPa and 500 PPFD."""
+    return encode_frame(FRAME_SENSOR_DATA, 255, 600, 400, 120, 500, 25, 101325, 1000)
+
+
+def _advertisement(service_uuids=(), rssi=-60):
+    """Build the advertisement a scan returns alongside a device."""
+    return AdvertisementData(None, {}, {}, list(service_uuids), None, rssi, ())
 
 
 class TestMarsProBLEClient:
@@ -27,7 +42,7 @@ class TestMarsProBLEClient:
         mock_client = Mock()
         mock_client.connect = AsyncMock()
         mock_client.disconnect = AsyncMock()
-        mock_client.get_services = AsyncMock()
+        mock_client.services = []
         mock_client.read_gatt_char = AsyncMock()
         mock_client.write_gatt_char = AsyncMock()
         mock_client.start_notify = AsyncMock()
@@ -51,15 +66,15 @@ class TestMarsProBLEClient:
             mock_characteristic.uuid = "test-char-uuid"
             mock_characteristic.properties = ["read", "write"]
             mock_service.characteristics = [mock_characteristic]
-            mock_bleak_client.get_services.return_value = [mock_service]
+            mock_bleak_client.services = [mock_service]
             
             result = await client.connect()
             
             assert result is True
             assert client.is_connected
             assert client.client == mock_bleak_client
-            mock_bleak_client.connect.assert_called_once()
-            mock_bleak_client.get_services.assert_called_once()
+            mock_bleak_client.connect.assert_called_once_with()
+            assert "test-char-uuid" in client._characteristics
     
     @pytest.mark.asyncio
     async def test_connect_failure(self, client, mock_bleak_client):
@@ -72,6 +87,63 @@ class TestMarsProBLEClient:
             assert result is False
             assert not client.is_connected
     
+    @pytest.mark.asyncio
+    async def test_connect_uses_gatt_cache(self, mock_bleak_client, tmp_path):
+        """Test that a known GATT layout enables the backend's service cache."""
+        cache = MarsProGattCache(tmp_path / "gatt_cache.json")
+        with patch('src.marspro.ble_client.BleakClient', return_value=mock_bleak_client), \
+                patch('src.marspro.gatt_cache.platform.system', return_value="Linux"):
+            mock_service = Mock()
+            mock_service.uuid = "test-service-uuid"
+            mock_service.handle = 1
+            mock_characteristic = Mock()
+            mock_characteristic.uuid = MarsProBLEClient.COMMAND_CHAR_UUID
+            mock_characteristic.handle = 2
+            mock_characteristic.properties = ["write"]
+            mock_service.characteristics = [mock_characteristic]
+            mock_bleak_client.services = [mock_service]
+            
+            first = MarsProBLEClient("00:11:22:33:44:55", gatt_cache=cache)
+            assert await first.connect() is True
+            mock_bleak_client.connect.assert_called_once_with()
+            
+            second = MarsProBLEClient("00:11:22:33:44:55", gatt_cache=MarsProGattCache(tmp_path / "gatt_cache.json"))
+            assert await second.connect() is True
+            
+            mock_bleak_client.connect.assert_called_with(dangerous_use_bleak_cache=True)
+            assert MarsProBLEClient.COMMAND_CHAR_UUID in second._characteristics
+    
+    @pytest.mark.asyncio
+    async def test_gatt_error_on_cached_table_invalidates(self, mock_bleak_client, tmp_path):
+        """Test that a failed GATT operation on a cached table drops the layout."""
+        from bleak.exc import BleakError
+        cache = MarsProGattCache(tmp_path / "gatt_cache.json")
+        manager = Mock()
+        manager.acquire = AsyncMock(return_value=mock_bleak_client)
+        manager.disconnect = AsyncMock()
+        mock_service = Mock()
+        mock_service.uuid = "test-service-uuid"
+        mock_service.handle = 1
+        mock_characteristic = Mock()
+        mock_characteristic.uuid = MarsProBLEClient.DATA_CHAR_UUID
+        mock_characteristic.handle = 2
+        mock_characteristic.properties = ["read"]
+        mock_service.characteristics = [mock_characteristic]
+        mock_bleak_client.services = [mock_service]
+        
+        with patch('src.marspro.gatt_cache.platform.system', return_value="Linux"):
+            assert await MarsProBLEClient("00:11:22:33:44:55", manager, gatt_cache=cache).connect()
+            client = MarsProBLEClient("00:11:22:33:44:55", manager, gatt_cache=cache)
+            assert await client.connect()
+        assert manager.acquire.call_args.kwargs["connect_kwargs"] == {"dangerous_use_bleak_cache": True}
+        
+        mock_bleak_client.read_gatt_char.side_effect = BleakError("invalid handle")
+        assert await client.read_sensor_data() is None
+        
+        assert cache.get_layout("00:11:22:33:44:55") is None
+        manager.disconnect.assert_awaited_once_with("00:11:22:33:44:55")
+        assert not client.is_connected
+    
     @pytest.mark.asyncio
     async def test_disconnect(self, client, mock_bleak_client):
         """Test disconnection."""
@@ -80,7 +152,7 @@ class TestMarsProBLEClient:
             mock_service = Mock()
             mock_service.uuid = "test-service-uuid"
             mock_service.characteristics = []
-            mock_bleak_client.get_services.return_value = [mock_service]
+            mock_bleak_client.services = [mock_service]
             await client.connect()
             
             # Disconnect
@@ -99,7 +171,7 @@ class TestMarsProBLEClient:
             mock_characteristic = Mock()
             mock_characteristic.uuid = client.STATUS_CHAR_UUID
             mock_service.characteristics = [mock_characteristic]
-            mock_bleak_client.get_services.return_value = [mock_service]
+            mock_bleak_client.services = [mock_service]
             await client.connect()
             
             # Mock status data
@@ -123,11 +195,11 @@ class TestMarsProBLEClient:
             mock_characteristic = Mock()
             mock_characteristic.uuid = client.DATA_CHAR_UUID
             mock_service.characteristics = [mock_characteristic]
-            mock_bleak_client.get_services.return_value = [mock_service]
+            mock_bleak_client.services = [mock_service]
             await client.connect()
             
             # Mock sensor data
-            mock_bleak_client.read_gatt_char.return_value = b'\x01\x02\x03'
+            mock_bleak_client.read_gatt_char.return_value = _sensor_frame()
             
             sensor_data = await client.read_sensor_data()
             
@@ -146,7 +218,7 @@ class TestMarsProBLEClient:
             mock_characteristic = Mock()
             mock_characteristic.uuid = client.COMMAND_CHAR_UUID
             mock_service.characteristics = [mock_characteristic]
-            mock_bleak_client.get_services.return_value = [mock_service]
+            mock_bleak_client.services = [mock_service]
             await client.connect()
             
             # Send command
@@ -165,7 +237,7 @@ class TestMarsProBLEClient:
             mock_characteristic = Mock()
             mock_characteristic.uuid = client.COMMAND_CHAR_UUID
             mock_service.characteristics = [mock_characteristic]
-            mock_bleak_client.get_services.return_value = [mock_service]
+            mock_bleak_client.services = [mock_service]
             await client.connect()
             
             # Control light
@@ -184,7 +256,7 @@ class TestMarsProBLEClient:
             mock_characteristic = Mock()
             mock_characteristic.uuid = client.COMMAND_CHAR_UUID
             mock_service.characteristics = [mock_characteristic]
-            mock_bleak_client.get_services.return_value = [mock_service]
+            mock_bleak_client.services = [mock_service]
             await client.connect()
             
             # Control climate
@@ -203,7 +275,7 @@ class TestMarsProBLEClient:
             mock_characteristic = Mock()
             mock_characteristic.uuid = client.COMMAND_CHAR_UUID
             mock_service.characteristics = [mock_characteristic]
-            mock_bleak_client.get_services.return_value = [mock_service]
+            mock_bleak_client.services = [mock_service]
             await client.connect()
             
             # Control water
@@ -231,15 +303,33 @@ class TestMarsProBLEClient:
     
     def test_parse_sensor_data(self, client):
         """Test sensor data parsing."""
-        test_data = b'\x01\x02\x03\x04'
-        sensor_data = client._parse_sensor_data(test_data)
+        sensor_data = client._parse_sensor_data(_sensor_frame())
         
         assert sensor_data is not None
-        assert sensor_data.temperature == 25.5
-        assert sensor_data.humidity == 60.0
-        assert sensor_data.co2 == 400.0
-        assert sensor_data.vpd == 1.2
-        assert sensor_data.ppfd == 500.0
+        assert sensor_data.temperature == pytest.approx(25.5)
+        assert sensor_data.humidity == pytest.approx(60.0)
+        assert sensor_data.co2 == pytest.approx(400.0)
+        assert sensor_data.vpd == pytest.approx(1.2)
+        assert sensor_data.ppfd == pytest.approx(500.0)
+        assert sensor_data.wind_pressure == pytest.approx(1013.25)
+        assert sensor_data.timestamp is not None
+        assert sensor_data.raw is None
+    
+    def test_parse_unknown_frame(self, client):
+        """Test that unrecognised frames are kept as raw bytes, not decoded."""
+        sensor_data = client._parse_sensor_data(b'\x01\x02\x03\x04')
+        
+        assert sensor_data.raw == b'\x01\x02\x03\x04'
+        assert sensor_data.temperature is None
+        assert sensor_data.ppfd is None
+    
+    def test_parse_frame_with_unexpected_length(self, client):
+        """Test that a known frame type with the wrong length is not decoded."""
+        frame = _sensor_frame() + b'\x00'
+        sensor_data = client._parse_sensor_data(frame)
+        
+        assert sensor_data.raw == frame
+        assert sensor_data.temperature is None
 
 
 class TestMarsProDeviceScanner:
@@ -262,28 +352,91 @@ class TestMarsProDeviceScanner:
         assert scanner.discovered_devices == []
     
     @pytest.mark.asyncio
-    async def test_scan_for_devices(self, scanner, mock_bleak_scanner):
+    async def test_scan_for_devices(self, mock_bleak_scanner):
         """Test device scanning."""
         with patch('src.marspro.ble_client.BleakScanner', return_value=mock_bleak_scanner):
+            scanner = MarsProDeviceScanner()
+            
             # Mock discovered devices
             mock_device1 = Mock()
             mock_device1.address = "00:11:22:33:44:55"
             mock_device1.name = "MarsPro Controller"
-            mock_device1.rssi = -50
             
             mock_device2 = Mock()
             mock_device2.address = "00:11:22:33:44:66"
             mock_device2.name = "Other Device"
-            mock_device2.rssi = -60
             
-            mock_bleak_scanner.discover.return_value = [mock_device1, mock_device2]
+            mock_bleak_scanner.discover.return_value = {
+                mock_device1.address: (mock_device1, _advertisement(rssi=-50)),
+                mock_device2.address: (mock_device2, _advertisement(rssi=-60)),
+            }
             
             devices = await scanner.scan_for_devices(timeout=5.0)
             
             assert len(devices) == 1
             assert devices[0].name == "MarsPro Controller"
             assert devices[0].address == "00:11:22:33:44:55"
-            mock_bleak_scanner.discover.assert_called_once_with(timeout=5.0)
+            assert devices[0].rssi == -50
+            mock_bleak_scanner.discover.assert_called_once_with(
+                timeout=5.0, return_adv=True, service_uuids=[scanner.SERVICE_UUID]
+            )
+    
+    @pytest.mark.asyncio
+    async def test_scan_matches_advertised_service(self, mock_bleak_scanner):
+        """Test that a device with an unknown name is matched by its advertisement."""
+        with patch('src.marspro.ble_client.BleakScanner', return_value=mock_bleak_scanner):
+            scanner = MarsProDeviceScanner()
+            
+            mock_device = Mock()
+            mock_device.address = "00:11:22:33:44:55"
+            mock_device.name = None
+            advertisement = _advertisement(service_uuids=[scanner.SERVICE_UUID], rssi=-70)
+            mock_bleak_scanner.discover.return_value = {mock_device.address: (mock_device, advertisement)}
+            
+            devices = await scanner.scan_for_devices(timeout=5.0)
+            
+            assert [(device.address, device.rssi) for device in devices] == [("00:11:22:33:44:55", -70)]
+    
+    @pytest.mark.asyncio
+    async def test_scan_falls_back_to_unfiltered(self, mock_bleak_scanner):
+        """Test that a filtered scan finding nothing is repeated without filters."""
+        with patch('src.marspro.ble_client.BleakScanner', return_value=mock_bleak_scanner):
+            scanner = MarsProDeviceScanner()
+            
+            mock_device = Mock()
+            mock_device.address = "00:11:22:33:44:55"
+            mock_device.name = "MarsPro Controller"
+            mock_bleak_scanner.discover.side_effect = [
+                {}, {mock_device.address: (mock_device, _advertisement(rssi=-50))}
+            ]
+            
+            devices = await scanner.scan_for_devices(timeout=5.0)
+            
+            assert [device.address for device in devices] == ["00:11:22:33:44:55"]
+            assert [call.kwargs for call in mock_bleak_scanner.discover.call_args_list] == [
+                {"timeout": 5.0, "return_adv": True, "service_uuids": [scanner.SERVICE_UUID]},
+                {"timeout": 5.0, "return_adv": True},
+            ]
+    
+    @pytest.mark.asyncio
+    async def test_background_scan_drops_unmatched_filters(self, scanner):
+        """Test that a filtered background scan matching nothing restarts unfiltered."""
+        scanner.EVICT_INTERVAL = 0
+        scanner.PREFILTER_GRACE = 0
+        bleak_scanner = Mock()
+        bleak_scanner.start = AsyncMock()
+        bleak_scanner.stop = AsyncMock()
+        with patch('src.marspro.ble_client.platform.system', return_value="Linux"), \
+                patch('src.marspro.ble_client.BleakScanner', return_value=bleak_scanner) as factory:
+            await scanner.start()
+            for _ in range(3):
+                await asyncio.sleep(0)
+            await scanner.stop()
+        
+        assert scanner.prefilter is False
+        assert factory.call_count == 2
+        assert "bluez" in factory.call_args_list[0].kwargs
+        assert "bluez" not in factory.call_args_list[1].kwargs
     
     def test_is_marspro_device(self, scanner):
         """Test MarsPro device detection."""
@@ -303,15 +456,84 @@ class TestMarsProDeviceScanner:
         # Test None name
         mock_device.name = None
         assert scanner._is_marspro_device(mock_device) is False
+        
+        # Test advertised identifiers
+        advertisement = Mock()
+        advertisement.manufacturer_data = {}
+        advertisement.service_uuids = [scanner.SERVICE_UUID]
+        advertisement.local_name = None
+        assert scanner._is_marspro_device(mock_device, advertisement) is True
+        
+        advertisement.service_uuids = []
+        advertisement.local_name = "MarsPro Controller"
+        assert scanner._is_marspro_device(mock_device, advertisement) is True
+    
+    def test_background_filters(self, scanner):
+        """Test scan filters pushed down to the backend."""
+        with patch('src.marspro.ble_client.platform.system', return_value="Linux"):
+            filters = scanner._background_filters()
+        assert filters["scanning_mode"] == "passive"
+        patterns = filters["bluez"]["or_patterns"]
+        assert any(pattern.content_of_pattern == b'\xff\xff' for pattern in patterns)
+        assert any(pattern.content_of_pattern == b'\xe0\xff' for pattern in patterns)
+        
+        with patch('src.marspro.ble_client.platform.system', return_value="Darwin"):
+            assert scanner._background_filters() == {"service_uuids": [scanner.SERVICE_UUID]}
+        
+        with patch('src.marspro.ble_client.platform.system', return_value="Windows"):
+            assert scanner._background_filters() == {"scanning_mode": "passive"}
+        
+        with patch('src.marspro.ble_client.platform.system', return_value="Linux"):
+            assert MarsProDeviceScanner(prefilter=False)._background_filters() == {}
+    
+    @pytest.mark.asyncio
+    async def test_passive_telemetry_shared_by_listeners(self, scanner):
+        """Test that listeners share one background scan until the last leaves."""
+        first = Mock()
+        second = Mock()
+        bleak_scanner = Mock()
+        bleak_scanner.start = AsyncMock()
+        bleak_scanner.stop = AsyncMock()
+        with patch('src.marspro.ble_client.BleakScanner', return_value=bleak_scanner) as factory:
+            await scanner.start_passive_telemetry(first)
+            await scanner.start_passive_telemetry(second)
+            factory.assert_called_once()
+            
+            device = Mock()
+            device.address = "00:11:22:33:44:55"
+            device.name = "MarsPro Controller"
+            advertisement = Mock()
+            advertisement.manufacturer_data = {scanner.MANUFACTURER_ID: _sensor_frame()}
+            advertisement.service_data = {}
+            advertisement.rssi = -60
+            scanner._handle_advertisement(device, advertisement)
+            first.assert_called_once()
+            second.assert_called_once()
+            
+            await scanner.stop_passive_telemetry(first)
+            assert scanner.is_running
+            await scanner.stop_passive_telemetry(second)
+            assert not scanner.is_running
+        
+        bleak_scanner.stop.assert_awaited_once()
+    
+    def test_shared_scanner(self):
+        """Test that every caller gets the same background scanner."""
+        manager = Mock()
+        with patch.dict('src.marspro.ble_client._SHARED_SCANNERS', clear=True):
+            assert get_device_scanner() is get_device_scanner()
+            scanner = get_device_scanner("hci1", manager)
+            assert scanner is not get_device_scanner()
+            assert scanner.adapter == "hci1"
+            assert scanner.connection_manager is manager
     
     def test_create_marspro_device(self, scanner):
         """Test MarsPro device creation."""
         mock_device = Mock()
         mock_device.address = "00:11:22:33:44:55"
         mock_device.name = "Test Device"
-        mock_device.rssi = -50
         
-        marspro_device = scanner._create_marspro_device(mock_device)
+        marspro_device = scanner._create_marspro_device(mock_device, -50)
         
         assert marspro_device.address == "00:11:22:33:44:55"
         assert marspro_device.name == "Test Device"
@@ -327,12 +549,87 @@ class TestMarsProDeviceScanner:
             device_type=MarsProDeviceType.CONTROLLER,
             features=[MarsProFeature.LIGHTING]
         )
-        scanner.discovered_devices.append(test_device)
+        scanner.devices[test_device.address] = test_device
         
         devices = scanner.get_discovered_devices()
         
         assert len(devices) == 1
         assert devices[0].name == "Test Device"
+    
+    def test_decode_advertisement(self, scanner):
+        """Test decoding sensor data from advertisements."""
+        advertisement = Mock()
+        advertisement.manufacturer_data = {scanner.MANUFACTURER_ID: _sensor_frame()}
+        advertisement.service_data = {}
+        
+        sensor_data = scanner.decode_advertisement(advertisement)
+        assert sensor_data.temperature == pytest.approx(25.5)
+        assert sensor_data.ppfd == pytest.approx(500.0)
+        
+        # Service data is used when there is no manufacturer data
+        advertisement.manufacturer_data = {}
+        advertisement.service_data = {scanner.SERVICE_UUID: _sensor_frame()}
+        assert scanner.decode_advertisement(advertisement).humidity == pytest.approx(60.0)
+        
+        advertisement.service_data = {}
+        assert scanner.decode_advertisement(advertisement) is None
+    
+    def test_handle_advertisement_skips_repeats(self, scanner):
+        """Test that repeated advertisements are reported once."""
+        callback = Mock()
+        scanner._telemetry_callbacks.append(callback)
+        device = Mock()
+        device.address = "00:11:22:33:44:55"
+        device.name = "MarsPro Controller"
+        advertisement = Mock()
+        advertisement.manufacturer_data = {scanner.MANUFACTURER_ID: _sensor_frame()}
+        advertisement.service_data = {}
+        advertisement.rssi = -60
+        
+        scanner._handle_advertisement(device, advertisement)
+        scanner._handle_advertisement(device, advertisement)
+        
+        callback.assert_called_once()
+        address, sensor_data = callback.call_args[0]
+        assert address == "00:11:22:33:44:55"
+        assert sensor_data.co2 == pytest.approx(400.0)
+    
+    def test_registry_deduplicates_and_smooths_rssi(self, scanner):
+        """Test that repeated sightings update one registry entry."""
+        device = Mock()
+        device.address = "00:11:22:33:44:55"
+        device.name = "MarsPro Controller"
+        
+        first = scanner._track_device(device, -60, now=0.0)
+        second = scanner._track_device(device, -80, now=1.0)
+        
+        assert first is second
+        assert len(scanner.discovered_devices) == 1
+        assert second.rssi == round(-60 + scanner.RSSI_SMOOTHING * -20)
+        assert second.last_seen == 1.0
+    
+    def test_registry_events(self, scanner):
+        """Test appeared and lost events."""
+        events = []
+        unsubscribe = scanner.subscribe(lambda event, device: events.append((event, device.address)))
+        device = Mock()
+        device.address = "00:11:22:33:44:55"
+        device.name = "MarsPro Controller"
+        
+        scanner._track_device(device, -60, now=0.0)
+        scanner._track_device(device, -60, now=10.0)
+        assert scanner.evict_stale(now=10.0 + scanner.DEVICE_TTL) == 0
+        assert scanner.evict_stale(now=11.0 + scanner.DEVICE_TTL) == 1
+        
+        assert events == [
+            (MarsProDeviceEvent.APPEARED, "00:11:22:33:44:55"),
+            (MarsProDeviceEvent.LOST, "00:11:22:33:44:55"),
+        ]
+        assert scanner.devices == {}
+        
+        unsubscribe()
+        scanner._track_device(device, -60, now=20.0)
+        assert len(events) == 2
 
 
 class TestMarsProDataStructures:
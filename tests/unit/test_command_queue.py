@@ -0,0 +1,68 @@
+"""
+Unit tests for MarsPro BLE command queue.
+"""
+
+import pytest
+from unittest.mock import AsyncMock
+from src.marspro.command_queue import MarsProCommandQueue
+from src.marspro.frame_decoder import FRAME_ACK
+
+
+class TestMarsProCommandQueue:
+    """Test cases for MarsProCommandQueue class."""
+
+    @pytest.mark.asyncio
+    async def test_one_packet_per_write(self):
+        """Test that packets are written separately unless coalescing is enabled."""
+        write = AsyncMock()
+        queue = MarsProCommandQueue(write, write_without_response=True)
+
+        result = await queue.send_batch([b"\x01\x01", b"\x02\x64", b"\x03\x00"])
+
+        assert result is True
+        assert [call.args for call in write.call_args_list] == [
+            (b"\x01\x01", False),
+            (b"\x02\x64", False),
+            (b"\x03\x00", False),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_coalesces_commands(self):
+        """Test that commands queued together share one write when coalescing."""
+        write = AsyncMock()
+        queue = MarsProCommandQueue(write, write_without_response=True, coalesce=True)
+
+        result = await queue.send_batch([b"\x01\x01", b"\x02\x64", b"\x03\x00"])
+
+        assert result is True
+        write.assert_called_once_with(b"\x01\x01\x02\x64\x03\x00", False)
+
+    @pytest.mark.asyncio
+    async def test_splits_at_mtu(self):
+        """Test that coalesced payloads never exceed the MTU."""
+        write = AsyncMock()
+        queue = MarsProCommandQueue(write, mtu=7, coalesce=True)
+
+        await queue.send_batch([b"\x01\x01", b"\x02\x64", b"\x03\x00"])
+
+        assert [call.args for call in write.call_args_list] == [
+            (b"\x01\x01\x02\x64", True),
+            (b"\x03\x00", True),
+        ]
+
+    def test_ack_frames_consumed(self):
+        """Test that ACK frames are recognised and not passed on as data."""
+        queue = MarsProCommandQueue(AsyncMock())
+
+        assert queue.handle_notification(bytes([FRAME_ACK, 0x02, 0x01]))
+        assert queue.handle_notification(bytes([FRAME_ACK, 0x01, 0x00]))
+        assert not queue.handle_notification(b"\x02\x00\x00")
+        assert not queue.handle_notification(bytes([FRAME_ACK, 0x01]))
+
+    @pytest.mark.asyncio
+    async def test_write_failure(self):
+        """Test that a failed write fails every command in the batch."""
+        queue = MarsProCommandQueue(AsyncMock(side_effect=RuntimeError("gatt error")))
+
+        with pytest.raises(RuntimeError):
+            await queue.send_batch([b"\x01\x01", b"\x02\x64"])
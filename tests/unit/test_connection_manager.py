@@ -0,0 +1,157 @@
+"""
+Unit tests for MarsPro BLE connection manager.
+"""
+
+import pytest
+from unittest.mock import Mock, AsyncMock, patch
+from src.marspro.connection_manager import MarsProConnectionManager
+
+
+def _make_bleak_client(*args, **kwargs):
+    """Create a mock BleakClient that tracks its connection state."""
+    client = Mock()
+    client.is_connected = False
+
+    async def connect(**kwargs):
+        client.is_connected = True
+
+    async def disconnect():
+        client.is_connected = False
+
+    client.connect = AsyncMock(side_effect=connect)
+    client.disconnect = AsyncMock(side_effect=disconnect)
+    return client
+
+
+class TestMarsProConnectionManager:
+    """Test cases for MarsProConnectionManager class."""
+
+    @pytest.fixture
+    def manager(self):
+        """Create a small connection manager for testing."""
+        return MarsProConnectionManager(max_connections=2, idle_timeout=0.0)
+
+    @pytest.mark.asyncio
+    async def test_acquire_reuses_session(self, manager):
+        """Test that a pooled session is reused instead of reconnecting."""
+        with patch('src.marspro.connection_manager.BleakClient', side_effect=_make_bleak_client) as mock_cls:
+            first = await manager.acquire("00:11:22:33:44:55")
+            manager.release("00:11:22:33:44:55")
+            second = await manager.acquire("00:11:22:33:44:55")
+
+            assert first is second
+            assert mock_cls.call_count == 1
+            first.connect.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_connect_kwargs_passed_to_backend(self, manager):
+        """Test that backend connect arguments reach new and reconnected sessions."""
+        with patch('src.marspro.connection_manager.BleakClient', side_effect=_make_bleak_client):
+            client = await manager.acquire(
+                "00:11:22:33:44:55", connect_kwargs={"dangerous_use_bleak_cache": True}
+            )
+            client.connect.assert_called_once_with(timeout=manager.connect_timeout, dangerous_use_bleak_cache=True)
+
+            manager.release("00:11:22:33:44:55")
+            client.is_connected = False
+            reconnected = await manager.acquire("00:11:22:33:44:55")
+            reconnected.connect.assert_called_once_with(
+                timeout=manager.connect_timeout, dangerous_use_bleak_cache=True
+            )
+
+    @pytest.mark.asyncio
+    async def test_reconnect_on_demand(self, manager):
+        """Test that a dropped session is reconnected on acquire."""
+        with patch('src.marspro.connection_manager.BleakClient', side_effect=_make_bleak_client):
+            first = await manager.acquire("00:11:22:33:44:55")
+            manager.release("00:11:22:33:44:55")
+            first.is_connected = False
+
+            second = await manager.acquire("00:11:22:33:44:55")
+
+            assert second is not first
+            assert second.is_connected
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction_when_full(self, manager):
+        """Test that the least recently used idle session makes room."""
+        manager.idle_timeout = 3600.0
+        with patch('src.marspro.connection_manager.BleakClient', side_effect=_make_bleak_client):
+            first = await manager.acquire("00:00:00:00:00:01")
+            manager.release("00:00:00:00:00:01")
+            await manager.acquire("00:00:00:00:00:02")
+            await manager.acquire("00:00:00:00:00:03")
+
+            assert manager.addresses == ["00:00:00:00:00:02", "00:00:00:00:00:03"]
+            first.disconnect.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_pool_exhausted(self, manager):
+        """Test that acquire fails when every session is in use."""
+        with patch('src.marspro.connection_manager.BleakClient', side_effect=_make_bleak_client):
+            await manager.acquire("00:00:00:00:00:01")
+            await manager.acquire("00:00:00:00:00:02")
+
+            with pytest.raises(RuntimeError):
+                await manager.acquire("00:00:00:00:00:03")
+
+    @pytest.mark.asyncio
+    async def test_evict_idle(self, manager):
+        """Test idle eviction skips sessions that are still borrowed."""
+        with patch('src.marspro.connection_manager.BleakClient', side_effect=_make_bleak_client):
+            await manager.acquire("00:00:00:00:00:01")
+            await manager.acquire("00:00:00:00:00:02")
+            manager.release("00:00:00:00:00:01")
+
+            evicted = await manager.async_evict_idle()
+
+            assert evicted == 1
+            assert manager.addresses == ["00:00:00:00:00:02"]
+
+    @pytest.mark.asyncio
+    async def test_spreads_sessions_across_adapters(self):
+        """Test that sessions are balanced across adapters by load."""
+        manager = MarsProConnectionManager(adapters=["hci0", "hci1"], max_sessions_per_adapter=2)
+        with patch('src.marspro.connection_manager.BleakClient', side_effect=_make_bleak_client):
+            for index in range(4):
+                await manager.acquire(f"00:00:00:00:00:0{index}")
+
+            assert manager.adapter_load("hci0") == 2
+            assert manager.adapter_load("hci1") == 2
+            assert manager.rank_adapters("00:00:00:00:00:09") == []
+
+    @pytest.mark.asyncio
+    async def test_rssi_affinity(self):
+        """Test that the adapter hearing a device best is preferred."""
+        manager = MarsProConnectionManager(adapters=["hci0", "hci1"])
+        manager.report_rssi("00:11:22:33:44:55", "hci1", -50)
+        manager.report_rssi("00:11:22:33:44:55", "hci0", -80)
+        with patch('src.marspro.connection_manager.BleakClient', side_effect=_make_bleak_client) as mock_cls:
+            await manager.acquire("00:11:22:33:44:55")
+
+            mock_cls.assert_called_once_with("00:11:22:33:44:55", adapter="hci1")
+            assert manager.get_session("00:11:22:33:44:55").adapter == "hci1"
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_next_adapter(self):
+        """Test that a failed connect is retried on the next adapter."""
+        manager = MarsProConnectionManager(adapters=["hci0", "hci1"])
+        manager.report_rssi("00:11:22:33:44:55", "hci0", -40)
+
+        def make_client(address, adapter=None):
+            client = _make_bleak_client()
+            if adapter == "hci0":
+                client.connect = AsyncMock(side_effect=Exception("out of connection slots"))
+            return client
+
+        with patch('src.marspro.connection_manager.BleakClient', side_effect=make_client):
+            await manager.acquire("00:11:22:33:44:55")
+
+            assert manager.get_session("00:11:22:33:44:55").adapter == "hci1"
+
+    def test_named_adapters_replace_default(self, manager):
+        """Test that configured adapters replace the implicit default."""
+        manager.add_adapters(["hci0", "hci1"])
+        manager.add_adapters(["hci1"])
+
+        assert manager.adapters == ["hci0", "hci1"]
@@ -0,0 +1,93 @@
+"""
+Unit tests for the decompilation cache of the MarsPro analyzer.
+"""
+
+from pathlib import Path
+
+import pytest
+from unittest.mock import Mock
+from scripts.decompiler_orchestrator import DecompileResult
+from scripts.reverse_engineering_analysis import MarsProAnalyzer
+
+
+def _output_path(job):
+    """Get the directory a decompiler job writes to."""
+    flag = '-o' if job.name == 'apktool' else '-d'
+    return Path(job.cmd[job.cmd.index(flag) + 1])
+
+
+def _decompile_ok(jobs):
+    """Pretend every job decompiled successfully."""
+    results = {}
+    for job in jobs:
+        output = _output_path(job)
+        output.mkdir(parents=True, exist_ok=True)
+        (output / 'AndroidManifest.xml').write_text('<manifest/>')
+        results[job.name] = DecompileResult(job.name, 0, 1.0)
+    return results
+
+
+@pytest.fixture
+def analyzer(tmp_path):
+    """Create an analyzer with known tool versions and a mocked orchestrator."""
+    apk = tmp_path / 'marspro.apk'
+    apk.write_bytes(b'PK\x03\x04 marspro')
+    analyzer = MarsProAnalyzer(str(apk), output_dir=str(tmp_path / 'output'), use_index=False)
+    analyzer._tool_versions = {'apktool': '2.9.3', 'jadx': '1.5.0'}
+    analyzer.orchestrator = Mock()
+    analyzer.orchestrator.run.side_effect = _decompile_ok
+    return analyzer
+
+
+class TestDecompilationCache:
+    """Test cases for the analyzer's decompilation cache."""
+
+    def test_cache_hit_skips_decompiler(self, analyzer):
+        """Test that a completed decompilation of the same APK is reused."""
+        assert analyzer.decompile() == {'apktool': True, 'jadx': True}
+        cache_path = analyzer.cache_dir / analyzer._get_apk_hash() / 'apktool-2.9.3'
+        assert analyzer.apktool_output_dir == cache_path
+        assert (cache_path / MarsProAnalyzer.CACHE_COMPLETE_MARKER).exists()
+        assert not cache_path.with_name('apktool-2.9.3.partial').exists()
+
+        again = MarsProAnalyzer(
+            str(analyzer.apk_path), output_dir=str(analyzer.output_dir), use_index=False
+        )
+        again._tool_versions = dict(analyzer._tool_versions)
+        again.orchestrator = Mock()
+
+        assert again.decompile() == {'apktool': True, 'jadx': True}
+        again.orchestrator.run.assert_not_called()
+        assert again.apktool_output_dir == cache_path
+
+    def test_new_tool_version_decompiles_again(self, analyzer):
+        """Test that a different tool version does not reuse the cached output."""
+        analyzer.decompile(['jadx'])
+        analyzer._tool_versions['jadx'] = '1.5.1'
+
+        assert analyzer.decompile(['jadx']) == {'jadx': True}
+        assert analyzer.orchestrator.run.call_count == 2
+        assert analyzer.jadx_output_dir.name == 'jadx-1.5.1'
+
+    def test_failed_run_leaves_partial_uncached(self, analyzer):
+        """Test that a failed decompilation stays in .partial and is retried from scratch."""
+        def fail(jobs):
+            output = _output_path(jobs[0])
+            output.mkdir(parents=True, exist_ok=True)
+            (output / 'half_written.smali').write_text('.class')
+            return {jobs[0].name: DecompileResult(jobs[0].name, 1, 1.0, output_tail=['brut.common'])}
+
+        analyzer.orchestrator.run.side_effect = fail
+        assert analyzer.decompile(['apktool']) == {'apktool': False}
+
+        cache_path = analyzer.cache_dir / analyzer._get_apk_hash() / 'apktool-2.9.3'
+        partial = cache_path.with_name('apktool-2.9.3.partial')
+        assert not cache_path.exists()
+        assert (partial / 'half_written.smali').exists()
+        assert analyzer.apktool_output_dir == analyzer.output_dir / 'apktool_output'
+
+        # The retry starts from an empty staging directory
+        analyzer.orchestrator.run.side_effect = _decompile_ok
+        assert analyzer.decompile(['apktool']) == {'apktool': True}
+        assert not (cache_path / 'half_written.smali').exists()
+        assert (cache_path / MarsProAnalyzer.CACHE_COMPLETE_MARKER).exists()
@@ -0,0 +1,174 @@
+"""
+Unit tests for the concurrent decompiler orchestrator.
+"""
+
+import io
+
+import pytest
+from unittest.mock import patch
+from scripts.decompiler_orchestrator import (
+    OUTPUT_TAIL_LINES,
+    DecompileJob,
+    DecompilerOrchestrator,
+)
+
+
+class _FakeProcess:
+    """Stand-in for a decompiler process that exits after a number of polls."""
+
+    def __init__(self, lines=(), returncode=0, polls=2):
+        self.stdout = io.StringIO(''.join(f"{line}\n" for line in lines))
+        self.returncode = None
+        self.killed = False
+        self._exit_code = returncode
+        self._polls = polls
+
+    def poll(self):
+        if self.returncode is None:
+            if self._polls > 0:
+                self._polls -= 1
+                return None
+            self.returncode = self._exit_code
+        return self.returncode
+
+    def kill(self):
+        self.killed = True
+        self.returncode = -9
+
+    def wait(self):
+        return self.returncode
+
+
+@pytest.fixture
+def orchestrator():
+    """Create an orchestrator that does not sleep between checks."""
+    return DecompilerOrchestrator(memory_reserve_mb=512, poll_interval=0)
+
+
+def _jobs():
+    return [
+        DecompileJob(name='apktool', cmd=['apktool', 'd', 'app.apk'], heap_mb=1024),
+        DecompileJob(name='jadx', cmd=['jadx', 'app.apk'], heap_mb=2048),
+    ]
+
+
+class TestDecompilerOrchestrator:
+    """Test cases for DecompilerOrchestrator class."""
+
+    def test_jobs_run_concurrently_when_memory_allows(self, orchestrator):
+        """Test that jobs whose heaps fit the budget start side by side."""
+        processes = {}
+        running_at_start = {}
+
+        def popen(cmd, **kwargs):
+            running_at_start[cmd[0]] = [
+                name for name, process in processes.items() if process.returncode is None
+            ]
+            processes[cmd[0]] = _FakeProcess(['I: Done'])
+            return processes[cmd[0]]
+
+        with patch('scripts.decompiler_orchestrator.available_memory_mb', return_value=8192), \
+                patch('scripts.decompiler_orchestrator.subprocess.Popen', side_effect=popen) as mock_popen:
+            results = orchestrator.run(_jobs())
+
+        assert running_at_start == {'apktool': [], 'jadx': ['apktool']}
+        assert all(result.success for result in results.values())
+        assert mock_popen.call_args_list[1].kwargs['env']['JAVA_OPTS'].endswith('-Xmx2048m')
+
+    def test_job_held_back_until_memory_frees(self, orchestrator):
+        """Test that a job exceeding the budget waits and then runs on its own."""
+        processes = {}
+        running_at_start = {}
+
+        def popen(cmd, **kwargs):
+            running_at_start[cmd[0]] = [
+                name for name, process in processes.items() if process.returncode is None
+            ]
+            processes[cmd[0]] = _FakeProcess(polls=3)
+            return processes[cmd[0]]
+
+        # 3000 MB available less the 512 MB reserve fits one heap but not both
+        with patch('scripts.decompiler_orchestrator.available_memory_mb', return_value=3000), \
+                patch('scripts.decompiler_orchestrator.subprocess.Popen', side_effect=popen):
+            results = orchestrator.run(_jobs())
+
+        assert running_at_start == {'apktool': [], 'jadx': []}
+        assert results['apktool'].success and results['jadx'].success
+
+    def test_unknown_memory_runs_everything(self, orchestrator):
+        """Test that jobs are not held back where memory cannot be read."""
+        processes = {}
+        running_at_start = {}
+
+        def popen(cmd, **kwargs):
+            running_at_start[cmd[0]] = [
+                name for name, process in processes.items() if process.returncode is None
+            ]
+            processes[cmd[0]] = _FakeProcess()
+            return processes[cmd[0]]
+
+        with patch('scripts.decompiler_orchestrator.available_memory_mb', return_value=None), \
+                patch('scripts.decompiler_orchestrator.subprocess.Popen', side_effect=popen):
+            orchestrator.run(_jobs())
+
+        assert running_at_start == {'apktool': [], 'jadx': ['apktool']}
+
+    def test_timeout_kills_job(self, orchestrator):
+        """Test that a job running past its timeout is killed and reported."""
+        process = _FakeProcess(['I: Baksmaling classes.dex...'], polls=10**6)
+        job = DecompileJob(name='apktool', cmd=['apktool'], heap_mb=1024, timeout=0)
+
+        with patch('scripts.decompiler_orchestrator.available_memory_mb', return_value=8192), \
+                patch('scripts.decompiler_orchestrator.subprocess.Popen', return_value=process):
+            result = orchestrator.run([job])['apktool']
+
+        assert process.killed is True
+        assert result.timed_out is True
+        assert result.success is False
+        assert result.output_tail == ['I: Baksmaling classes.dex...']
+
+    def test_output_tail_on_failure(self, orchestrator):
+        """Test that a failed job reports its last output lines."""
+        lines = [f"line {i}" for i in range(OUTPUT_TAIL_LINES + 5)] + ['', 'Exception: brut.common']
+        process = _FakeProcess(lines, returncode=1)
+        job = DecompileJob(name='jadx', cmd=['jadx'], heap_mb=2048)
+
+        with patch('scripts.decompiler_orchestrator.available_memory_mb', return_value=8192), \
+                patch('scripts.decompiler_orchestrator.subprocess.Popen', return_value=process):
+            result = orchestrator.run([job])['jadx']
+
+        assert result.success is False
+        assert result.returncode == 1
+        assert len(result.output_tail) == OUTPUT_TAIL_LINES
+        assert result.output_tail[-1] == 'Exception: brut.common'
+        assert result.output_tail[0] == 'line 6'
+
+    def test_missing_tool_fails_only_its_job(self, orchestrator):
+        """Test that a tool that cannot be launched fails its job and the others still run."""
+        process = _FakeProcess(['I: Done'])
+
+        def popen(cmd, **kwargs):
+            if cmd[0] == 'jadx':
+                raise FileNotFoundError(2, "No such file or directory: 'jadx'")
+            return process
+
+        with patch('scripts.decompiler_orchestrator.available_memory_mb', return_value=8192), \
+                patch('scripts.decompiler_orchestrator.subprocess.Popen', side_effect=popen):
+            results = orchestrator.run(_jobs())
+
+        assert results['apktool'].success is True
+        assert results['jadx'].success is False
+        assert results['jadx'].returncode is None
+        assert 'jadx' in results['jadx'].output_tail[0]
+
+    def test_interrupted_run_kills_running_jobs(self, orchestrator):
+        """Test that jobs still running are killed when the run is interrupted."""
+        process = _FakeProcess(polls=10**6)
+
+        with patch('scripts.decompiler_orchestrator.available_memory_mb', return_value=8192), \
+                patch('scripts.decompiler_orchestrator.subprocess.Popen', return_value=process), \
+                patch('scripts.decompiler_orchestrator.time.sleep', side_effect=KeyboardInterrupt):
+            with pytest.raises(KeyboardInterrupt):
+                orchestrator.run(_jobs()[:1])
+
+        assert process.killed is True
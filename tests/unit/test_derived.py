@@ -0,0 +1,72 @@
+"""
+Unit tests for MarsPro derived metrics.
+"""
+
+import math
+from array import array
+
+import pytest
+from unittest.mock import patch
+from src.marspro import derived
+from src.marspro.derived import (
+    compute_derived_metrics,
+    daily_light_integral,
+    dew_point,
+    vapor_pressure_deficit,
+)
+from src.marspro.sample_store import MarsProSample, MarsProSampleStore
+
+
+class TestDerivedMetrics:
+    """Test cases for derived metric functions."""
+
+    def test_vapor_pressure_deficit(self):
+        """Test VPD against reference values."""
+        assert vapor_pressure_deficit(25.0, 60.0) == pytest.approx(1.267, abs=0.002)
+        assert vapor_pressure_deficit(20.0, 100.0) == pytest.approx(0.0)
+
+    def test_dew_point(self):
+        """Test dew point against reference values."""
+        assert dew_point(25.0, 60.0) == pytest.approx(16.7, abs=0.1)
+        assert dew_point(20.0, 100.0) == pytest.approx(20.0, abs=0.01)
+        assert dew_point(20.0, 0.0) is None
+
+    @pytest.mark.parametrize("use_numpy", [True, False])
+    def test_daily_light_integral(self, use_numpy):
+        """Test the rolling DLI with and without NumPy."""
+        if use_numpy and not derived.NUMPY_AVAILABLE:
+            pytest.skip("NumPy not installed")
+
+        # 12 hours at 500 µmol/m²/s sampled every minute = 21.6 mol/m²
+        timestamps = array('d', [60.0 * minute for minute in range(12 * 60 + 1)])
+        ppfd = array('d', [500.0] * len(timestamps))
+        # A missing reading drops the two intervals around it
+        ppfd[10] = math.nan
+
+        with patch.object(derived, "NUMPY_AVAILABLE", use_numpy):
+            dli = daily_light_integral(timestamps, ppfd, now=timestamps[-1])
+            assert dli == pytest.approx(21.6 - 2 * 0.03)
+
+            # Samples before the window are ignored
+            half = daily_light_integral(timestamps, ppfd, now=timestamps[-1], window=6 * 3600)
+            assert half == pytest.approx(10.8)
+
+            # Gaps longer than the maximum are not interpolated
+            gap = array('d', [0.0, 2 * derived.DLI_MAX_GAP])
+            assert daily_light_integral(gap, array('d', [500.0, 500.0]), now=gap[-1]) == 0.0
+
+    def test_compute_derived_metrics(self):
+        """Test metrics computed for the newest sample in a store."""
+        store = MarsProSampleStore(capacity=10)
+        assert compute_derived_metrics(store) == {}
+
+        store.append(MarsProSample(timestamp=0.0, temperature=25.0, humidity=60.0, ppfd=1000.0))
+        store.append(MarsProSample(timestamp=3600.0, temperature=25.0, humidity=60.0, ppfd=1000.0))
+
+        metrics = compute_derived_metrics(store)
+        assert metrics["calculated_vpd"] == pytest.approx(1.267, abs=0.002)
+        assert metrics["dew_point"] == pytest.approx(16.7, abs=0.1)
+        assert metrics["dli"] == pytest.approx(3.6)
+
+        store.append(MarsProSample(timestamp=3660.0, co2=400.0))
+        assert compute_derived_metrics(store) == {}
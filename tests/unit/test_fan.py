@@ -0,0 +1,62 @@
+"""
+Unit tests for MarsPro fan platform.
+"""
+
+import pytest
+from unittest.mock import Mock, AsyncMock
+from src.marspro.const import CMD_POWER_OFF, CMD_POWER_ON, CMD_SET_FAN_SPEED
+from src.marspro.fan import MarsProFan
+from src.marspro.light import MarsProLight
+
+
+class TestMarsProFan:
+    """Test cases for MarsProFan class."""
+
+    @pytest.fixture
+    def coordinator(self):
+        """Create a mock coordinator with one fan."""
+        coordinator = Mock()
+        coordinator.devices = {"fan_1": {"id": "fan_1", "type": "fan", "power": "on", "fan_speed": 40}}
+        coordinator.get_device = lambda device_id: coordinator.devices.get(device_id, {})
+        coordinator.send_command = AsyncMock(return_value={})
+        coordinator.send_commands = AsyncMock(return_value=[])
+        return coordinator
+
+    @pytest.fixture
+    def fan(self, coordinator):
+        """Create a test fan."""
+        return MarsProFan(coordinator, coordinator.devices["fan_1"])
+
+    def test_unique_id_distinct_from_light(self, fan, coordinator):
+        """Test that a device's fan and light get different unique IDs."""
+        light = MarsProLight(coordinator, coordinator.devices["fan_1"])
+
+        assert fan.unique_id == "marspro_fan_1_fan"
+        assert light.unique_id == "marspro_fan_1_light"
+
+    def test_state(self, fan, coordinator):
+        """Test fan state from device data."""
+        assert fan.is_on is True
+        assert fan.percentage == 40
+
+        coordinator.devices["fan_1"] = {**coordinator.devices["fan_1"], "power": "off"}
+        assert fan.is_on is False
+        assert fan.percentage == 0
+
+    @pytest.mark.asyncio
+    async def test_turn_on_with_speed(self, fan, coordinator):
+        """Test that power and speed are sent as one batch."""
+        await fan.async_turn_on(percentage=75)
+
+        coordinator.send_commands.assert_called_once_with(
+            "fan_1", [(CMD_POWER_ON, {}), (CMD_SET_FAN_SPEED, {"fan_speed": 75})]
+        )
+
+    @pytest.mark.asyncio
+    async def test_set_percentage(self, fan, coordinator):
+        """Test setting the fan speed."""
+        await fan.async_set_percentage(60)
+        coordinator.send_command.assert_called_once_with("fan_1", CMD_SET_FAN_SPEED, fan_speed=60)
+
+        await fan.async_set_percentage(0)
+        coordinator.send_command.assert_called_with("fan_1", CMD_POWER_OFF)
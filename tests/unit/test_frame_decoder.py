@@ -0,0 +1,64 @@
+"""
+Unit tests for MarsPro sensor frame decoder.
+"""
+
+import math
+
+import pytest
+from src.marspro.frame_decoder import (
+    FRAME_AIR,
+    FRAME_CLIMATE,
+    FRAME_LAYOUTS,
+    FRAME_LIGHT,
+    SENSOR_FIELDS,
+    decode_frame,
+    decode_frames,
+    encode_frame,
+)
+
+
+class TestFrameDecoder:
+    """Test cases for the frame decoder."""
+
+    def test_decode_climate_frame(self):
+        """Test decoding a climate frame at an offset."""
+        frame = encode_frame(FRAME_CLIMATE, -25, 550, 800, 95)
+        fields, values = decode_frame(b'\xff' + frame, offset=1)
+
+        assert fields == ("temperature", "humidity", "co2", "vpd")
+        assert values == pytest.approx((-2.5, 55.0, 800.0, 0.95))
+
+    def test_decode_truncated_frame(self):
+        """Test that truncated and empty frames are rejected."""
+        frame = encode_frame(FRAME_CLIMATE, 250, 550, 800, 95)
+
+        assert decode_frame(frame[:-1]) is None
+        assert decode_frame(b'') is None
+
+    def test_decode_frame_length_mismatch(self):
+        """Test that frames longer than their provisional layout are not decoded."""
+        frame = encode_frame(FRAME_CLIMATE, 250, 550, 800, 95)
+
+        assert decode_frame(frame + b'\x00') is None
+        assert decode_frame(b'\x7f' + frame[1:]) is None
+        assert all(layout.provisional for layout in FRAME_LAYOUTS.values())
+
+    def test_decode_frames_columnar(self):
+        """Test batch decoding into columns with NaN for missing fields."""
+        buffer = bytearray()
+        buffer += encode_frame(FRAME_LIGHT, 450)
+        buffer += encode_frame(FRAME_AIR, 30, 101300, 1200)
+
+        columns = decode_frames(buffer)
+
+        assert set(columns) == set(SENSOR_FIELDS)
+        assert list(columns["ppfd"][:1]) == [450.0]
+        assert math.isnan(columns["ppfd"][1])
+        assert columns["wind_speed"][1] == pytest.approx(3.0)
+        assert columns["air_volume"][1] == pytest.approx(120.0)
+        assert all(len(column) == 2 for column in columns.values())
+
+    def test_decode_frames_unknown_type(self):
+        """Test that an unknown frame type stops batch decoding."""
+        with pytest.raises(ValueError):
+            decode_frames(encode_frame(FRAME_LIGHT, 450) + b'\x7f')
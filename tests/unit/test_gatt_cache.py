@@ -0,0 +1,145 @@
+"""Tests for MarsPro GATT layout cache."""
+
+import asyncio
+import json
+
+import pytest
+from unittest.mock import patch
+
+from src.marspro.gatt_cache import (
+    CACHE_FORMAT_VERSION,
+    CachedCharacteristic,
+    CachedService,
+    MarsProGattCache,
+    backend_cache_kwargs,
+    layout_hash,
+)
+
+ADDRESS = "aa:bb:cc:dd:ee:ff"
+
+
+def _services(char_handle=2):
+    """Build a one-service GATT table."""
+    return [
+        CachedService(
+            uuid="0000ffe0-0000-1000-8000-00805f9b34fb",
+            handle=1,
+            characteristics=[
+                CachedCharacteristic(
+                    uuid="0000ffe1-0000-1000-8000-00805f9b34fb",
+                    handle=char_handle,
+                    properties=["write"],
+                )
+            ],
+        )
+    ]
+
+
+class TestMarsProGattCache:
+    """Test the GATT layout cache."""
+
+    @pytest.mark.asyncio
+    async def test_save_and_load(self, tmp_path):
+        """Test that recorded layouts survive a reload from disk."""
+        path = tmp_path / "gatt_cache.json"
+        cache = MarsProGattCache(path)
+        await cache.async_load()
+        layout = cache.put(ADDRESS, "1.3.2", _services())
+        await cache.async_save()
+
+        data = json.loads(path.read_text())
+        assert data["version"] == CACHE_FORMAT_VERSION
+        assert data["devices"] == {f"{ADDRESS.upper()}|1.3.2": layout}
+
+        reloaded = MarsProGattCache(path)
+        await reloaded.async_load()
+        assert reloaded.get_layout(ADDRESS, "1.3.2") == layout
+
+    @pytest.mark.asyncio
+    async def test_file_io_runs_in_executor(self, tmp_path):
+        """Test that reading and writing the file happens off the event loop."""
+        cache = MarsProGattCache(tmp_path / "gatt_cache.json")
+        loop = asyncio.get_running_loop()
+        with patch.object(loop, "run_in_executor", wraps=loop.run_in_executor) as executor:
+            await cache.async_load()
+            cache.put(ADDRESS, None, _services())
+            await cache.async_save()
+
+        assert [call.args[1] for call in executor.call_args_list] == [cache._read, cache._write]
+
+    @pytest.mark.asyncio
+    async def test_save_skipped_when_unchanged(self, tmp_path):
+        """Test that an unchanged cache is not rewritten."""
+        path = tmp_path / "gatt_cache.json"
+        cache = MarsProGattCache(path)
+        await cache.async_load()
+        await cache.async_save()
+        assert not path.exists()
+
+        cache.put(ADDRESS, None, _services())
+        await cache.async_save()
+        mtime = path.stat().st_mtime_ns
+        cache.put(ADDRESS, None, _services())
+        await cache.async_save()
+        assert path.stat().st_mtime_ns == mtime
+
+    @pytest.mark.asyncio
+    async def test_key_by_address_and_firmware(self, tmp_path):
+        """Test that entries are keyed by address (any case) and firmware."""
+        cache = MarsProGattCache(tmp_path / "gatt_cache.json")
+        await cache.async_load()
+        layout = cache.put(ADDRESS, "1.3.2", _services())
+
+        assert cache.get_layout(ADDRESS.upper(), "1.3.2") == layout
+        assert cache.get_layout(ADDRESS, "1.4.0") is None
+        assert cache.get_layout(ADDRESS) is None
+
+    @pytest.mark.asyncio
+    async def test_layout_mismatch_drops_other_firmware(self, tmp_path):
+        """Test that a new layout invalidates entries of other firmware versions."""
+        cache = MarsProGattCache(tmp_path / "gatt_cache.json")
+        await cache.async_load()
+        cache.put(ADDRESS, "1.3.2", _services())
+        cache.put(ADDRESS, "1.3.3", _services())
+        new_layout = cache.put(ADDRESS, "1.4.0", _services(char_handle=5))
+
+        assert new_layout != layout_hash(_services())
+        assert cache.get_layout(ADDRESS, "1.3.2") is None
+        assert cache.get_layout(ADDRESS, "1.3.3") is None
+        assert cache.get_layout(ADDRESS, "1.4.0") == new_layout
+
+    @pytest.mark.asyncio
+    async def test_invalidate(self, tmp_path):
+        """Test invalidating one firmware version or every entry of a device."""
+        cache = MarsProGattCache(tmp_path / "gatt_cache.json")
+        await cache.async_load()
+        cache.put(ADDRESS, "1.3.2", _services())
+        cache.put(ADDRESS, "1.3.3", _services())
+
+        cache.invalidate(ADDRESS, "1.3.2")
+        assert cache.get_layout(ADDRESS, "1.3.2") is None
+        assert cache.get_layout(ADDRESS, "1.3.3") is not None
+
+        cache.invalidate(ADDRESS)
+        assert cache.get_layout(ADDRESS, "1.3.3") is None
+
+    @pytest.mark.asyncio
+    async def test_unreadable_file_is_ignored(self, tmp_path):
+        """Test that a corrupt or outdated cache file starts an empty cache."""
+        path = tmp_path / "gatt_cache.json"
+        path.write_text("{not json")
+        cache = MarsProGattCache(path)
+        await cache.async_load()
+        assert cache.get_layout(ADDRESS) is None
+
+        path.write_text(json.dumps({"version": 1, "devices": {f"{ADDRESS.upper()}|unknown": {}}}))
+        cache = MarsProGattCache(path)
+        await cache.async_load()
+        assert cache.get_layout(ADDRESS) is None
+
+    def test_backend_cache_kwargs(self):
+        """Test that only BlueZ needs the explicit cache flag."""
+        with patch("src.marspro.gatt_cache.platform.system", return_value="Linux"):
+            assert backend_cache_kwargs() == {"dangerous_use_bleak_cache": True}
+        with patch("src.marspro.gatt_cache.platform.system", return_value="Windows"):
+            assert backend_cache_kwargs() == {}
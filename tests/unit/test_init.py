@@ -0,0 +1,158 @@
+"""
+Unit tests for MarsPro config entry setup.
+"""
+
+import pytest
+import pytest_asyncio
+from unittest.mock import AsyncMock, Mock, patch
+from homeassistant.config_entries import ConfigEntries, ConfigEntry
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+from src.marspro import async_migrate_entry, async_setup_entry, async_unload_entry
+from src.marspro.const import CONF_USE_CLOUD, DOMAIN
+from src.marspro.session import (
+    DATA_CONNECTION_MANAGER,
+    DATA_SESSION,
+    async_get_shared_connection_manager,
+    async_release_shared_connection_manager,
+)
+
+
+@pytest_asyncio.fixture
+async def hass(tmp_path):
+    """Create a bare Home Assistant instance."""
+    hass = HomeAssistant(str(tmp_path))
+    yield hass
+    await hass.async_stop(force=True)
+
+
+@pytest.fixture
+def entry():
+    """Create a cloud config entry."""
+    entry = Mock()
+    entry.entry_id = "entry_1"
+    entry.data = {CONF_EMAIL: "test@example.com", CONF_PASSWORD: "password123", CONF_USE_CLOUD: True}
+    return entry
+
+
+@pytest.fixture
+def api():
+    """Patch the API client the entry creates."""
+    api = Mock()
+    api.test_connection = AsyncMock()
+    api.disconnect = AsyncMock()
+    with patch("src.marspro.MarsProAPI", return_value=api):
+        yield api
+
+
+class TestAsyncSetupEntry:
+    """Test cases for async_setup_entry."""
+
+    @pytest.mark.asyncio
+    async def test_connection_failure_releases_session(self, hass, entry, api):
+        """Test that a failed connection test releases the shared session."""
+        api.test_connection.side_effect = RuntimeError("unreachable")
+
+        with pytest.raises(ConfigEntryNotReady):
+            await async_setup_entry(hass, entry)
+
+        assert hass.data[DATA_SESSION] == {"session": None, "users": 0}
+        api.disconnect.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_first_refresh_failure_releases_session(self, hass, entry, api):
+        """Test that a failed first refresh releases the shared session."""
+        coordinator = Mock()
+        coordinator.async_config_entry_first_refresh = AsyncMock(side_effect=ConfigEntryNotReady)
+        coordinator.async_stop_passive_telemetry = AsyncMock()
+
+        with patch("src.marspro.MarsProDataUpdateCoordinator", return_value=coordinator):
+            with pytest.raises(ConfigEntryNotReady):
+                await async_setup_entry(hass, entry)
+
+        assert hass.data[DATA_SESSION] == {"session": None, "users": 0}
+        assert entry.entry_id not in hass.data[DOMAIN]
+        coordinator.async_stop_passive_telemetry.assert_awaited_once()
+        api.disconnect.assert_awaited_once()
+
+
+class TestSharedConnectionManager:
+    """Test cases for the shared BLE connection pool."""
+
+    @pytest.mark.asyncio
+    async def test_closed_after_last_user(self, hass):
+        """Test that the pool is shared and disconnected once the last entry releases it."""
+        manager = async_get_shared_connection_manager(hass, ["hci0"])
+        assert async_get_shared_connection_manager(hass, ["hci1"]) is manager
+        assert manager.adapters == ["hci0", "hci1"]
+
+        with patch.object(manager, "close", AsyncMock()) as close:
+            await async_release_shared_connection_manager(hass)
+            close.assert_not_awaited()
+            await async_release_shared_connection_manager(hass)
+            close.assert_awaited_once()
+
+        assert hass.data[DATA_CONNECTION_MANAGER] == {"manager": None, "users": 0}
+        assert async_get_shared_connection_manager(hass) is not manager
+
+    @pytest.mark.asyncio
+    async def test_local_entry_setup_failure_releases_pool(self, hass, entry, api):
+        """Test that a local entry failing setup releases the BLE pool."""
+        entry.data = {**entry.data, CONF_USE_CLOUD: False}
+        api.test_connection.side_effect = RuntimeError("unreachable")
+
+        with pytest.raises(ConfigEntryNotReady):
+            await async_setup_entry(hass, entry)
+
+        assert hass.data[DATA_CONNECTION_MANAGER] == {"manager": None, "users": 0}
+
+    @pytest.mark.asyncio
+    async def test_local_entry_unload_releases_pool(self, hass, entry):
+        """Test that unloading the last local entry disconnects the BLE pool."""
+        entry.data = {**entry.data, CONF_USE_CLOUD: False}
+        manager = async_get_shared_connection_manager(hass)
+        coordinator = Mock()
+        coordinator.async_stop_passive_telemetry = AsyncMock()
+        coordinator.api.disconnect = AsyncMock()
+        hass.data[DOMAIN] = {entry.entry_id: coordinator}
+        hass.config_entries = Mock()
+        hass.config_entries.async_unload_platforms = AsyncMock(return_value=True)
+
+        with patch.object(manager, "close", AsyncMock()) as close:
+            assert await async_unload_entry(hass, entry) is True
+
+        close.assert_awaited_once()
+
+
+class TestAsyncMigrateEntry:
+    """Test cases for async_migrate_entry."""
+
+    @pytest.mark.asyncio
+    async def test_unique_ids_get_platform_suffix(self, hass):
+        """Test that version 1 fan and light unique IDs gain their platform suffix."""
+        await dr.async_load(hass)
+        await er.async_load(hass)
+        hass.config_entries = ConfigEntries(hass, {})
+        entry = ConfigEntry(
+            version=1,
+            minor_version=1,
+            domain=DOMAIN,
+            title="MarsPro",
+            data={CONF_EMAIL: "test@example.com", CONF_USE_CLOUD: True},
+            source="user",
+        )
+        registry = er.async_get(hass)
+        for domain in ("fan", "light"):
+            registry.async_get_or_create(domain, DOMAIN, "marspro_1", config_entry=entry)
+        registry.async_get_or_create("sensor", DOMAIN, "marspro_1_temperature", config_entry=entry)
+
+        assert await async_migrate_entry(hass, entry) is True
+
+        assert registry.async_get_entity_id("fan", DOMAIN, "marspro_1_fan")
+        assert registry.async_get_entity_id("light", DOMAIN, "marspro_1_light")
+        assert registry.async_get_entity_id("sensor", DOMAIN, "marspro_1_temperature")
+        assert entry.version == 2
+        # Existing connection settings are kept
+        assert entry.data[CONF_USE_CLOUD] is True
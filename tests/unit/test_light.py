@@ -0,0 +1,157 @@
+"""
+Unit tests for MarsPro light platform.
+"""
+
+import pytest
+from unittest.mock import Mock, AsyncMock, patch
+from src.marspro.const import CONF_OPTIMISTIC, DEFAULT_OPTIMISTIC_TIMEOUT, DOMAIN
+from src.marspro.coordinator import ReconciliationStats
+from src.marspro.light import MarsProLight, async_setup_entry
+
+
+class TestMarsProLight:
+    """Test cases for MarsProLight class."""
+
+    @pytest.fixture
+    def coordinator(self):
+        """Create a mock coordinator."""
+        coordinator = Mock()
+        coordinator.devices = {"light_1": {"id": "light_1", "power": "off", "brightness": 50}}
+        coordinator.get_device = lambda device_id: coordinator.devices.get(device_id, {})
+        coordinator.get_status_time = Mock(return_value=0.0)
+        coordinator.send_commands = AsyncMock(return_value=[])
+        coordinator.send_command = AsyncMock(return_value={})
+        coordinator.reconciliation_stats = ReconciliationStats()
+        coordinator.get_devices_by_type = Mock(return_value=[coordinator.devices["light_1"]])
+        return coordinator
+
+    @pytest.fixture
+    def light(self, coordinator):
+        """Create a light with state writes stubbed out."""
+        light = MarsProLight(coordinator, coordinator.devices["light_1"])
+        light.hass = Mock()
+        light.hass.loop.time.return_value = 0.0
+        light.async_write_ha_state = Mock()
+        light._update_from_device_data(coordinator.devices["light_1"])
+        return light
+
+    @pytest.mark.asyncio
+    async def test_turn_on_is_optimistic(self, light, coordinator):
+        """Test that the commanded state is shown before the device confirms it."""
+        states = []
+        coordinator.send_commands.side_effect = lambda *args: states.append(light.is_on)
+
+        await light.async_turn_on(brightness=255)
+
+        assert states == [True]
+        assert light.is_on is True
+        assert light.brightness == 255
+
+    @pytest.mark.asyncio
+    async def test_rollback_on_failure(self, light, coordinator):
+        """Test that a failed command restores the previous state."""
+        coordinator.send_command.side_effect = Exception("write failed")
+        await light.async_turn_on()
+
+        with pytest.raises(Exception):
+            await light.async_turn_off()
+
+        assert light.is_on is True
+
+    @pytest.mark.asyncio
+    async def test_reconcile_confirmed(self, light, coordinator):
+        """Test that a matching status read confirms the optimistic state."""
+        await light.async_turn_on()
+
+        # Updates without a fresh status read keep the optimistic state
+        light._handle_coordinator_update()
+        assert light.is_on is True
+
+        coordinator.devices["light_1"]["power"] = "on"
+        coordinator.get_status_time.return_value = float("inf")
+        light._handle_coordinator_update()
+
+        assert light.is_on is True
+        assert coordinator.reconciliation_stats.confirmed == 1
+        assert coordinator.reconciliation_stats.mismatched == 0
+
+    @pytest.mark.asyncio
+    async def test_reconcile_mismatch(self, light, coordinator):
+        """Test that a disagreeing status read rolls back and is counted."""
+        await light.async_turn_on()
+
+        coordinator.get_status_time.return_value = float("inf")
+        light._handle_coordinator_update()
+
+        assert light.is_on is False
+        assert coordinator.reconciliation_stats.mismatched == 1
+        assert coordinator.reconciliation_stats.mismatch_rate == 1.0
+
+    @pytest.mark.asyncio
+    async def test_non_optimistic(self, coordinator):
+        """Test that state is left to the coordinator when optimism is off."""
+        light = MarsProLight(coordinator, coordinator.devices["light_1"], optimistic=False)
+        light.hass = Mock()
+        light.async_write_ha_state = Mock()
+
+        await light.async_turn_on()
+
+        assert light.is_on is False
+        coordinator.send_commands.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_expected_state_times_out(self, light, coordinator):
+        """Test that the optimistic state is dropped if no status read follows."""
+        with patch("src.marspro.light.async_call_later") as call_later:
+            await light.async_turn_on()
+
+        assert call_later.call_args.args[1] == DEFAULT_OPTIMISTIC_TIMEOUT
+        expire = call_later.call_args.args[2]
+
+        # The targeted refresh failed, so updates keep carrying the old status
+        light._handle_coordinator_update()
+        assert light.is_on is True
+
+        expire(None)
+
+        assert light.is_on is False
+        assert light._expected is None
+        light._handle_coordinator_update()
+        assert light.is_on is False
+
+    @pytest.mark.asyncio
+    async def test_reconcile_cancels_timeout(self, light, coordinator):
+        """Test that a status read after the command cancels the timeout."""
+        cancel = Mock()
+        with patch("src.marspro.light.async_call_later", return_value=cancel):
+            await light.async_turn_on()
+
+        coordinator.get_status_time.return_value = float("inf")
+        light._handle_coordinator_update()
+
+        cancel.assert_called_once()
+
+    def test_state_from_device_data(self, light, coordinator):
+        """Test that the light reads the coordinator's current device data."""
+        coordinator.devices["light_1"] = {"id": "light_1", "power": "on", "brightness": 100}
+        light._handle_coordinator_update()
+
+        assert light.is_on is True
+        assert light.brightness == 255
+        assert light.device_info["identifiers"] == {(DOMAIN, "light_1")}
+
+    @pytest.mark.asyncio
+    async def test_optimistic_option(self, coordinator):
+        """Test that optimistic state is configured through the entry options."""
+        hass = Mock()
+        hass.data = {DOMAIN: {"entry": coordinator}}
+        entry = Mock()
+        entry.entry_id = "entry"
+        entry.data = {CONF_OPTIMISTIC: True}
+        entry.options = {CONF_OPTIMISTIC: False}
+        add_entities = Mock()
+
+        await async_setup_entry(hass, entry, add_entities)
+
+        (light,) = add_entities.call_args.args[0]
+        assert light.optimistic is False
@@ -0,0 +1,77 @@
+"""
+Unit tests for MarsPro adaptive poll scheduler.
+"""
+
+import pytest
+from src.marspro.poll_scheduler import MarsProPollScheduler
+
+
+class TestMarsProPollScheduler:
+    """Test cases for MarsProPollScheduler class."""
+
+    @pytest.fixture
+    def scheduler(self):
+        """Create a scheduler without jitter."""
+        return MarsProPollScheduler(base_interval=30, min_interval=10, max_interval=120, jitter=0.0)
+
+    def test_new_devices_are_due(self, scheduler):
+        """Test that unseen devices are polled immediately."""
+        assert scheduler.due(["a", "b"], now=0.0) == ["a", "b"]
+
+    def test_backs_off_on_stable_readings(self, scheduler):
+        """Test that readings within the deadband lengthen the interval."""
+        scheduler.record("a", {"temperature": 25.0}, now=0.0)
+        assert scheduler.record("a", {"temperature": 25.1}, now=30.0) == 45
+        assert scheduler.record("a", {"temperature": 25.0}, now=75.0) == 67.5
+
+        for _ in range(10):
+            scheduler.record("a", {"temperature": 25.0}, now=100.0)
+        assert scheduler.get_state("a").interval == 120
+
+    def test_speeds_up_on_change(self, scheduler):
+        """Test that readings beyond the deadband shorten the interval."""
+        scheduler.record("a", {"temperature": 25.0, "power": True}, now=0.0)
+        assert scheduler.record("a", {"temperature": 26.0, "power": True}, now=30.0) == 15
+        assert scheduler.record("a", {"temperature": 26.0, "power": False}, now=45.0) == 10
+
+    def test_unlisted_fields_use_relative_deadband(self, scheduler):
+        """Test that ticking timestamps and counters do not pin the interval."""
+        status = {"temperature": 25.0, "timestamp": 1_700_000_000, "uptime": 86_400}
+        scheduler.record("a", status, now=0.0)
+        for step in range(1, 6):
+            status = {**status, "timestamp": status["timestamp"] + 30, "uptime": status["uptime"] + 30}
+            scheduler.record("a", status, now=30.0 * step)
+        assert scheduler.get_state("a").interval == 120
+
+        # Large relative moves of unlisted fields still count
+        scheduler.record("a", {**status, "brightness": 50}, now=200.0)
+        assert scheduler.record("a", {**status, "brightness": 100}, now=320.0) == 60
+
+    def test_due_and_next_wakeup(self, scheduler):
+        """Test due devices and the time until the next one."""
+        scheduler.record("a", {"temperature": 25.0}, now=0.0)
+        scheduler.record("b", {"temperature": 25.0}, now=20.0)
+
+        assert scheduler.due(["a", "b"], now=29.0) == []
+        assert scheduler.due(["a", "b"], now=30.0) == ["a"]
+        assert scheduler.next_wakeup(now=0.0) == 30
+        assert scheduler.next_wakeup(now=29.0) == 10
+
+    def test_command_speeds_up_polling(self, scheduler):
+        """Test that a command switches to the minimum interval."""
+        scheduler.record("a", {"temperature": 25.0}, now=0.0)
+        scheduler.notify_command("a", now=5.0)
+
+        assert scheduler.due(["a"], now=14.0) == []
+        assert scheduler.due(["a"], now=15.0) == ["a"]
+        assert scheduler.get_state("a").interval == 10
+
+    def test_jitter_spreads_due_times(self):
+        """Test that jitter keeps devices from synchronising."""
+        scheduler = MarsProPollScheduler(base_interval=30, jitter=0.1)
+        for index in range(20):
+            scheduler.record(str(index), {}, now=0.0)
+
+        due_times = {scheduler.get_state(str(index)).next_due for index in range(20)}
+        assert len(due_times) > 1
+        assert all(27.0 <= due <= 33.0 for due in due_times)
@@ -0,0 +1,85 @@
+"""
+Unit tests for MarsPro sensor sample store.
+"""
+
+import math
+
+import pytest
+from src.marspro.ble_client import MarsProSensorData
+from src.marspro.sample_store import MarsProSample, MarsProSampleStore
+
+
+class TestMarsProSampleStore:
+    """Test cases for MarsProSampleStore class."""
+
+    @pytest.fixture
+    def store(self):
+        """Create a small store for testing."""
+        return MarsProSampleStore(capacity=3)
+
+    def test_round_trip(self, store):
+        """Test that sensor data comes back unchanged, including missing fields."""
+        data = MarsProSensorData(temperature=25.5, humidity=60.0, timestamp=100.0)
+
+        store.append(data)
+
+        assert len(store) == 1
+        assert store.latest() == data
+        assert store[0].co2 is None
+
+    def test_ring_buffer_wraps(self, store):
+        """Test that the oldest samples are overwritten once full."""
+        for i in range(5):
+            store.append(MarsProSensorData(ppfd=float(i), timestamp=float(i)))
+
+        assert len(store) == 3
+        assert list(store.column("ppfd")) == [2.0, 3.0, 4.0]
+        assert [data.timestamp for data in store] == [2.0, 3.0, 4.0]
+        assert store[-1].ppfd == 4.0
+
+        with pytest.raises(IndexError):
+            store[3]
+
+    def test_column_missing_values(self, store):
+        """Test that missing values are NaN in columns."""
+        store.append(MarsProSensorData(vpd=1.1))
+        store.append(MarsProSensorData())
+
+        column = store.column("vpd")
+
+        assert column[0] == 1.1
+        assert math.isnan(column[1])
+
+    def test_min_interval_downsamples(self):
+        """Test that readings closer than the interval overwrite the newest sample."""
+        store = MarsProSampleStore(capacity=10, min_interval=30.0)
+        for t in range(0, 100, 10):
+            store.append(MarsProSensorData(ppfd=float(t), timestamp=float(t)))
+
+        # Older samples are 30 s apart, the newest holds the latest reading
+        assert list(store.column("timestamp")) == [0.0, 30.0, 60.0, 90.0]
+        assert store.latest().ppfd == 90.0
+
+    def test_for_window(self):
+        """Test that a store sized for a window keeps the whole window."""
+        store = MarsProSampleStore.for_window(3600.0, 30.0)
+        for t in range(0, 7200, 7):
+            store.append(MarsProSensorData(ppfd=1.0, timestamp=float(t)))
+
+        timestamps = store.column("timestamp")
+        assert timestamps[-1] == 7196.0
+        assert timestamps[-1] - timestamps[0] >= 3600.0
+
+        with pytest.raises(ValueError):
+            MarsProSampleStore.for_window(3600.0, 0.0)
+
+    def test_slotted_sample(self):
+        """Test the slotted sample record."""
+        sample = MarsProSample(timestamp=1.0, temperature=20.0)
+
+        assert not hasattr(sample, "__dict__")
+        assert sample.to_sensor_data() == MarsProSensorData(temperature=20.0, timestamp=1.0)
+        assert MarsProSample.from_sensor_data(sample.to_sensor_data()) == sample
+
+        with pytest.raises(TypeError):
+            MarsProSample(brightness=1.0)
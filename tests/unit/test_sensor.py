@@ -0,0 +1,83 @@
+"""
+Unit tests for MarsPro sensor platform.
+"""
+
+import pytest
+from unittest.mock import Mock
+from src.marspro.ble_client import MarsProSensorData
+from src.marspro.sensor import SENSOR_DESCRIPTIONS, MarsProSensor, async_setup_entry
+
+
+class TestMarsProSensor:
+    """Test cases for MarsProSensor class."""
+
+    @pytest.fixture
+    def coordinator(self):
+        """Create a mock coordinator with one sensor and one light."""
+        coordinator = Mock()
+        coordinator.devices = {
+            "sensor_1": {"id": "sensor_1", "name": "Tent", "type": "sensor", "temperature": 25.5},
+            "light_1": {"id": "light_1", "type": "light", "ppfd": 800.0},
+        }
+        coordinator.get_devices = lambda: list(coordinator.devices.values())
+        coordinator.get_device = lambda device_id: coordinator.devices.get(device_id, {})
+        coordinator.last_update_success = True
+        return coordinator
+
+    def test_descriptions_cover_sensor_data(self):
+        """Test that every sensor data field has a sensor."""
+        fields = set(vars(MarsProSensorData())) - {"timestamp", "raw"}
+        assert {description.key for description in SENSOR_DESCRIPTIONS} == fields
+
+    @pytest.mark.asyncio
+    async def test_setup_entry(self, coordinator):
+        """Test which sensors are created per device."""
+        hass = Mock()
+        hass.data = {"marspro": {"entry": coordinator}}
+        entry = Mock()
+        entry.entry_id = "entry"
+        add_entities = Mock()
+
+        await async_setup_entry(hass, entry, add_entities)
+
+        entities = add_entities.call_args[0][0]
+        keys = [(entity.device_id, entity.entity_description.key) for entity in entities]
+        assert len([key for key in keys if key[0] == "sensor_1"]) == len(SENSOR_DESCRIPTIONS)
+        assert [key for key in keys if key[0] == "light_1"] == [("light_1", "ppfd")]
+
+    @pytest.mark.asyncio
+    async def test_setup_entry_adds_late_readings(self, coordinator):
+        """Test that readings reported after setup get their sensors."""
+        hass = Mock()
+        hass.data = {"marspro": {"entry": coordinator}}
+        entry = Mock()
+        entry.entry_id = "entry"
+        add_entities = Mock()
+
+        await async_setup_entry(hass, entry, add_entities)
+        listener = coordinator.async_add_listener.call_args[0][0]
+        entry.async_on_unload.assert_called_once_with(coordinator.async_add_listener.return_value)
+        add_entities.reset_mock()
+
+        # Nothing new, nothing added
+        listener()
+        add_entities.assert_not_called()
+
+        coordinator.devices["light_1"] = {**coordinator.devices["light_1"], "dli": 12.5}
+        listener()
+        entities = add_entities.call_args[0][0]
+        assert [(entity.device_id, entity.entity_description.key) for entity in entities] == [
+            ("light_1", "dli")
+        ]
+
+    def test_reads_shared_snapshot(self, coordinator):
+        """Test that sensors read the coordinator's current device data."""
+        sensor = MarsProSensor(coordinator, coordinator.devices["sensor_1"], SENSOR_DESCRIPTIONS[0])
+
+        assert sensor.name == "Tent Temperature"
+        assert sensor.unique_id == "marspro_sensor_1_temperature"
+        assert sensor.native_value == 25.5
+
+        coordinator.devices["sensor_1"] = {**coordinator.devices["sensor_1"], "temperature": 26.0}
+        assert sensor.native_value == 26.0
+        assert sensor.available is True
@@ -0,0 +1,97 @@
+"""
+Unit tests for the decompiled-source index.
+"""
+
+import os
+
+import pytest
+from scripts.source_index import SourceIndex
+
+
+@pytest.fixture
+def trees(tmp_path):
+    """Create apktool and jadx output trees."""
+    apktool = tmp_path / "apktool"
+    jadx = tmp_path / "jadx"
+    (apktool / "smali").mkdir(parents=True)
+    (jadx / "sources").mkdir(parents=True)
+    (apktool / "smali" / "Ble.smali").write_text('const-string v0, "0000ffe1"\n')
+    (apktool / "AndroidManifest.xml").write_text('<uses-permission name="BLUETOOTH"/>\n')
+    (jadx / "sources" / "Ble.java").write_text('String uuid = "0000FFE1";\nconnect();\n')
+    return [(apktool, (".smali", ".xml")), (jadx, (".java",))]
+
+
+@pytest.fixture
+def index(tmp_path):
+    """Open an index in a temporary directory."""
+    index = SourceIndex(tmp_path / "index" / "sources.db")
+    yield index
+    index.close()
+
+
+class TestSourceIndex:
+    """Test cases for SourceIndex class."""
+
+    def test_search(self, index, trees):
+        """Test trigram and short-pattern searches over the indexed files."""
+        index.update(trees)
+
+        hits = index.search(["ffe1"])
+        assert sorted((hit.file, hit.line) for hit in hits) == [
+            ("smali/Ble.smali", 1), ("sources/Ble.java", 1)
+        ]
+        # Shorter than a trigram, answered by scanning the stored bodies
+        assert [hit.file for hit in index.search(["()"])] == ["sources/Ble.java"]
+
+        regex_hits = list(index.search_regex(r"connect\(\)"))
+        assert [(hit.pattern, hit.line) for hit in regex_hits] == [("connect()", 2)]
+
+    def test_incremental_update(self, index, trees):
+        """Test that only added, modified and deleted files touch the index."""
+        assert index.update(trees) == {'added': 3, 'updated': 0, 'unchanged': 0, 'removed': 0}
+        assert index.update(trees) == {'added': 0, 'updated': 0, 'unchanged': 3, 'removed': 0}
+
+        apktool, jadx = trees[0][0], trees[1][0]
+        smali = apktool / "smali" / "Ble.smali"
+        smali.write_text('const-string v0, "0000ffe2"\nreturn-void\n')
+        # Touched without changing the content
+        manifest = apktool / "AndroidManifest.xml"
+        stat = manifest.stat()
+        os.utime(manifest, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        (jadx / "sources" / "Ble.java").unlink()
+
+        assert index.update(trees) == {'added': 0, 'updated': 1, 'unchanged': 1, 'removed': 1}
+        assert [hit.file for hit in index.search(["ffe2"])] == ["smali/Ble.smali"]
+        assert index.search(["ffe1"]) == []
+
+    def test_stale_roots_pruned(self, index, trees):
+        """Test that trees no longer indexed are dropped from the index."""
+        index.update(trees)
+
+        stats = index.update(trees[:1])
+
+        assert stats['removed'] == 1
+        assert [hit.file for hit in index.search(["ffe1"])] == ["smali/Ble.smali"]
+
+    def test_search_scoped_to_roots(self, index, trees):
+        """Test that queries only return files of the trees being searched."""
+        index.update(trees)
+        apktool, jadx = trees[0][0], trees[1][0]
+
+        assert [hit.file for hit in index.search(["ffe1"], roots=[jadx])] == ["sources/Ble.java"]
+        assert [hit.file for hit in index.search(["()"], roots=[apktool])] == []
+        assert list(index.search_regex("ffe1", roots=[apktool]))[0].file == "smali/Ble.smali"
+        assert index.search(["ffe1"], roots=[]) == []
+
+    def test_persists_across_reopen(self, tmp_path, trees):
+        """Test that a reopened index skips files it already holds."""
+        path = tmp_path / "sources.db"
+        index = SourceIndex(path)
+        index.update(trees)
+        index.close()
+
+        index = SourceIndex(path)
+        try:
+            assert index.update(trees)['unchanged'] == 3
+        finally:
+            index.close()
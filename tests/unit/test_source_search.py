@@ -0,0 +1,91 @@
+"""
+Unit tests for the decompiled-source search.
+"""
+
+import pytest
+from scripts.source_search import (
+    MultiPatternSearcher,
+    SearchHit,
+    group_files_by_pattern,
+    iter_source_files,
+)
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """Create a small decompiled tree."""
+    (tmp_path / "smali" / "com" / "marspro").mkdir(parents=True)
+    (tmp_path / "smali" / "com" / "marspro" / "Api.smali").write_text(
+        'const-string v0, "https://cloud.marspro.com/api/login"\n'
+        'const-string v1, "Authorization"\n'
+    )
+    (tmp_path / "res").mkdir()
+    (tmp_path / "res" / "strings.xml").write_text('<string name="uuid">0000FFE0</string>\n')
+    (tmp_path / "res" / "icon.png").write_bytes(b"api.")
+    return tmp_path
+
+
+class TestMultiPatternSearcher:
+    """Test cases for MultiPatternSearcher class."""
+
+    def test_overlapping_patterns(self):
+        """Test that patterns overlapping or containing one another are all reported."""
+        searcher = MultiPatternSearcher(["api.", ".com/api", "com"])
+
+        hits = searcher.search_text("x.com/api.v2")
+
+        assert [(hit.pattern, hit.offset) for hit in hits] == [
+            (".com/api", 1), ("com", 2), ("api.", 6)
+        ]
+
+    def test_case_insensitive_with_lines(self):
+        """Test that matches ignore case and carry 1-based line numbers."""
+        searcher = MultiPatternSearcher(["ffe0"])
+
+        hits = searcher.search_text("first\nuuid FFE0\nthird ffE0", "a.smali")
+
+        assert hits == [
+            SearchHit("ffe0", "a.smali", 2, 11),
+            SearchHit("ffe0", "a.smali", 3, 22),
+        ]
+
+    def test_duplicate_and_empty_patterns(self):
+        """Test that duplicate and empty patterns are dropped in caller order."""
+        searcher = MultiPatternSearcher(["b", "", "a", "b"])
+
+        assert searcher.patterns == ["b", "a"]
+        assert MultiPatternSearcher([]).search_text("anything") == []
+
+    def test_search_tree(self, tree):
+        """Test that a tree is searched once per file with relative names."""
+        searcher = MultiPatternSearcher(["api", "FFE0", "authorization"])
+
+        hits = list(searcher.search_tree(tree, (".smali", ".xml")))
+
+        assert group_files_by_pattern(searcher.patterns, hits) == {
+            "api": ["smali/com/marspro/Api.smali"],
+            "FFE0": ["res/strings.xml"],
+            "authorization": ["smali/com/marspro/Api.smali"],
+        }
+
+    def test_iter_source_files(self, tree):
+        """Test that only files with the given suffixes are walked."""
+        files = sorted(path.name for path in iter_source_files(tree, (".smali", ".xml")))
+
+        assert files == ["Api.smali", "strings.xml"]
+
+    def test_pooled_search_matches_serial(self, tree):
+        """Test that sharding across worker processes finds the same hits as one process."""
+        for index in range(20):
+            (tree / "smali" / f"Gen{index}.smali").write_text(
+                f'const-string v0, "cmd_{index}"\ninvoke api.send\n'
+            )
+        searcher = MultiPatternSearcher(["api", "cmd_1", "ffe0"])
+        trees = [(tree / "smali", (".smali",)), (tree / "res", (".xml",))]
+
+        serial = list(searcher.search_trees(trees, workers=1))
+        pooled = list(searcher.search_trees(trees, workers=2, chunk_size=3))
+
+        key = lambda hit: (hit.file, hit.offset, hit.pattern)
+        assert sorted(pooled, key=key) == sorted(serial, key=key)
+        assert len(serial) == 20 + 11 + 1 + 1
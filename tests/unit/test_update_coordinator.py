@@ -0,0 +1,331 @@
+"""
+Unit tests for MarsPro data update coordinator.
+"""
+
+import asyncio
+import copy
+
+import pytest
+import pytest_asyncio
+from unittest.mock import AsyncMock, Mock, patch
+from homeassistant.core import HomeAssistant
+from src.marspro.connection_manager import MarsProConnectionManager
+from src.marspro.coordinator import MarsProDataUpdateCoordinator
+from src.marspro.frame_decoder import FRAME_CLIMATE, encode_frame
+
+
+@pytest_asyncio.fixture
+async def hass(tmp_path):
+    """Create a bare Home Assistant instance."""
+    hass = HomeAssistant(str(tmp_path))
+    yield hass
+    await hass.async_stop(force=True)
+
+
+@pytest.fixture
+def api():
+    """Create a mock local API."""
+    api = Mock()
+    api.use_cloud = False
+    api.connection_manager = None
+    api.subscribe = AsyncMock(return_value=True)
+    api.unsubscribe = AsyncMock()
+    return api
+
+
+@pytest.fixture
+def coordinator(hass, api):
+    """Create a coordinator with two known devices."""
+    coordinator = MarsProDataUpdateCoordinator(hass, api)
+    coordinator.devices = {
+        "light_1": {"id": "light_1", "power": "on", "brightness": 50},
+        "fan_1": {"id": "fan_1", "power": "off", "speed": 0},
+    }
+    return coordinator
+
+
+class TestMarsProDataUpdateCoordinator:
+    """Test cases for MarsProDataUpdateCoordinator class."""
+
+    @pytest.mark.asyncio
+    async def test_enable_push(self, coordinator, api):
+        """Test that push is enabled when every device subscribes."""
+        assert await coordinator.async_enable_push() is True
+
+        assert coordinator.push_enabled is True
+        assert api.subscribe.await_count == 2
+        api.unsubscribe.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_enable_push_rolls_back_partial_subscription(self, coordinator, api):
+        """Test that a device without push undoes the subscriptions made so far."""
+        api.subscribe.side_effect = [True, False]
+
+        assert await coordinator.async_enable_push() is False
+
+        assert coordinator.push_enabled is False
+        api.unsubscribe.assert_awaited_once_with("light_1")
+
+    @pytest.mark.asyncio
+    async def test_enable_push_rolls_back_on_error(self, coordinator, api):
+        """Test that a failing subscription undoes the subscriptions made so far."""
+        api.subscribe.side_effect = [True, RuntimeError("not connected")]
+
+        with pytest.raises(RuntimeError):
+            await coordinator.async_enable_push()
+
+        assert coordinator.push_enabled is False
+        api.unsubscribe.assert_awaited_once_with("light_1")
+
+    @pytest.mark.asyncio
+    async def test_push_polls_until_frames_carry_state(self, coordinator, api):
+        """Test that devices stay on adaptive polling until pushes carry their state."""
+        api.get_devices = AsyncMock(return_value=[{"id": "light_1"}, {"id": "fan_1"}])
+        api.get_device_status = AsyncMock(return_value={"power": "on", "brightness": 50})
+        api.push_active = True
+        await coordinator.async_enable_push()
+
+        # Sensor frames alone do not make polling redundant
+        coordinator._handle_push_update("fan_1", {"temperature": 25.0})
+        coordinator._handle_push_update("light_1", {"power": "on", "brightness": 60})
+        for device_id in ("light_1", "fan_1"):
+            coordinator.poll_scheduler.notify_command(device_id, now=0.0)
+        await coordinator._async_update_data()
+
+        assert [call.args[0] for call in api.get_device_status.await_args_list] == ["fan_1"]
+        assert coordinator.update_interval.total_seconds() < 300
+
+    @pytest.mark.asyncio
+    async def test_push_loss_resumes_polling(self, coordinator, api):
+        """Test that devices are polled again once notifications stop."""
+        api.get_devices = AsyncMock(return_value=[{"id": "light_1"}])
+        api.get_device_status = AsyncMock(return_value={"power": "on", "brightness": 50})
+        api.push_active = True
+        await coordinator.async_enable_push()
+        coordinator._handle_push_update("light_1", {"power": "on", "brightness": 60})
+
+        await coordinator._async_update_data()
+        api.get_device_status.assert_not_awaited()
+
+        api.push_active = False
+        await coordinator._async_update_data()
+
+        api.get_device_status.assert_awaited_once_with("light_1")
+        assert coordinator._push_complete == set()
+
+    @pytest.mark.asyncio
+    async def test_fetch_statuses_bounded_fan_out(self, coordinator, api):
+        """Test that status requests run concurrently up to the limit."""
+        running = 0
+        peak = 0
+
+        async def get_device_status(device_id):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return {"id": device_id}
+
+        api.get_device_status = get_device_status
+        device_ids = [f"device_{i}" for i in range(7)]
+        with patch("src.marspro.coordinator.DEFAULT_MAX_CONCURRENT_REQUESTS", 3):
+            statuses = await coordinator._async_fetch_statuses(device_ids)
+
+        assert peak == 3
+        assert statuses == {device_id: {"id": device_id} for device_id in device_ids}
+
+    @pytest.mark.asyncio
+    async def test_fetch_statuses_one_device_times_out(self, coordinator, api):
+        """Test that a slow or failing device does not hold up the others."""
+        async def get_device_status(device_id):
+            if device_id == "slow":
+                await asyncio.sleep(10)
+            if device_id == "broken":
+                raise RuntimeError("gatt error")
+            return {"id": device_id}
+
+        api.get_device_status = get_device_status
+        with patch("src.marspro.coordinator.DEFAULT_TIMEOUT", 0.05):
+            statuses = await asyncio.wait_for(
+                coordinator._async_fetch_statuses(["fast", "slow", "broken"]), 1
+            )
+
+        assert statuses == {"fast": {"id": "fast"}, "slow": None, "broken": None}
+
+    @pytest.mark.asyncio
+    async def test_passive_telemetry_shares_scanner(self, hass, coordinator, api):
+        """Test that config entries share one scanner and release it on stop."""
+        other = MarsProDataUpdateCoordinator(hass, api)
+        scanner = Mock()
+        scanner.start_passive_telemetry = AsyncMock()
+        scanner.stop_passive_telemetry = AsyncMock()
+
+        with patch("src.marspro.coordinator.get_device_scanner", return_value=scanner):
+            assert await coordinator.async_start_passive_telemetry() is True
+            assert await other.async_start_passive_telemetry() is True
+
+        assert scanner.start_passive_telemetry.await_count == 2
+        await coordinator.async_stop_passive_telemetry()
+        scanner.stop_passive_telemetry.assert_awaited_once_with(coordinator._handle_advertisement)
+
+    @pytest.mark.asyncio
+    async def test_advertisements_reach_adapter_ranking(self, coordinator, api):
+        """Test that each adapter's scanner reports RSSI to the connection manager."""
+        manager = MarsProConnectionManager(adapters=["hci0", "hci1"])
+        api.connection_manager = manager
+        coordinator.devices["light_1"]["mac"] = "AA:BB:CC:DD:EE:FF"
+        bleak_scanner = Mock()
+        bleak_scanner.start = AsyncMock()
+        bleak_scanner.stop = AsyncMock()
+
+        with patch("src.marspro.ble_client.BleakScanner", return_value=bleak_scanner), \
+                patch.dict("src.marspro.ble_client._SHARED_SCANNERS", clear=True):
+            assert await coordinator.async_start_passive_telemetry() is True
+            scanners = {scanner.adapter: scanner for scanner in coordinator._telemetry_scanners}
+            assert set(scanners) == {"hci0", "hci1"}
+
+            device = Mock()
+            device.address = "AA:BB:CC:DD:EE:FF"
+            device.name = "MarsPro Controller"
+            frame = encode_frame(FRAME_CLIMATE, 250, 550, 800, 95)
+            for adapter, rssi in (("hci0", -80), ("hci1", -45)):
+                advertisement = Mock()
+                advertisement.manufacturer_data = {scanners[adapter].MANUFACTURER_ID: frame}
+                advertisement.service_data = {}
+                advertisement.rssi = rssi
+                scanners[adapter]._handle_advertisement(device, advertisement)
+
+            assert manager.rank_adapters("AA:BB:CC:DD:EE:FF") == ["hci1", "hci0"]
+            assert coordinator.devices["light_1"]["temperature"] == pytest.approx(25.0)
+            # The same reading heard on both adapters is merged once
+            assert len(coordinator.sample_stores["light_1"]) == 1
+
+            await coordinator.async_stop_passive_telemetry()
+
+    @pytest.mark.asyncio
+    async def test_device_list_cached_between_wakeups(self, coordinator, api):
+        """Test that adaptive wakeups reuse the device list instead of refetching it."""
+        api.get_devices = AsyncMock(return_value=[{"id": "light_1", "name": "Light"}])
+        api.get_device_status = AsyncMock(return_value={"power": "on"})
+
+        await coordinator._async_update_data()
+        coordinator.poll_scheduler.notify_command("light_1", now=0.0)
+        await coordinator._async_update_data()
+
+        api.get_devices.assert_awaited_once()
+        assert api.get_device_status.await_count == 2
+        # Statuses are merged into copies, not into the cached list
+        assert coordinator._device_list == [{"id": "light_1", "name": "Light"}]
+
+        with patch(
+            "src.marspro.coordinator.time.monotonic",
+            return_value=coordinator._device_list_time + 3600,
+        ):
+            await coordinator._async_update_data()
+        assert api.get_devices.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_commands_share_one_targeted_refresh(self, hass, coordinator, api):
+        """Test that commands within the debounce window trigger one refresh of their devices."""
+        api.send_command = AsyncMock(return_value={"status": "success"})
+        api.get_device_status = AsyncMock(side_effect=lambda device_id: {"power": "on"})
+        api.get_devices = AsyncMock()
+        coordinator._device_refresh_debouncer.cooldown = 0.05
+
+        await coordinator.send_command("light_1", "power_on")
+        await coordinator.send_command("fan_1", "power_on")
+        await coordinator.send_command("light_1", "set_brightness", brightness=80)
+        api.get_device_status.assert_not_awaited()
+
+        await asyncio.sleep(0.1)
+        await hass.async_block_till_done()
+
+        assert sorted(call.args[0] for call in api.get_device_status.await_args_list) == [
+            "fan_1", "light_1"
+        ]
+        api.get_devices.assert_not_awaited()
+        assert coordinator.devices["fan_1"]["power"] == "on"
+
+    @pytest.mark.asyncio
+    async def test_dispatch_only_changed_devices(self, coordinator):
+        """Test that device listeners run only when their device's data changed."""
+        light_updates = Mock()
+        fan_updates = Mock()
+        coordinator.async_add_device_listener("light_1", light_updates)
+        coordinator.async_add_device_listener("fan_1", fan_updates)
+        coordinator.async_set_updated_data(coordinator._build_data())
+        light_updates.reset_mock()
+        fan_updates.reset_mock()
+
+        coordinator.devices = {
+            **coordinator.devices,
+            "light_1": {**coordinator.devices["light_1"], "brightness": 80},
+        }
+        coordinator.async_set_updated_data(coordinator._build_data())
+        light_updates.assert_called_once()
+        fan_updates.assert_not_called()
+
+        # Unchanged data dispatches nothing
+        coordinator.async_set_updated_data(coordinator._build_data())
+        light_updates.assert_called_once()
+        fan_updates.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_dispatch_snapshots_only_changed_devices(self, coordinator):
+        """Test that only changed devices are copied and removed ones are dropped."""
+        updates = Mock()
+        coordinator.async_add_device_listener("fan_1", updates)
+        coordinator.async_set_updated_data(coordinator._build_data())
+        updates.reset_mock()
+
+        coordinator.devices = {"light_1": {**coordinator.devices["light_1"], "brightness": 80}}
+        with patch("src.marspro.coordinator.copy.deepcopy", wraps=copy.deepcopy) as deepcopy:
+            coordinator.async_set_updated_data(coordinator._build_data())
+
+        deepcopy.assert_called_once_with(coordinator.devices["light_1"])
+        assert coordinator._published_devices == {"light_1": coordinator.devices["light_1"]}
+        # The removed device's listener learns it is gone
+        updates.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_dispatch_nested_change_in_place(self, coordinator):
+        """Test that a nested value mutated in place is still detected."""
+        coordinator.devices["light_1"]["schedule"] = {"on": "06:00", "off": "22:00"}
+        updates = Mock()
+        coordinator.async_add_device_listener("light_1", updates)
+        coordinator.async_set_updated_data(coordinator._build_data())
+        updates.reset_mock()
+
+        coordinator.devices["light_1"]["schedule"]["off"] = "23:00"
+        coordinator.async_set_updated_data(coordinator._build_data())
+
+        updates.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_dispatch_all_on_availability_change(self, coordinator):
+        """Test that every listener runs when the coordinator's availability changes."""
+        updates = Mock()
+        coordinator.async_add_device_listener("light_1", updates)
+        coordinator.async_add_device_listener("fan_1", updates)
+        coordinator.async_set_updated_data(coordinator._build_data())
+        updates.reset_mock()
+
+        coordinator.last_update_success = False
+        coordinator.async_update_listeners()
+
+        assert updates.call_count == 2
+
+    def test_full_day_dli_at_push_rate(self, coordinator):
+        """Test that a day of readings every 10 s yields the whole day's DLI."""
+        device = coordinator.devices["light_1"]
+        # Lights on at 500 µmol/m²/s from 06:00 to 18:00 = 21.6 mol/m²
+        with patch("src.marspro.coordinator.time.time") as now:
+            for t in range(0, 86400, 10):
+                now.return_value = float(t)
+                device["ppfd"] = 500.0 if 6 * 3600 <= t < 18 * 3600 else 0.0
+                coordinator._record_sample("light_1", device)
+
+        store = coordinator.sample_stores["light_1"]
+        assert len(store) < store.capacity
+        assert device["dli"] == pytest.approx(21.6, rel=0.01)